@@ -0,0 +1,116 @@
+"""
+Time of every extractor across input sizes.
+
+Each ecosystem of benchmarks/generators.py is generated at the sizes of
+`--sizes` (number of dependency declarations), the extractor of the file
+is run on it in memory and the best of `-r` runs is kept, e.g.
+
+    python benchmarks/bench_extractors.py --sizes 100,1000,10000 -o bench_extractors.json
+
+The growth exponent between the two largest sizes is reported per
+ecosystem, ~1 for a linear extractor and ~2 for a quadratic one. The exit
+status is 1 when one of them is above `--max-exponent`.
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ccscanner.scanner import classify
+from ccscanner.utils.reader import FileBuffer
+from ccscanner.extractors.registry import extract
+from generators import GENERATORS, generate
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--sizes', type=str, default='100,1000,10000',
+        help='comma separated numbers of dependency declarations per file')
+parser.add_argument('-e', type=str, default=','.join(GENERATORS),
+        help='comma separated ecosystems to run')
+parser.add_argument('-r', type=int, default=3,
+        help='runs per size, the fastest is kept')
+parser.add_argument('--seed', type=int, default=0,
+        help='seed of the generators')
+parser.add_argument('--max-exponent', type=float, default=1.5,
+        help='growth exponent above which an ecosystem is reported as superlinear')
+parser.add_argument('-o', type=str, default='',
+        help='save results to file')
+
+## timings below this are dominated by the clock and not used for the exponent
+MIN_SECONDS = 0.001
+
+
+def time_extractor(filename, text, runs):
+    extractor_type = classify(filename)
+    path = os.path.join(os.sep, 'bench', filename)
+    data = text.encode('utf-8')
+    best = None
+    deps = 0
+    for _ in range(runs):
+        buffer = FileBuffer.from_bytes(path, data, None)
+        start = time.perf_counter()
+        # some extractors print their progress
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            extractor = extract(extractor_type, path, buffer)
+        seconds = time.perf_counter() - start
+        buffer.release()
+        deps = len(extractor.deps)
+        best = seconds if best is None else min(best, seconds)
+    return {'bytes': len(data), 'deps': deps, 'seconds': round(best, 6)}
+
+
+def growth_exponent(points):
+    # slope of log(time) over log(size) between the two largest sizes
+    points = [point for point in points if point['seconds'] >= MIN_SECONDS]
+    if len(points) < 2:
+        return None
+    small, large = points[-2], points[-1]
+    return round(math.log(large['seconds'] / small['seconds']) / math.log(large['n'] / small['n']), 3)
+
+
+def run(ecosystems, sizes, runs, seed, max_exponent):
+    results = {}
+    for ecosystem in ecosystems:
+        points = []
+        for n in sizes:
+            filename, text = generate(ecosystem, n, seed)
+            point = {'n': n}
+            point.update(time_extractor(filename, text, runs))
+            points.append(point)
+        exponent = growth_exponent(points)
+        results[ecosystem] = {
+            'type': classify(GENERATORS[ecosystem][0]),
+            'points': points,
+            'exponent': exponent,
+            'superlinear': exponent is not None and exponent > max_exponent,
+        }
+    return results
+
+
+def main():
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    ecosystems = args.e.split(',')
+    result = {
+        'python': sys.version.split()[0],
+        'seed': args.seed,
+        'runs': args.r,
+        'sizes': sizes,
+        'max_exponent': args.max_exponent,
+        'ecosystems': run(ecosystems, sizes, args.r, args.seed, args.max_exponent),
+    }
+    print(json.dumps(result, indent=2))
+    if args.o:
+        with open(args.o, 'w') as f:
+            json.dump(result, f, indent=2)
+    superlinear = [ecosystem for ecosystem, res in result['ecosystems'].items() if res['superlinear']]
+    if superlinear:
+        sys.stderr.write('superlinear: %s\n' % ', '.join(superlinear))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Time and memory of a full scan of synthetic monorepos.
+
+A tree of benchmarks/monorepo.py is generated for every size of `--files`
+and scanned in a fresh process, e.g.
+
+    python benchmarks/bench_monorepo.py --files 10000,100000,1000000 -o bench_monorepo.json
+
+Every run reports the wall time, files per second, the peak RSS of the scan
+process and the time of each phase: walking the tree, running the
+extractors (per extractor type), to_dict and the json dump. The output
+format is versioned by `format`, so that results of releases can be
+compared.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from monorepo import DEFAULT_MIX, write_monorepo
+
+## bumped when a field changes meaning
+FORMAT = 1
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--files', type=str, default='10000,100000',
+        help='comma separated numbers of files of the trees')
+parser.add_argument('--seed', type=int, default=0,
+        help='seed of the trees')
+parser.add_argument('--mix', type=str, default=DEFAULT_MIX,
+        help='comma separated ecosystem=weight proportions of the build files')
+parser.add_argument('--manifest-ratio', type=float, default=0.05,
+        help='share of the files which are build files')
+parser.add_argument('--vendor-ratio', type=float, default=0.1,
+        help='share of the subprojects which are vendored copies')
+parser.add_argument('--build-ratio', type=float, default=0.05,
+        help='share of the subprojects with a build directory')
+parser.add_argument('--aggregate', action='store_true',
+        help='scan with --aggregate')
+parser.add_argument('--subtree-cache', action='store_true',
+        help='scan with an empty subtree cache in the temporary directory')
+parser.add_argument('-o', type=str, default='',
+        help='save results to file')
+
+
+def scan_tree(root, options, conn):
+    # runs in a fresh process, so that the peak RSS is the one of this scan
+    import resource
+    start = time.perf_counter()
+    from ccscanner.scanner import scanner
+    imported = time.perf_counter()
+
+    class timed_scanner(scanner):
+        def __init__(self, *args, **kwargs) -> None:
+            self.walked_files = 0
+            self.extract_times = {}
+            super().__init__(*args, **kwargs)
+
+        def scan_dir(self, root, filenames):
+            self.walked_files += len(filenames)
+            super().scan_dir(root, filenames)
+
+        def run_extractor(self, extractor_type, arg, file_path):
+            # reading, sniffing and extracting the file
+            extract_start = time.perf_counter()
+            try:
+                return super().run_extractor(extractor_type, arg, file_path)
+            finally:
+                files, seconds = self.extract_times.get(extractor_type, (0, 0.0))
+                self.extract_times[extractor_type] = (files + 1, seconds + time.perf_counter() - extract_start)
+
+    # some extractors print their progress
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        scan_start = time.perf_counter()
+        scanner_obj = timed_scanner(root, aggregate=options['aggregate'], subtree_cache=options['subtree_cache'])
+        scanned = time.perf_counter()
+    res = scanner_obj.to_dict()
+    serialized = time.perf_counter()
+    text = json.dumps(res)
+    dumped = time.perf_counter()
+    extract_seconds = sum(seconds for _, seconds in scanner_obj.extract_times.values())
+    # kilobytes on Linux, bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        peak_rss *= 1024
+    scan_seconds = scanned - scan_start
+    conn.send({
+        'walked_files': scanner_obj.walked_files,
+        'wall_seconds': round(dumped - start, 6),
+        'files_per_second': round(scanner_obj.walked_files / scan_seconds, 1) if scan_seconds else None,
+        'peak_rss_bytes': peak_rss,
+        'phases': {
+            'import': round(imported - start, 6),
+            'scan': round(scan_seconds, 6),
+            'walk': round(scan_seconds - extract_seconds, 6),
+            'extract': round(extract_seconds, 6),
+            'to_dict': round(serialized - scanned, 6),
+            'json_dump': round(dumped - serialized, 6),
+        },
+        'extractors': {extractor_type: {'files': files, 'seconds': round(seconds, 6)}
+                       for extractor_type, (files, seconds) in sorted(scanner_obj.extract_times.items())},
+        'results': {
+            'extractors': len(res['extractors']),
+            'deps': sum(len(extractor['deps']) for extractor in res['extractors']),
+            'skipped': len(res['skipped']),
+            'cached': len(res.get('cached', [])),
+            'output_bytes': len(text),
+        },
+    })
+    conn.close()
+
+
+def run(files, args, workdir):
+    root = os.path.join(workdir, 'tree%d' % files)
+    start = time.perf_counter()
+    tree = write_monorepo(root, files, seed=args.seed, mix=args.mix, manifest_ratio=args.manifest_ratio,
+                          vendor_ratio=args.vendor_ratio, build_ratio=args.build_ratio)
+    generated = time.perf_counter() - start
+    options = {
+        'aggregate': args.aggregate,
+        'subtree_cache': os.path.join(workdir, 'cache%d' % files) if args.subtree_cache else None,
+    }
+    context = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=scan_tree, args=(root, options, child_conn))
+    process.start()
+    child_conn.close()
+    try:
+        result = parent_conn.recv()
+    except EOFError:
+        raise RuntimeError('scan process of %d files died' % files)
+    finally:
+        process.join()
+        shutil.rmtree(root)
+    result['files'] = files
+    result['generate_seconds'] = round(generated, 6)
+    result['tree'] = tree
+    return result
+
+
+def main():
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.files.split(','))
+    workdir = tempfile.mkdtemp(prefix='ccscanner_bench_')
+    try:
+        runs = [run(files, args, workdir) for files in sizes]
+    finally:
+        shutil.rmtree(workdir)
+    result = {
+        'format': FORMAT,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'config': {
+            'seed': args.seed,
+            'mix': args.mix,
+            'manifest_ratio': args.manifest_ratio,
+            'vendor_ratio': args.vendor_ratio,
+            'build_ratio': args.build_ratio,
+            'aggregate': args.aggregate,
+            'subtree_cache': args.subtree_cache,
+        },
+        'runs': runs,
+    }
+    print(json.dumps(result, indent=2, sort_keys=True))
+    if args.o:
+        with open(args.o, 'w') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Time and memory of a scan yielding a large number of dependencies.
+
+Writes vcpkg.json files holding `-n` dependencies in total to a temporary
+directory, scans it and serializes the results, e.g.
+
+    python benchmarks/bench_records.py -n 1000000 -o bench_records.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ccscanner.scanner import scanner
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', type=int, default=1000000,
+        help='number of dependencies')
+parser.add_argument('--per-file', type=int, default=1000,
+        help='dependencies per vcpkg.json')
+parser.add_argument('-o', type=str, default='',
+        help='save results to file')
+
+
+def make_tree(root, total, per_file):
+    index = 0
+    while index < total:
+        count = min(per_file, total - index)
+        subdir = os.path.join(root, 'port%d' % (index // per_file))
+        os.makedirs(subdir)
+        deps = [{'name': 'lib%d' % (index + i), 'version': '1.%d.0' % i} for i in range(count)]
+        with open(os.path.join(subdir, 'vcpkg.json'), 'w') as f:
+            json.dump({'name': 'port', 'dependencies': deps}, f)
+        index += count
+
+
+def run(root):
+    start = time.perf_counter()
+    scanner_obj = scanner(root)
+    scanned = time.perf_counter()
+    res = scanner_obj.to_dict()
+    serialized = time.perf_counter()
+    text = json.dumps(res)
+    dumped = time.perf_counter()
+    deps = sum(len(extractor['deps']) for extractor in res['extractors'])
+    return {
+        'deps': deps,
+        'scan_s': scanned - start,
+        'to_dict_s': serialized - scanned,
+        'json_dump_s': dumped - serialized,
+        'output_bytes': len(text),
+    }
+
+
+def main():
+    args = parser.parse_args()
+    root = tempfile.mkdtemp(prefix='ccscanner_bench_')
+    try:
+        make_tree(root, args.n, args.per_file)
+        result = run(root)
+        # traced separately, tracemalloc slows the scan down several times
+        tracemalloc.start()
+        scanner_obj = scanner(root)
+        _, scan_peak = tracemalloc.get_traced_memory()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        res = scanner_obj.to_dict()
+        _, to_dict_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['scan_peak_bytes'] = scan_peak
+        result['retained_bytes'] = retained
+        result['to_dict_peak_bytes'] = to_dict_peak
+    finally:
+        shutil.rmtree(root)
+    print(json.dumps(result, indent=2))
+    if args.o:
+        with open(args.o, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
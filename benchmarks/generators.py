@@ -0,0 +1,160 @@
+"""
+Seeded generators of synthetic build files, one per ecosystem.
+
+Every generator takes a random.Random and a size `n`, the number of
+dependency declarations, and returns the text of a file in which the
+declarations are mixed with comments and unrelated statements the way they
+are in real projects. The same seed and size always give the same text.
+"""
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ccscanner.utils.cmakelists_parsing import rand
+
+## names real build files use, so that sizes scale with realistic tokens
+LIB_NAMES = ['zlib', 'openssl', 'boost', 'curl', 'libpng', 'libjpeg', 'sqlite3', 'protobuf', 'grpc',
+             'fmt', 'spdlog', 'glib-2.0', 'gtest', 'eigen3', 'libxml2', 'pcre2', 'lz4', 'zstd', 'bzip2',
+             'freetype', 'harfbuzz', 'expat', 'ffmpeg', 'opencv', 'pthread', 'libuv', 'yaml-cpp']
+
+
+def lib_name(rng, index):
+    # unique per index, so that the dependency count grows with n
+    return '%s%d' % (rng.choice(LIB_NAMES), index)
+
+
+def version(rng):
+    return '%d.%d.%d' % (rng.randint(0, 9), rng.randint(0, 30), rng.randint(0, 99))
+
+
+def gen_cmake(rng, n):
+    lines = ['cmake_minimum_required(VERSION 3.10)', 'project(bench%d VERSION %s)' % (n, version(rng)), '']
+    for i in range(n):
+        name = lib_name(rng, i)
+        kind = rng.random()
+        if kind < 0.4:
+            lines.append('find_package(%s %s REQUIRED)' % (name, version(rng)))
+        elif kind < 0.6:
+            lines.append('find_library(%s_LIB NAMES %s PATHS /usr/lib)' % (name.upper(), name))
+        elif kind < 0.8:
+            lines.append('pkg_check_modules(%s REQUIRED %s>=%s)' % (name.upper(), name, version(rng)))
+        else:
+            lines.append('set(%s_VERSION "%s")' % (name, version(rng)))
+        # statements the extractor has to parse and skip
+        lines.append('add_library(target%d STATIC src/file%d.c)' % (i, i))
+        lines.append('target_link_libraries(target%d PRIVATE ${%s_LIB})' % (i, name.upper()))
+        if rng.random() < 0.2:
+            lines.append(rand.comment(15, rng))
+    return '\n'.join(lines) + '\n'
+
+
+def gen_make(rng, n):
+    lines = ['CC = gcc', 'CFLAGS = -O2 -Wall', '']
+    libs = []
+    for i in range(n):
+        name = lib_name(rng, i).replace('-', '_')
+        libs.append('-l' + name)
+        lines.append('OBJ%d = obj/file%d.o' % (i, i))
+        if rng.random() < 0.3:
+            lines.append('# object %d' % i)
+    lines.append('LDLIBS = ' + ' '.join(libs))
+    lines.append('')
+    lines.append('all: app')
+    lines.append('app: ' + ' '.join('$(OBJ%d)' % i for i in range(n)))
+    lines.append('\t$(CC) $(CFLAGS) -o $@ $^ $(LDLIBS)')
+    return '\n'.join(lines) + '\n'
+
+
+def gen_configure(rng, n):
+    lines = ['AC_INIT([bench], [%s], [bench@example.org])' % version(rng), 'AC_PROG_CC', '']
+    for i in range(n):
+        name = lib_name(rng, i)
+        lines.append('AC_CHECK_LIB([%s], [%s_init], [], [AC_MSG_ERROR([%s missing])])' % (name, name, name))
+        if rng.random() < 0.3:
+            lines.append('dnl check %d' % i)
+        lines.append('AC_CHECK_HEADERS([%s.h])' % name)
+    lines.append('AC_OUTPUT')
+    return '\n'.join(lines) + '\n'
+
+
+def gen_control(rng, n):
+    # the n build dependencies of the source stanza, binary stanzas of up to 20 runtime ones each
+    build_depends = ',\n '.join('%s (>= %s)' % (lib_name(rng, i), version(rng)) for i in range(n))
+    stanzas = ['Source: bench\nMaintainer: Bench <bench@example.org>\nBuild-Depends: ' + build_depends]
+    for start in range(0, n, 20):
+        deps = ', '.join('%s (>= %s)' % (lib_name(rng, i), version(rng)) for i in range(start, min(n, start + 20)))
+        stanzas.append('Package: bench%d\nArchitecture: any\nDepends: %s\nDescription: synthetic package %d\n'
+                       ' Long description of package %d.' % (start, deps, start, start))
+    return '\n\n'.join(stanzas) + '\n'
+
+
+def gen_vcxproj(rng, n):
+    groups = []
+    for start in range(0, n, 10):
+        deps = ';'.join('%s.lib' % lib_name(rng, i) for i in range(start, min(n, start + 10)))
+        groups.append('  <ItemDefinitionGroup Condition="\'$(Configuration)|$(Platform)\'==\'Release|x64\'">\n'
+                      '    <ClCompile><Optimization>MaxSpeed</Optimization></ClCompile>\n'
+                      '    <Link><AdditionalDependencies>%s;%%(AdditionalDependencies)</AdditionalDependencies></Link>\n'
+                      '  </ItemDefinitionGroup>' % deps)
+    return ('<?xml version="1.0" encoding="utf-8"?>\n'
+            '<Project DefaultTargets="Build" ToolsVersion="15.0" '
+            'xmlns="http://schemas.microsoft.com/developer/msbuild/2003">\n%s\n</Project>\n' % '\n'.join(groups))
+
+
+def gen_bazel(rng, n):
+    rules = []
+    for start in range(0, n, 5):
+        deps = ',\n'.join('        "//third_party/%s:%s"' % (lib_name(rng, i), lib_name(rng, i))
+                          for i in range(start, min(n, start + 5)))
+        rules.append('cc_library(\n    name = "lib%d",\n    srcs = ["lib%d.cc"],\n    hdrs = ["lib%d.h"],\n'
+                     '    deps = [\n%s,\n    ],\n)\n' % (start, start, start, deps))
+    return '\n'.join(rules)
+
+
+def gen_meson(rng, n):
+    lines = ["project('bench', 'c', version : '%s')" % version(rng), '']
+    for i in range(n):
+        name = lib_name(rng, i)
+        lines.append("%s_dep = dependency('%s', version : '>=%s')" % (name.replace('-', '_'), name, version(rng)))
+        if rng.random() < 0.3:
+            lines.append('# dependency %d' % i)
+    lines.append("executable('bench', 'main.c')")
+    return '\n'.join(lines) + '\n'
+
+
+def gen_xmake(rng, n):
+    lines = ['set_project("bench")', 'set_version("%s")' % version(rng), '']
+    for i in range(n):
+        lines.append('add_requires("%s %s", {configs = {shared = true}})' % (lib_name(rng, i), version(rng)))
+        if rng.random() < 0.3:
+            lines.append('-- requirement %d' % i)
+    lines.append('target("bench")\n    set_kind("binary")\n    add_files("src/*.cpp")')
+    return '\n'.join(lines) + '\n'
+
+
+def gen_conanfile(rng, n):
+    lines = ['[requires]']
+    lines.extend('%s/%s' % (lib_name(rng, i), version(rng)) for i in range(n))
+    lines.extend(['', '[generators]', 'cmake', '', '[options]', '*:shared=False'])
+    return '\n'.join(lines) + '\n'
+
+
+## ecosystem -> (file name the scanner classifies, generator)
+GENERATORS = {
+    'cmake': ('CMakeLists.txt', gen_cmake),
+    'make': ('Makefile', gen_make),
+    'configure': ('configure.ac', gen_configure),
+    'control': ('control', gen_control),
+    'vcxproj': ('bench.vcxproj', gen_vcxproj),
+    'bazel': ('BUILD', gen_bazel),
+    'meson': ('meson.build', gen_meson),
+    'xmake': ('xmake.lua', gen_xmake),
+    'conanfile': ('conanfile.txt', gen_conanfile),
+}
+
+
+def generate(ecosystem, n, seed=0):
+    # (file name, text) of a file of ecosystem with n declarations
+    filename, generator = GENERATORS[ecosystem]
+    return filename, generator(random.Random('%s-%d-%d' % (ecosystem, n, seed)), n)
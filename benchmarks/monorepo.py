@@ -0,0 +1,185 @@
+"""
+Seeded generator of synthetic monorepos.
+
+A tree holds nested subprojects, each with a build file of one ecosystem
+and a few source files, vendored third_party copies of a handful of
+libraries (identical subtrees), and build directories with generated CMake
+files and objects. Build files are taken from tests/test_data or written by
+benchmarks/generators.py. The same options always give the same tree, e.g.
+
+    python benchmarks/monorepo.py -o /tmp/mono --files 100000 --mix cmake=5,make=2,meson=1
+"""
+import os
+import sys
+import json
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from generators import GENERATORS, generate
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'test_data')
+## ecosystem -> (file in tests/test_data, name it is written under)
+SAMPLES = {
+    'cmake': [('CMakeLists.txt', 'CMakeLists.txt'), ('cpm.cmake', 'cpm.cmake')],
+    'make': [('Makefile', 'Makefile'), ('Makefile.2', 'Makefile')],
+    'meson': [('meson.build', 'meson.build')],
+    'bazel': [('bazel.build', 'BUILD')],
+    'vcxproj': [('pthread.vcxproj', 'pthread.vcxproj')],
+    'xmake': [('xmake.lua', 'xmake.lua')],
+}
+DEFAULT_MIX = 'cmake=40,make=20,configure=8,meson=8,bazel=6,vcxproj=6,xmake=4,conanfile=4,control=4'
+## libraries vendored under third_party, each copy is the same subtree
+VENDORED = ['zlib', 'lz4', 'cjson', 'sqlite', 'libyaml', 'miniz']
+MAX_DEPTH = 4
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-o', type=str, required=True,
+        help='directory to write the tree to, must not exist')
+parser.add_argument('--files', type=int, default=10000,
+        help='number of files in the tree')
+parser.add_argument('--seed', type=int, default=0,
+        help='seed of the tree')
+parser.add_argument('--mix', type=str, default=DEFAULT_MIX,
+        help='comma separated ecosystem=weight proportions of the build files')
+parser.add_argument('--manifest-ratio', type=float, default=0.05,
+        help='share of the files which are build files')
+parser.add_argument('--vendor-ratio', type=float, default=0.1,
+        help='share of the subprojects which are vendored copies')
+parser.add_argument('--build-ratio', type=float, default=0.05,
+        help='share of the subprojects with a build directory')
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(','):
+        ecosystem, weight = item.split('=')
+        if ecosystem not in GENERATORS:
+            raise ValueError('unknown ecosystem: ' + ecosystem)
+        weights[ecosystem] = float(weight)
+    return weights
+
+
+def source_file(index):
+    return ('int func%d(int x) { return x + %d; }\n' % (index, index)).encode('utf-8')
+
+
+class MonorepoGenerator(object):
+    """
+    Yields (relative path, content) of the files of a tree until `files`
+    files have been produced.
+    """
+
+    def __init__(self, files, seed=0, mix=DEFAULT_MIX, manifest_ratio=0.05, vendor_ratio=0.1,
+                 build_ratio=0.05) -> None:
+        self.files = files
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.mix = parse_mix(mix)
+        self.manifest_ratio = manifest_ratio
+        self.vendor_ratio = vendor_ratio
+        self.build_ratio = build_ratio
+        self.samples = {}
+        self.vendored = {}
+        self.stats = {'files': 0, 'bytes': 0, 'subprojects': 0, 'vendored': 0, 'build_dirs': 0,
+                      'manifests': {}}
+
+    def sample(self, name):
+        if name not in self.samples:
+            with open(os.path.join(TEST_DATA, name), 'rb') as read_f:
+                self.samples[name] = read_f.read()
+        return self.samples[name]
+
+    def manifest(self, rng, ecosystem):
+        # (file name, content) of a build file, half of them real ones when there are samples
+        if ecosystem in SAMPLES and rng.random() < 0.5:
+            sample, filename = rng.choice(SAMPLES[ecosystem])
+            return filename, self.sample(sample)
+        filename, text = generate(ecosystem, rng.randint(1, 30), rng.randrange(1 << 30))
+        return filename, text.encode('utf-8')
+
+    def subproject(self, rng, ecosystem, index):
+        # files of one subproject, sources scaled so that build files keep their share
+        entries = [self.manifest(rng, ecosystem)]
+        sources = max(0, int(rng.uniform(0.5, 1.5) / self.manifest_ratio) - 1)
+        for i in range(sources):
+            entries.append(('src/file%d.c' % i, source_file(index * 1000 + i)))
+        return entries
+
+    def vendored_library(self, name):
+        # the same files wherever the library is vendored
+        if name not in self.vendored:
+            rng = random.Random('%s-%d' % (name, self.seed))
+            self.vendored[name] = self.subproject(rng, rng.choice(['cmake', 'make', 'configure']), 0)
+        return self.vendored[name]
+
+    def build_dir(self, rng):
+        entries = [
+            ('build/CMakeCache.txt', b'CMAKE_BUILD_TYPE:STRING=Release\n'),
+            ('build/CMakeFiles/3.22.1/CMakeCCompiler.cmake', b'set(CMAKE_C_COMPILER "/usr/bin/cc")\n'),
+            ('build/CMakeFiles/3.22.1/CMakeSystem.cmake', b'set(CMAKE_SYSTEM_NAME "Linux")\n'),
+            ('build/Makefile', b'all:\n\t$(MAKE) -f CMakeFiles/Makefile2 all\n'),
+        ]
+        for i in range(rng.randint(1, 10)):
+            entries.append(('build/obj/file%d.o' % i, b'\x7fELF' + bytes(60)))
+        return entries
+
+    def __iter__(self):
+        ecosystems = list(self.mix)
+        weights = [self.mix[ecosystem] for ecosystem in ecosystems]
+        # subproject directories new ones are nested in, with their depth
+        parents = [('', 0)]
+        index = 0
+        while self.stats['files'] < self.files:
+            parent, depth = self.rng.choice(parents)
+            if parent and self.rng.random() < self.vendor_ratio:
+                name = self.rng.choice(VENDORED)
+                root = os.path.join(parent, 'third_party', '%s-%d' % (name, index))
+                entries = self.vendored_library(name)
+                self.stats['vendored'] += 1
+            else:
+                ecosystem = self.rng.choices(ecosystems, weights)[0]
+                root = os.path.join(parent, 'modules' if not parent else 'sub', 'mod%d' % index)
+                entries = self.subproject(self.rng, ecosystem, index)
+                if self.rng.random() < self.build_ratio:
+                    entries = entries + self.build_dir(self.rng)
+                    self.stats['build_dirs'] += 1
+                if depth + 1 < MAX_DEPTH:
+                    parents.append((root, depth + 1))
+                manifests = self.stats['manifests']
+                manifests[ecosystem] = manifests.get(ecosystem, 0) + 1
+            self.stats['subprojects'] += 1
+            index += 1
+            for path, data in entries:
+                if self.stats['files'] >= self.files:
+                    return
+                self.stats['files'] += 1
+                self.stats['bytes'] += len(data)
+                yield os.path.join(root, path), data
+
+
+def write_monorepo(root, files, **kwargs):
+    # writes the tree to root and returns its statistics
+    generator = MonorepoGenerator(files, **kwargs)
+    made = set()
+    for path, data in generator:
+        full_path = os.path.join(root, path)
+        dirname = os.path.dirname(full_path)
+        if dirname not in made:
+            os.makedirs(dirname, exist_ok=True)
+            made.add(dirname)
+        with open(full_path, 'wb') as write_f:
+            write_f.write(data)
+    return generator.stats
+
+
+def main():
+    args = parser.parse_args()
+    os.makedirs(args.o)
+    stats = write_monorepo(args.o, args.files, seed=args.seed, mix=args.mix, manifest_ratio=args.manifest_ratio,
+                           vendor_ratio=args.vendor_ratio, build_ratio=args.build_ratio)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import os
+import logging
+import tarfile
+import zipfile
+
+from ccscanner.scanner import classify
+from ccscanner.blobscan import BlobTree, blob_scanner
+from ccscanner.utils.reader import MAX_FILE_SIZE
+from ccscanner.utils.subtree import data_digest
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+## tarfile detects the compression of tar streams by itself
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2', '.tbz2', '.tbz', '.tar', '.zip')
+
+
+def is_archive(path):
+    return os.path.isfile(path) and path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def member_path(name):
+    # members are scanned as if the archive was extracted to a directory of its name
+    path = os.path.normpath(name.lstrip('/'))
+    if path == '.' or path.startswith('..'):
+        return None
+    return path
+
+
+def iter_tar(archive):
+    # stream mode: one pass over the archive, a member can only be read before the next header
+    with tarfile.open(archive, 'r|*') as tar:
+        for member in tar:
+            if member.isfile():
+                yield member.name, member.size, lambda: tar.extractfile(member).read()
+
+
+def iter_zip(archive):
+    # the central directory lists every member, only the ones read are decompressed
+    with zipfile.ZipFile(archive) as zip_f:
+        for info in zip_f.infolist():
+            if not info.is_dir():
+                yield info.filename, info.file_size, lambda info=info: zip_f.read(info)
+
+
+class archive_scanner(blob_scanner):
+    """
+    Scans a tar (gz, xz, bz2) or zip source archive without extracting it.
+    Member headers are classified with the rules of the file system scan and
+    only manifest members are decompressed and kept in memory. Members are
+    keyed by their git blob digest, so the blob cache is shared with the git
+    scans.
+    """
+
+    def __init__(self, archive, *, max_size=MAX_FILE_SIZE, **options) -> None:
+        self.archive = archive
+        self.max_size = max_size
+        self.members = 0
+        # blob digest -> member content
+        self.contents = {}
+        super().__init__(archive, max_size=max_size, **options)
+
+    def read_tree(self):
+        tree = BlobTree()
+        members = iter_zip(self.archive) if self.archive.lower().endswith('.zip') else iter_tar(self.archive)
+        for name, size, read in members:
+            self.members += 1
+            path = member_path(name)
+            if path is None or classify(os.path.basename(path)) is None:
+                continue
+            if self.max_size is not None and size > self.max_size:
+                # recorded as oversize by run_extractor
+                tree.add(path, None, size)
+                continue
+            data = read()
+            digest = data_digest(data)
+            self.contents[digest] = data
+            tree.add(path, digest, size)
+        return tree
+
+    def scan(self):
+        super().scan()
+        self.contents = {}
+
+    def read_blob(self, oid):
+        return self.contents[oid]
+
+    def blob_size(self, oid):
+        # the tree has the size of every member, kept ones are in memory anyway
+        return len(self.contents[oid])
+
+    def to_dict(self):
+        res = super().to_dict()
+        res['members'] = self.members
+        return res
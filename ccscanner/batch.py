@@ -0,0 +1,302 @@
+"""
+Scan many repositories in one run, e.g.
+
+    python ccscanner/batch.py -m repos.txt -o results -j 8
+
+repos.txt lists one directory or source archive per line. Repositories are
+scanned by a pool of worker processes which import the scanner once, each
+result is written atomically to its own file in -o, and finished
+repositories are recorded in a journal so that a rerun skips them.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import contextlib
+import multiprocessing
+
+file_dir = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(file_dir, '..'))
+
+from ccscanner.scanner import scanner
+from ccscanner.archive import archive_scanner, is_archive
+from ccscanner.utils.reader import MAX_FILE_SIZE
+from ccscanner.utils.siblings import SIBLING_POLICIES
+from ccscanner.utils.trace import Tracer, merge_parts
+from ccscanner.utils.utils import read_lines, save_js_atomic
+from ccscanner.utils.store import open_store
+from ccscanner.utils.sbom import open_sbom, SBOM_FORMATS
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-m', type=str, required=True,
+        help='manifest file, one directory or source archive to scan per line')
+parser.add_argument('-o', type=str, default='results',
+        help='directory of the results, the journal and the summary')
+parser.add_argument('-j', type=int, default=os.cpu_count(),
+        help='number of worker processes')
+parser.add_argument('--max-tasks', type=int, default=0,
+        help='replace a worker process after it has scanned this many repositories, 0 never')
+parser.add_argument('--max-size', type=int, default=MAX_FILE_SIZE,
+        help='skip files larger than this many bytes')
+parser.add_argument('--aggregate', action='store_true',
+        help='merge the dependencies of each repository into one record per library')
+parser.add_argument('--snippets', action='store_true',
+        help='keep the full text of every evidence in the results')
+parser.add_argument('--file-timeout', type=float, default=None,
+        help='seconds an extractor may spend on one file, longer ones are stopped and listed as skipped (timeout)')
+parser.add_argument('--worker-rss', type=int, default=None,
+        help='MB of memory the extractor process of a worker may grow by, files going over are listed as skipped (oversize)')
+parser.add_argument('--subtree-cache', type=str, default=None,
+        help='directory of a cache of scan results shared by identical subtrees')
+parser.add_argument('--blob-cache', type=str, default=None,
+        help='directory of a cache of archive results by blob id')
+parser.add_argument('--sbom', type=str, action='append', default=None, choices=SBOM_FORMATS,
+        help='also write an SBOM of every repository next to its result, <result>.<format>.json, may be given more than once')
+parser.add_argument('--store', type=str, default=None,
+        help='also add every result to this store, sqlite:<path>, to be queried with ccscanner/query.py')
+parser.add_argument('--trace', type=str, default=None,
+        help='save a timeline of the workers to this file in the Trace Event Format, for Perfetto or chrome://tracing')
+parser.add_argument('--siblings', type=str, default='source', choices=SIBLING_POLICIES,
+        help='which file of a source/generated pair to scan')
+
+JOURNAL = 'journal.jsonl'
+SUMMARY = 'summary.json'
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+## scan options, set once in every worker process
+worker_options = None
+## tracer of --trace in every worker process and the file its events are flushed to
+worker_tracer = None
+worker_trace_file = None
+
+
+def read_manifest(path):
+    targets = []
+    for line in read_lines(path) or []:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            targets.append(line)
+    # a repository listed twice is scanned once
+    return list(dict.fromkeys(targets))
+
+
+def result_name(target):
+    # readable and unique: last path component plus a digest of the whole path
+    name = os.path.basename(os.path.normpath(target)) or 'root'
+    digest = hashlib.sha1(target.encode('utf-8', 'surrogateescape')).hexdigest()[:12]
+    return '%s-%s.json' % (name, digest)
+
+
+def read_journal(path):
+    entries = {}
+    try:
+        with open(path) as read_f:
+            for line in read_f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # last line torn by a crash
+                    continue
+                entries[entry['target']] = entry
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+class Journal(object):
+    """
+    Append-only record of the finished repositories, one json line each,
+    synced to disk before the next one is recorded.
+    """
+
+    def __init__(self, path) -> None:
+        self.file = open(path, 'a')
+
+    def add(self, entry):
+        self.file.write(json.dumps(entry) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+def make_scanner(target, options, tracer=None, sboms=()):
+    if not os.path.exists(target):
+        raise FileNotFoundError(target)
+    if is_archive(target):
+        return archive_scanner(target, blob_cache=options['blob_cache'], sibling_policy=options['siblings'],
+                               max_size=options['max_size'], aggregate=options['aggregate'],
+                               snippets=options['snippets'], tracer=tracer, sboms=sboms)
+    return scanner(target, sibling_policy=options['siblings'], max_size=options['max_size'],
+                   aggregate=options['aggregate'], snippets=options['snippets'],
+                   subtree_cache=options['subtree_cache'], file_timeout=options['file_timeout'],
+                   worker_rss=options['worker_rss'], tracer=tracer, sboms=sboms)
+
+
+def sbom_path(result_path, sbom_format):
+    return '%s.%s.json' % (os.path.splitext(result_path)[0], sbom_format)
+
+
+def trace_parts_dir(trace):
+    return trace + '.parts'
+
+
+def pool_context():
+    # pool processes are daemonic by default and could not start the extractor
+    # process of --file-timeout/--worker-rss
+    context = multiprocessing.get_context()
+
+    class BatchProcess(context.Process):
+        @property
+        def daemon(self):
+            return False
+
+        @daemon.setter
+        def daemon(self, value):
+            pass
+
+    class BatchContext(type(context)):
+        Process = BatchProcess
+
+    return BatchContext()
+
+
+def init_worker(options):
+    global worker_options, worker_tracer, worker_trace_file
+    worker_options = options
+    if options['trace'] is not None:
+        worker_tracer = Tracer('batch worker %d' % os.getpid())
+        worker_trace_file = open(os.path.join(trace_parts_dir(options['trace']), '%d.jsonl' % os.getpid()), 'a')
+
+
+def scan_target(job):
+    target, result_path = job
+    start = time.perf_counter()
+    entry = {'target': target, 'result': os.path.basename(result_path)}
+    sboms = []
+    try:
+        for sbom_format in worker_options['sbom']:
+            sboms.append(open_sbom('%s:%s' % (sbom_format, sbom_path(result_path, sbom_format)), target))
+        # some extractors print their progress
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            scanner_obj = make_scanner(target, worker_options, worker_tracer, sboms)
+        if worker_tracer is not None:
+            with worker_tracer.span('to_dict', 'serialize'):
+                res = scanner_obj.to_dict()
+            with worker_tracer.span('save', 'serialize', {'path': result_path}):
+                save_js_atomic(res, result_path)
+        else:
+            res = scanner_obj.to_dict()
+            save_js_atomic(res, result_path)
+        for sbom in sboms:
+            sbom.finish()
+        entry['status'] = 'ok'
+        entry['extractors'] = len(res['extractors'])
+        entry['deps'] = sum(len(extractor['deps']) for extractor in res['extractors'])
+    except Exception as e:
+        entry['status'] = 'error'
+        entry['error'] = repr(e)
+        for sbom in sboms:
+            sbom.abort()
+    end = time.perf_counter()
+    entry['seconds'] = round(end - start, 6)
+    if worker_tracer is not None:
+        # events are moved to disk after every repository, workers may be replaced at any time
+        worker_tracer.complete('repository', 'scan', start, end, {'target': target, 'status': entry['status']})
+        worker_tracer.flush(worker_trace_file)
+    return entry
+
+
+def make_summary(entries, wall_seconds):
+    ok = [entry for entry in entries if entry['status'] == 'ok']
+    return {
+        'targets': len(entries),
+        'ok': len(ok),
+        'errors': len(entries) - len(ok),
+        'scan_seconds': round(sum(entry['seconds'] for entry in entries), 6),
+        'wall_seconds': round(wall_seconds, 6),
+        # slowest first
+        'repos': sorted(entries, key=lambda entry: entry['seconds'], reverse=True),
+    }
+
+
+def main():
+    args = parser.parse_args()
+    os.makedirs(args.o, exist_ok=True)
+    targets = read_manifest(args.m)
+    journal_path = os.path.join(args.o, JOURNAL)
+    done = read_journal(journal_path)
+    # failed repositories are tried again
+    jobs = [(target, os.path.join(args.o, result_name(target))) for target in targets
+            if done.get(target, {}).get('status') != 'ok']
+    options = {
+        'siblings': args.siblings,
+        'max_size': args.max_size,
+        'aggregate': args.aggregate,
+        'snippets': args.snippets,
+        'subtree_cache': args.subtree_cache,
+        'file_timeout': args.file_timeout,
+        'worker_rss': args.worker_rss * 1024 * 1024 if args.worker_rss is not None else None,
+        'blob_cache': args.blob_cache,
+        'trace': args.trace,
+        # a format given twice is written once
+        'sbom': list(dict.fromkeys(args.sbom or [])),
+    }
+    if args.trace is not None:
+        # the events of earlier runs are not merged
+        shutil.rmtree(trace_parts_dir(args.trace), ignore_errors=True)
+        os.makedirs(trace_parts_dir(args.trace))
+    print('%d repositories, %d done, %d to scan' % (len(targets), len(targets) - len(jobs), len(jobs)))
+    # written by this process only, sqlite has one writer at a time
+    store = open_store(args.store) if args.store is not None else None
+    if store is not None:
+        # repositories finished by an earlier run, which may have had no --store
+        stored = store.targets()
+        for target in targets:
+            entry = done.get(target)
+            if entry is None or entry['status'] != 'ok' or target in stored:
+                continue
+            result_path = os.path.join(args.o, entry['result'])
+            try:
+                with open(result_path) as read_f:
+                    store.add(json.load(read_f), os.path.getmtime(result_path))
+            except (OSError, ValueError) as e:
+                logger.error('%s: cannot store %s: %s' % (target, result_path, e))
+    start = time.perf_counter()
+    journal = Journal(journal_path)
+    try:
+        with pool_context().Pool(args.j, init_worker, (options,), args.max_tasks or None) as pool:
+            for entry in pool.imap_unordered(scan_target, jobs):
+                if store is not None and entry['status'] == 'ok':
+                    # stored before the journal records it, a rerun would not scan it again
+                    with open(os.path.join(args.o, entry['result'])) as read_f:
+                        store.add(json.load(read_f))
+                done[entry['target']] = entry
+                journal.add(entry)
+                if entry['status'] != 'ok':
+                    logger.error('%s: %s' % (entry['target'], entry['error']))
+    finally:
+        journal.close()
+        if store is not None:
+            store.close()
+    end = time.perf_counter()
+    summary = make_summary([done[target] for target in targets if target in done], end - start)
+    if args.trace is not None:
+        tracer = Tracer('batch')
+        tracer.complete('batch', 'scan', start, end, {'manifest': args.m, 'jobs': len(jobs)})
+        parts_dir = trace_parts_dir(args.trace)
+        merge_parts([os.path.join(parts_dir, name) for name in sorted(os.listdir(parts_dir))], args.trace,
+                    tracer.events)
+        shutil.rmtree(parts_dir)
+    save_js_atomic(summary, os.path.join(args.o, SUMMARY))
+    print('%d ok, %d errors' % (summary['ok'], summary['errors']))
+
+
+if __name__ == '__main__':
+    main()
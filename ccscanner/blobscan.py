@@ -0,0 +1,153 @@
+import os
+import abc
+import time
+import logging
+
+from ccscanner.scanner import scanner
+from ccscanner.utils.reader import FileBuffer
+from ccscanner.utils.sniff import sniff
+from ccscanner.utils.siblings import skipped_record
+from ccscanner.utils.blobcache import BlobCache
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+class BlobTree(object):
+    """
+    Files of a tree grouped by directory, each file points to a blob by its
+    key (git blob OID or content digest) and size.
+    """
+
+    def __init__(self) -> None:
+        self.dirs = {}
+        # path -> (blob key, size or None when unknown)
+        self.blobs = {}
+        # submodule path -> commit
+        self.gitlinks = {}
+
+    def add(self, path, oid, size=None):
+        if path not in self.blobs:
+            dirname, filename = os.path.split(path)
+            self.dirs.setdefault(dirname, []).append(filename)
+        self.blobs[path] = (oid, size)
+
+    def remove(self, path):
+        if self.blobs.pop(path, None) is None:
+            return
+        dirname, filename = os.path.split(path)
+        self.dirs[dirname].remove(filename)
+        if not self.dirs[dirname]:
+            del self.dirs[dirname]
+
+
+class blob_scanner(scanner, abc.ABC):
+    """
+    Base of the scanners reading files from a store of blobs (git objects,
+    archive members) instead of the file system. Subclasses build self.tree in
+    read_tree(), read blobs in read_blob() and give the size of the blobs whose
+    size the tree does not know in blob_size(). Results are cached by blob key,
+    so a blob shared by several paths is extracted once.
+    """
+
+    def __init__(self, target, *, blob_cache=None, snippets=False, tracer=None, **options) -> None:
+        self.blob_cache = BlobCache(blob_cache, str(snippets))
+        if tracer is not None:
+            with tracer.span('read_tree', 'walk', {'target': target}):
+                self.tree = self.read_tree()
+        else:
+            self.tree = self.read_tree()
+        super().__init__(target, snippets=snippets, tracer=tracer, **options)
+
+    @abc.abstractmethod
+    def read_tree(self):
+        # the BlobTree of the target
+        pass
+
+    @abc.abstractmethod
+    def read_blob(self, oid):
+        # content of a blob as bytes
+        pass
+
+    @abc.abstractmethod
+    def blob_size(self, oid):
+        # size of a blob added to the tree without one
+        pass
+
+    def scan(self):
+        for dirname, filenames in self.tree.dirs.items():
+            self.scan_dir(os.path.join(self.target, dirname) if dirname else self.target, filenames)
+
+    def cache_stats(self):
+        stats = super().cache_stats()
+        stats['blob'] = (self.blob_cache.hits + self.blob_cache.misses, self.blob_cache.hits)
+        return stats
+
+    def run_extractor(self, extractor_type, arg, file_path):
+        path = os.path.relpath(file_path, self.target)
+        oid, size = self.tree.blobs[path]
+        filename = os.path.basename(path)
+        if size is None:
+            size = self.blob_size(oid)
+        if self.max_size is not None and size > self.max_size:
+            self.skipped.append(skipped_record(os.path.dirname(file_path), filename, 'oversize'))
+            self.file_status('oversize')
+            return
+        if extractor_type == 'gitsubmod':
+            # submodule results also depend on the gitlinks of the tree
+            entry = self.extract_blob(extractor_type, arg, file_path, oid)
+        else:
+            entry = self.blob_cache.get(oid, filename)
+            if entry is None:
+                entry = self.extract_blob(extractor_type, arg, file_path, oid)
+                # a failed extraction is not cached, the next scan tries again
+                if entry is not None:
+                    self.blob_cache.put(oid, filename, entry)
+            else:
+                if entry[1] is not None:
+                    entry[1].rebase(arg)
+                self.file_status('cached')
+        if entry is None:
+            return
+        rejected, extractor = entry
+        if rejected is not None:
+            self.sniff_rejects[rejected] = self.sniff_rejects.get(rejected, 0) + 1
+            self.file_status('rejected')
+            return rejected
+        if extractor is not None:
+            self.add_extractor(extractor)
+
+    def extract_blob(self, extractor_type, arg, file_path, oid):
+        # (rejected extractor type, extractor), None when the extractor failed
+        timed = self.timed
+        if timed:
+            start = time.perf_counter()
+        buffer = FileBuffer.from_bytes(file_path, self.read_blob(oid), self.max_size)
+        self.bytes_read += buffer.size
+        if timed:
+            self.end_phase('read', start, buffer.size)
+            start = time.perf_counter()
+        rejected = sniff(buffer, os.path.basename(file_path))
+        if timed:
+            self.end_phase('sniff', start)
+        if rejected is not None:
+            return rejected, None
+        try:
+            if timed:
+                start = time.perf_counter()
+            extractor = self.extract(extractor_type, arg, buffer)
+            if timed:
+                self.end_extract(extractor, start)
+            return None, extractor
+        except Exception as e:
+            logger.error(e)
+            self.count_error(extractor_type)
+            return None
+        finally:
+            buffer.release()
+
+    def extract(self, extractor_type, arg, buffer, **kwargs):
+        if extractor_type == 'gitsubmod':
+            # there is no checkout to open, .gitmodules is parsed and versions come from the gitlinks
+            kwargs['gitlinks'] = self.tree.gitlinks
+        return super().extract(extractor_type, arg, buffer, **kwargs)
@@ -0,0 +1,84 @@
+import os
+import logging
+
+from ccscanner.scanner import classify
+from ccscanner.gitscan import git_scanner, GitTree
+from ccscanner.history import parse_raw_changes, dep_items, diff_dep_items, GITLINK_MODE
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+class delta_scanner(git_scanner):
+    """
+    Dependency diff between two revisions, e.g. the base and the head of a
+    pull request. Only the directories holding manifest files changed between
+    the two trees are listed and extracted, on both sides, so the cost
+    follows the size of the change rather than the size of the repository.
+    """
+
+    def __init__(self, repo_path, base, head='HEAD', **options) -> None:
+        self.base = base
+        self.changed_files = []
+        self.scanned_dirs = []
+        self.base_extractors = []
+        self.changes = []
+        super().__init__(repo_path, head, **options)
+
+    def read_tree(self):
+        base_commit = self.repo.commit(self.base)
+        head_commit = self.repo.commit(self.rev)
+        output = self.repo.git.diff_tree('-r', '-z', '--no-renames', '--raw', base_commit.hexsha, head_commit.hexsha)
+        touched = set()
+        base_gitlinks = {}
+        head_gitlinks = {}
+        for old_mode, new_mode, old_oid, new_oid, path in parse_raw_changes(output.split('\0')):
+            if old_mode == GITLINK_MODE:
+                base_gitlinks[path] = old_oid
+            if new_mode == GITLINK_MODE:
+                head_gitlinks[path] = new_oid
+            if GITLINK_MODE in (old_mode, new_mode):
+                # submodule versions come from .gitmodules at the top of the repository
+                touched.add('')
+            if classify(os.path.basename(path)) is not None:
+                touched.add(os.path.dirname(path))
+                self.changed_files.append(path)
+        # siblings of a changed file decide whether it is scanned, so whole directories are listed
+        self.scanned_dirs = sorted(touched)
+        self.base_tree = GitTree(self.repo, base_commit.hexsha, self.scanned_dirs)
+        self.base_tree.gitlinks.update(base_gitlinks)
+        tree = GitTree(self.repo, head_commit.hexsha, self.scanned_dirs)
+        tree.gitlinks.update(head_gitlinks)
+        return tree
+
+    def scan(self):
+        head_tree = self.tree
+        self.tree = self.base_tree
+        self.scan_dirs()
+        self.base_extractors = self.extractors
+        # skipped files and rejects are reported for the head
+        self.extractors = []
+        self.skipped = []
+        self.sniff_rejects = {}
+        self.tree = head_tree
+        self.scan_dirs()
+        self.changes = diff_dep_items(dep_items(self.base_extractors, self.target),
+                                      dep_items(self.extractors, self.target))
+
+    def scan_dirs(self):
+        for dirname in self.scanned_dirs:
+            if dirname in self.tree.dirs:
+                self.scan_dir(os.path.join(self.target, dirname) if dirname else self.target,
+                              self.tree.dirs[dirname])
+
+    def to_dict(self):
+        return {
+            'target': self.target,
+            'base': self.base_tree.commit.hexsha,
+            'head': self.tree.commit.hexsha,
+            'changed_files': self.changed_files,
+            'scanned_dirs': self.scanned_dirs,
+            'changes': self.changes,
+            'skipped': self.skipped,
+            'sniff_rejects': self.sniff_rejects,
+        }
@@ -2,17 +2,29 @@ import re
 import os
 from ccscanner.extractors.extractor import Extractor
 from ccscanner.extractors.dependency import Dependency
-from ccscanner.utils.utils import read_txt, get_func_body
+from ccscanner.extractors.utils import KeywordGate
+from ccscanner.utils.utils import read_ascii, as_text, iter_func_bodies
 
 PACKAGE_VAR = re.compile("PACKAGE_(.+?)='(.*?)'", re.DOTALL | re.IGNORECASE)
 param = "\\s*\\[{0,2}(.+?)\\]{0,2}"
 sepParam = "\\s*," + param
 AC_INIT_PATTERN = re.compile("AC_INIT\\(%s%s(%s)?(%s)?(%s)?\\s*\\)" % (param, sepParam, sepParam, sepParam, sepParam), re.DOTALL| re.IGNORECASE)
+## the same patterns for the ascii bytes of large files
+PACKAGE_VAR_BYTES = re.compile(PACKAGE_VAR.pattern.encode(), PACKAGE_VAR.flags & ~re.UNICODE)
+AC_INIT_PATTERN_BYTES = re.compile(AC_INIT_PATTERN.pattern.encode(), AC_INIT_PATTERN.flags & ~re.UNICODE)
 
 KEY_FILES = ['configure', 'configure.in', 'configure.ac']
+## trigger keywords of the analyzers, configure scripts are often megabytes long
+AUTOCONF_ANALYZERS = KeywordGate([
+    ('extract_from_configure', ['package_']),
+    ('extract_from_confin_confac', ['ac_init']),
+    ('parse_funcs', ['ac_check_lib']),
+], re.IGNORECASE)
 
 
 class AutoconfExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, file_path) -> None:
         super().__init__()
         self.type = 'autoconf'
@@ -28,24 +40,30 @@ class AutoconfExtractor(Extractor):
         # if not file_name.lower().startswith('configure'):
         #     return None, None
         if file_name.lower() in KEY_FILES:
-            contents = read_txt(file_path)
+            # configure scripts of several megabytes are scanned as bytes when they are ascii
+            contents = read_ascii(self.get_source())
+            analyzers = AUTOCONF_ANALYZERS.select(contents)
             if file_name.lower() == 'configure':
-                self.extract_from_configure(contents)
-            else:
+                if 'extract_from_configure' in analyzers:
+                    self.extract_from_configure(contents)
+            elif 'extract_from_confin_confac' in analyzers:
                 self.extract_from_confin_confac(contents)
-            self.parse_funcs(contents)
+            if 'parse_funcs' in analyzers:
+                self.parse_funcs(contents)
 
 
     def extract_from_configure(self, contents):
-        package_vars = PACKAGE_VAR.finditer(contents)
+        package_vars = (PACKAGE_VAR if isinstance(contents, str) else PACKAGE_VAR_BYTES).finditer(contents)
         package_var = next(package_vars, None)
         product = version = vendor = None
+        product_var = None
         while(package_var):
-            var = package_var.group(1)
-            value = package_var.group(2)
+            var = as_text(package_var.group(1))
+            value = as_text(package_var.group(2))
             if value:
                 if var.endswith("NAME"):
                     product = value
+                    product_var = package_var
                 elif var == 'VERSION':
                     version = value
                 elif var == "BUGREPORT":
@@ -56,35 +74,37 @@ class AutoconfExtractor(Extractor):
             package_var = next(package_vars, None)
         if product is not None:
             dep = Dependency(product, version)
-            dep.add_evidence(self.type, self.target, '')
+            dep.add_evidence(self.type, self.target, '', product_var.start(), len(product_var.group(0)),
+                             self.line_of(contents, product_var.start()))
             self.add_dependency(dep)
         
 
     def extract_from_confin_confac(self, contents):
-        iters = AC_INIT_PATTERN.finditer(contents)
+        iters = (AC_INIT_PATTERN if isinstance(contents, str) else AC_INIT_PATTERN_BYTES).finditer(contents)
         iter = next(iters, None)
         product = version = vendor = None
         while(iter):
             # TODO: iter.group(5) and iter.group(7) are ignored in current version.
-            product = iter.group(1)
+            product = as_text(iter.group(1))
             if ")" not in product:
-                version = iter.group(2)
+                version = as_text(iter.group(2))
                 # TODO 'AC_INIT(\n [libewf],\n [20220130],\n [joachim.metz@gmail.com])\n'
                 # extracted vendor is ',\n [joachim.metz@gmail.com]'
                 # todo: fix this issue
-                vendor = iter.group(3)
+                vendor = as_text(iter.group(3))
                 dep = Dependency(product, version)
-                dep.add_evidence(self.type, iter.group(0), '')
+                dep.add_evidence(self.type, as_text(iter.group(0)), '', iter.start(), len(iter.group(0)),
+                                 self.line_of(contents, iter.start()))
                 self.add_dependency(dep)
             iter = next(iters, None)
     
     def parse_funcs(self, contents):
         pattern = 'AC_CHECK_LIB\('
-        funcs = get_func_body(pattern, contents)
-        for func in funcs:
+        funcs = iter_func_bodies(pattern, contents)
+        for start, func in funcs:
             args = func.replace('AC_CHECK_LIB', '').strip('()')
             dep_name = args.split(',')[0].strip().strip('[]')
             if dep_name is not None:
                 dep = Dependency(dep_name, None)
-                dep.add_evidence(self.type, self.target, 'High')
+                dep.add_evidence(self.type, self.target, 'High', start, len(func), self.line_of(contents, start))
                 self.add_dependency(dep)
@@ -6,13 +6,22 @@ import json
 
 from ccscanner.extractors.extractor import Extractor
 from ccscanner.extractors.dependency import Dependency
-from ccscanner.utils.utils import read_txt, get_func_body
+from ccscanner.extractors.utils import KeywordGate
+from ccscanner.utils.utils import read_ascii, iter_func_bodies
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
+## trigger keywords of the rules
+BAZEL_RULES = KeywordGate([
+    ('cc_library\\s*\\(', ['cc_library']),
+    ('cc_binary\\s*\\(', ['cc_binary']),
+])
+
 
 class BazelExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.target = target
@@ -23,16 +32,16 @@ class BazelExtractor(Extractor):
 
     def parse_bazel(self):
         ## TODO: http_archive, cc_import
-        contents = read_txt(self.target)
-        pattern1 = 'cc_library\s*\('
-        pattern2 = 'cc_binary\s*\('
+        contents = read_ascii(self.get_source())
         # args_pattern = 'deps=\[(.*)\]'
         args_pattern = 'deps=(\'.*?\'|\[.*?\])'
         dep_pattern = "\"(.*?)\""
-        funcs1 = get_func_body(pattern1, contents)
-        funcs2 = get_func_body(pattern2, contents)
-        funcs = funcs1 + funcs2
-        for func in funcs:
+        funcs = []
+        for pattern in BAZEL_RULES.select(contents):
+            funcs.extend(iter_func_bodies(pattern, contents))
+        for start, func in funcs:
+            length = len(func)
+            line = self.line_of(contents, start)
             func = func.replace('\n', '').replace(' ', '')
             if 'deps=' not in func:
                 continue
@@ -44,7 +53,7 @@ class BazelExtractor(Extractor):
                 if ':' in deps:
                     deps = deps.split(':')[-1]
                 dep = Dependency(deps, None)
-                dep.add_evidence(self.type, self.target, 'High')
+                dep.add_evidence(self.type, self.target, 'High', start, length, line)
                 self.add_dependency(dep)
                 continue
             # deps = json.loads(deps.replace(',]', ']'))
@@ -56,5 +65,5 @@ class BazelExtractor(Extractor):
                 if ':' in dep_name:
                     dep_name = dep_name.split(':')[-1]
                 dep = Dependency(dep_name, None)
-                dep.add_evidence(self.type, self.target+':'+context, 'High')
+                dep.add_evidence(self.type, self.target+':'+context, 'High', start, length, line)
                 self.add_dependency(dep)
@@ -17,6 +17,8 @@ logger = logging.getLogger(__name__)
 
 
 class BuckExtractor(Extractor):
+    __slots__ = ('buckaroo_parents',)
+
     def __init__(self, target) -> None:
         super().__init__()
         self.target = target
@@ -13,6 +13,8 @@ logger = logging.getLogger(__name__)
 
 
 class Build2Extractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.target = target
@@ -22,11 +24,11 @@ class Build2Extractor(Extractor):
         self.parse_build2()
 
     def parse_build2(self):
-        contents = read_txt(self.target)
+        contents = read_txt(self.get_source())
         if 'build2' not in contents:
             return
-        lines = read_lines(self.target)
-        for line in lines:
+        lines = read_lines(self.get_source())
+        for line_number, line in enumerate(lines, 1):
             line = line.strip()
             if line.startswith('depends:'):
                 items = line.split(':', 1)[-1]
@@ -35,5 +37,5 @@ class Build2Extractor(Extractor):
                 ## TODO: parse version string
                 version = items[1]
                 dep = Dependency(dep_name, version)
-                dep.add_evidence(self.type, self.target, 'High')
+                dep.add_evidence(self.type, self.target, 'High', line=line_number)
                 self.add_dependency(dep)
\ No newline at end of file
@@ -5,15 +5,14 @@ import logging
 from ccscanner.extractors.extractor import Extractor
 from ccscanner.extractors.dependency import Dependency
 
+from ccscanner.extractors.clib_keys import KEYS
 from ccscanner.utils.utils import read_js
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
-## Explanation of clib.json / package.json
-## https://github.com/clibs/clib/wiki/Explanation-of-clib.json
-KEYS = ['name', 'version', 'src', 'dependencies', 'development', 'repo', 'description', 'keywords', 'license', 'makefile', 'install', 'uninstall']
-
 class ClibExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.target = target
@@ -25,7 +24,7 @@ class ClibExtractor(Extractor):
 
 
     def parse_clib(self):
-        content = read_js(self.target)
+        content = read_js(self.get_source())
         if content is None:
             return
         if any(i not in KEYS for i in content) or 'name' not in content:
@@ -0,0 +1,4 @@
+## Explanation of clib.json / package.json
+## https://github.com/clibs/clib/wiki/Explanation-of-clib.json
+## kept apart from the extractor, the sniffer of package.json needs them on every scan
+KEYS = ['name', 'version', 'src', 'dependencies', 'development', 'repo', 'description', 'keywords', 'license', 'makefile', 'install', 'uninstall']
@@ -7,7 +7,7 @@ from ccscanner.extractors.dependency import Dependency
 import ccscanner.utils.cmakelists_parsing.parsing as cmp
 from typing import NamedTuple
 from ccscanner.extractors.utils import *
-from ccscanner.utils.utils import read_txt, remove_lstrip, remove_rstrip
+from ccscanner.utils.utils import read_txt, read_ascii, as_text, remove_lstrip, remove_rstrip, RewrittenText
 from ccscanner.extractors.conan_extractor import ConanExtractor
 from ccscanner.extractors.cpm_analyzer import cpm_func_analyzer
 from ccscanner.extractors.hunter_analyzer import hunter_func_analyzer
@@ -25,6 +25,11 @@ PROJECT = re.compile(
     "^ *project *\\([ \\n]*(\\w+)[ \\n]*.*?\\)", REGEX_OPTIONS)
 SET_VERSION = re.compile(
     "^\\s*set\\s*\\(\\s*(\\w+)_version\\s+\"?([^\"\\)]*)\\s*\"?\\)", REGEX_OPTIONS)
+## the same patterns for the ascii bytes of read_ascii
+PROJECT_BYTES = re.compile(PROJECT.pattern.encode(), PROJECT.flags & ~re.UNICODE)
+PROJECT_VERSION_BYTES = re.compile(PROJECT_VERSION.pattern.encode(), PROJECT_VERSION.flags & ~re.UNICODE)
+SET_VERSION_BYTES = re.compile(SET_VERSION.pattern.encode(), SET_VERSION.flags & ~re.UNICODE)
+INL_VAR_REGEX_BYTES = re.compile(INL_VAR_REGEX.pattern.encode(), INL_VAR_REGEX.flags & ~re.UNICODE)
 
 
 # FIND_LIBRARY_SIGNATURE = ['names',
@@ -39,6 +44,18 @@ OPERATORS = ['>=', '<=', '=', '<', '>']
 CONAN_CMAKE_OPTIONS = ['generators', 'options', 'basic_setup', 'build', 'arch',
                        'conanfile', 'build_type',
                        'configuration_types', 'profile', 'profile_auto', 'conan_command', 'no_load', 'imports', 'install_folder', 'env', 'settings']
+## trigger keywords of the analyzers, cmake commands are case-insensitive
+CMAKE_ANALYZERS = KeywordGate([
+    ('find_library_analyzer', ['find_library', 'find_program']),
+    ('find_package_analyzer', ['find_package']),
+    # project(), set(VERSION ...) or set(<name>_version ...)
+    ('get_deps_regex', ['project', 'version']),
+    ('pkg_module_analyzer', ['pkg_check_modules', 'pkg_search_module']),
+    ('conan_cmake_analyzer', ['conan_cmake_run', 'conan_cmake_configure']),
+    ('check_library_exists_analyzer', ['check_library_exists']),
+    ('cpm_analyzer', ['cpmaddpackage', 'cpmfindpackage']),
+    ('hunter_analyzer', ['hunter_add_package']),
+], re.IGNORECASE)
 
 
 class Lib(NamedTuple):
@@ -46,6 +63,7 @@ class Lib(NamedTuple):
     version: str
     fromfile: str
     content: dict
+    line: int
 
 # TODO: FetchContent
 # https://cmake.org/cmake/help/latest/module/FetchContent.html
@@ -53,16 +71,42 @@ class Lib(NamedTuple):
 ## https://cmake.org/cmake/help/latest/module/ExternalProject.html#module:ExternalProject, it is used by cpm.cmake
 
 class CmakeExtractor(Extractor):
+    __slots__ = ('libs_found', 'rewritten')
+
     def __init__(self, target) -> None:
         super().__init__()
         self.type = 'cmake'
         self.libs_found = []
         self.target = target
+        # the content with its variables replaced, while the analyzers run on it
+        self.rewritten = None
+
+
+    def to_dict(self, file_ids=None):
+        file = self.file_id(file_ids)
+        return {'deps': [dep.to_dict(file) for dep in self.deps], 'type': self.type, 'file': file,
+                'libs': [lib._asdict() for lib in self.libs_found]}
+
+    def load_dict(self, res):
+        super().load_dict(res)
+        self.libs_found = [Lib(**lib) for lib in res['libs']]
+
 
+    def locate(self, dep):
+        if self.rewritten is not None:
+            # back to the text before variables were replaced
+            start, end = self.rewritten.original_span(dep.offset, dep.offset + dep.length)
+            dep.offset, dep.length = start, end - start
+            dep.line = self.rewritten.original_line(start)
+        super().locate(dep)
 
-    def to_dict(self):
-        return {'deps': self.deps, 'type': self.type, 'libs': self.libs_found}
+    def release(self):
+        super().release()
+        self.rewritten = None
 
+    def rebase(self, target):
+        super().rebase(target)
+        self.libs_found = [lib._replace(fromfile=target) for lib in self.libs_found]
 
     def run_extractor(self):
         if not self.target.endswith('CMakeLists.txt') and not self.target.endswith('.cmake'):
@@ -81,32 +125,35 @@ class CmakeExtractor(Extractor):
             dep.add_evidence(self.type, self.target, 'High')
             self.add_dependency(dep)
 
-        contents = read_txt(self.target)
+        # patterns ignore the case and the matched parts are lowered, the content is never copied
+        contents = read_ascii(self.get_source())
         if contents is None:
             logger.error('reading errors: ' + self.target)
             return
 
-        contents_replaced = CmakeExtractor.var_replace(contents).lower()
-        self.find_library_analyzer(contents_replaced)
-        self.find_package_analyzer(contents_replaced)
-        self.get_deps_regex(contents_replaced)
-        self.pkg_module_analyzer(contents_replaced)
-        self.conan_cmake_analyzer(contents_replaced)
-        self.check_library_exists_analyzer(contents_replaced)
-        self.cpm_analyzer(contents_replaced)
-        self.hunter_analyzer(contents_replaced)
+        if not isinstance(contents, str) and INL_VAR_REGEX_BYTES.search(contents) is not None:
+            # variables are replaced in the text
+            contents = read_txt(self.get_source())
+        if isinstance(contents, str) and INL_VAR_REGEX.search(contents) is not None:
+            self.rewritten = self.run_analyzer(CmakeExtractor.var_rewrite, contents)
+            contents = self.rewritten.text
+        try:
+            for analyzer in CMAKE_ANALYZERS.select(contents):
+                self.run_analyzer(getattr(self, analyzer), contents)
+        finally:
+            self.rewritten = None
 
 
     def get_deps_regex(self, contents):
         project_name = version = None
 
-        projects = PROJECT.finditer(contents)
+        projects = (PROJECT if isinstance(contents, str) else PROJECT_BYTES).finditer(contents)
         count = 0
         p = next(projects, None)
         while(p):
             count += 1
-            project_name = p.group(1)
-            context = p.group(0).lower()
+            project_name = as_text(p.group(1)).lower()
+            context = as_text(p.group(0)).lower()
             version = None
             if 'version' in context:
                 context = context.replace('\n', ' ')
@@ -116,42 +163,53 @@ class CmakeExtractor(Extractor):
                     version = context_splited[index+1].strip(')')
             if project_name and version:
                 dep = Dependency(project_name, version)
-                dep.add_evidence(self.type, context, 'High')
+                dep.add_evidence(self.type, context, 'High', p.start(), len(p.group(0)),
+                                 self.line_of(contents, p.start()))
                 self.add_dependency(dep)
                 p = next(projects, None)
                 return
             break
 
-        versions = PROJECT_VERSION.finditer(contents)
+        versions = (PROJECT_VERSION if isinstance(contents, str) else PROJECT_VERSION_BYTES).finditer(contents)
         v = next(versions, None)
         while(v):
-            group = v.group(1)
+            group = as_text(v.group(1)).lower()
             version = parse_version(group, True)
             v = next(versions, None)
         if project_name:
             dep = Dependency(project_name, version)
-            dep.add_evidence(self.type, context, '')
+            dep.add_evidence(self.type, context, '', p.start(), len(p.group(0)),
+                             self.line_of(contents, p.start()))
             self.add_dependency(dep)
         else:
             self.analyze_version_command(contents)
 
     def get_func_body(self, pattern, contents):
-        index_iter = re.finditer(pattern, contents)
-        funcs = []
+        return [func_body for _, _, func_body in self.iter_func_bodies(pattern, contents)]
+
+    def iter_func_bodies(self, pattern, contents):
+        # yields (start offset, length, body) of every call matching pattern outside comments,
+        # contents may also be the ascii bytes of read_ascii, the bodies are lowered text
+        # without comments
+        if isinstance(contents, str):
+            left, right = '(', ')'
+        else:
+            left, right = ord('('), ord(')')
+            pattern = pattern.encode()
+        index_iter = re.finditer(pattern, contents, re.IGNORECASE)
         pattern = r'\#.*\n'
         for index in index_iter:
             cursor = index.start()
             if not self.check_comment(cursor, contents):
                 continue
-            func_body = ''
             left_count = 0
             flag = True
             cursor_over = 0
             while(flag):
-                func_body += contents[cursor]
-                if contents[cursor] == '(':
+                char = contents[cursor]
+                if char == left:
                     left_count += 1
-                if contents[cursor] == ')':
+                if char == right:
                     left_count -= 1
                     if left_count == 0:
                         flag = False
@@ -160,15 +218,18 @@ class CmakeExtractor(Extractor):
                     cursor_over = 1
                     break
             if cursor_over == 0:
-                func_body = re.sub(pattern, '\n', func_body)
-                funcs.append(func_body)
-        return funcs
+                func_body = re.sub(pattern, '\n', as_text(contents[index.start():cursor]).lower())
+                yield index.start(), cursor - index.start(), func_body
 
     def check_comment(self, cursor, contents):
+        if isinstance(contents, str):
+            comment, newline = '#', '\n'
+        else:
+            comment, newline = ord('#'), ord('\n')
         while(cursor):
-            if contents[cursor] == '#':
+            if contents[cursor] == comment:
                 return False
-            elif contents[cursor] == '\n':
+            elif contents[cursor] == newline:
                 return True
             else:
                 cursor -= 1
@@ -177,10 +238,11 @@ class CmakeExtractor(Extractor):
         # pattern = '(find_library\s*\([^)]*\))'
         pattern1 = 'find_library\s*\('
         pattern2 = 'find_program\s*\('
-        funcs1 = self.get_func_body(pattern1, contents)
-        funcs2 = self.get_func_body(pattern2, contents)
+        funcs1 = list(self.iter_func_bodies(pattern1, contents))
+        funcs2 = list(self.iter_func_bodies(pattern2, contents))
         funcs = funcs1 + funcs2
-        for func_body in funcs:
+        for start, length, func_body in funcs:
+            line = self.line_of(contents, start)
             try:
                 a = cmp.parse(func_body)
             except Exception as e:
@@ -195,22 +257,23 @@ class CmakeExtractor(Extractor):
                         continue
                     if i.body[1].contents.lower() != 'names' and i.body[1].contents.lower() not in FIND_LIBRARY_OPTIONS:
                         lib = Lib([i.body[1].contents], '',
-                                  self.target, func_body)
-                        self.libs_found.append(lib._asdict())
+                                  self.target, func_body if self.keep_context else None, line)
+                        self.libs_found.append(lib)
                     if i.body[1].contents.lower() == 'names':
                         names = []
                         for arg in i.body[2:]:
                             if arg.contents.lower() in FIND_LIBRARY_OPTIONS:
                                 break
                             names.append(arg.contents)
-                        lib = Lib(names, '', self.target, func_body)
-                        self.libs_found.append(lib._asdict())
+                        lib = Lib(names, '', self.target, func_body if self.keep_context else None, line)
+                        self.libs_found.append(lib)
 
     def find_package_analyzer(self, contents):
         pattern = 'find_package\s*\('
-        funcs = self.get_func_body(pattern, contents)
+        funcs = self.iter_func_bodies(pattern, contents)
 
-        for func_body in funcs:
+        for start, length, func_body in funcs:
+            line = self.line_of(contents, start)
             try:
                 a = cmp.parse(func_body)
             except Exception as e:
@@ -229,15 +292,16 @@ class CmakeExtractor(Extractor):
                     else:
                         version = parse_version(i.body[1].contents, True)
                     dep = Dependency(dep_name, version)
-                    dep.add_evidence(self.type, func_body, 'High')
+                    dep.add_evidence(self.type, func_body, 'High', start, length, line)
                     self.add_dependency(dep)
 
 
     def check_library_exists_analyzer(self, contents):
         pattern = 'check_library_exists\s*\('
-        funcs = self.get_func_body(pattern, contents)
+        funcs = self.iter_func_bodies(pattern, contents)
 
-        for func_body in funcs:
+        for start, length, func_body in funcs:
+            line = self.line_of(contents, start)
             try:
                 a = cmp.parse(func_body)
             except Exception as e:
@@ -250,7 +314,7 @@ class CmakeExtractor(Extractor):
                 if i.name.lower() == 'check_library_exists':
                     dep_name = i.body[0].contents
                     dep = Dependency(dep_name, None)
-                    dep.add_evidence(self.type, func_body, 'High')
+                    dep.add_evidence(self.type, func_body, 'High', start, length, line)
                     self.add_dependency(dep)
                     
 
@@ -275,10 +339,11 @@ class CmakeExtractor(Extractor):
     def pkg_module_analyzer(self, contents):
         pattern1 = 'pkg_check_modules\s*\('
         pattern2 = 'pkg_search_module\s*\('
-        funcs1 = self.get_func_body(pattern1, contents)
-        funcs2 = self.get_func_body(pattern2, contents)
+        funcs1 = list(self.iter_func_bodies(pattern1, contents))
+        funcs2 = list(self.iter_func_bodies(pattern2, contents))
         funcs = funcs1 + funcs2
-        for func_body in funcs:
+        for start, length, func_body in funcs:
+            line = self.line_of(contents, start)
             try:
                 a = cmp.parse(func_body)
             except Exception as e:
@@ -297,16 +362,17 @@ class CmakeExtractor(Extractor):
                             continue
                         name, version, opperator_op = CmakeExtractor.parse_pkg_version(name)
                         dep = Dependency(name, version, opperator_op)
-                        dep.add_evidence(self.type+'::pkg', func_body, 'High')
+                        dep.add_evidence(self.type+'::pkg', func_body, 'High', start, length, line)
                         self.add_dependency(dep)
 
     def conan_cmake_analyzer(self, contents):
         pattern1 = 'conan_cmake_run\s*\('
         pattern2 = 'conan_cmake_configure\s*\('
-        funcs1 = self.get_func_body(pattern1, contents)
-        funcs2 = self.get_func_body(pattern2, contents)
+        funcs1 = list(self.iter_func_bodies(pattern1, contents))
+        funcs2 = list(self.iter_func_bodies(pattern2, contents))
         funcs = funcs1 + funcs2
-        for func_body in funcs:
+        for start, length, func_body in funcs:
+            line = self.line_of(contents, start)
             try:
                 a = cmp.parse(func_body)
             except Exception as e:
@@ -329,7 +395,7 @@ class CmakeExtractor(Extractor):
                                 name, version = ConanExtractor.parse_conan_package(
                                     arg.contents)
                                 dep = Dependency(name, version, '=')
-                                dep.add_evidence(self.type+"::conan", func_body, 'High')
+                                dep.add_evidence(self.type+"::conan", func_body, 'High', start, length, line)
                                 self.add_dependency(dep)
                             if arg.contents.lower() in CONAN_CMAKE_OPTIONS:
                                 key_flag = 0
@@ -338,27 +404,29 @@ class CmakeExtractor(Extractor):
     def cpm_analyzer(self, contents):
         pattern1 = 'cpmaddpackage\s*\('
         pattern2 = 'cpmfindpackage\s*\('
-        funcs1 = self.get_func_body(pattern1, contents)
-        funcs2 = self.get_func_body(pattern2, contents)
+        funcs1 = list(self.iter_func_bodies(pattern1, contents))
+        funcs2 = list(self.iter_func_bodies(pattern2, contents))
         funcs = funcs1 + funcs2
-        for func_body in funcs:
+        for start, length, func_body in funcs:
+            line = self.line_of(contents, start)
             dep_name, version = cpm_func_analyzer(func_body)
             if dep_name is None:
                 continue
             dep = Dependency(dep_name, version)
-            dep.add_evidence(self.type+'::cpm', func_body, 'High')
+            dep.add_evidence(self.type+'::cpm', func_body, 'High', start, length, line)
             self.add_dependency(dep)
 
 
     def hunter_analyzer(self, contents):
         pattern = 'hunter_add_package\s*\('
-        funcs = self.get_func_body(pattern, contents)
-        for func_body in funcs:
+        funcs = self.iter_func_bodies(pattern, contents)
+        for start, length, func_body in funcs:
+            line = self.line_of(contents, start)
             dep_name  = hunter_func_analyzer(func_body)
             if dep_name is None:
                 continue
             dep = Dependency(dep_name, None)
-            dep.add_evidence(self.type+'::hunter', func_body, 'High')
+            dep.add_evidence(self.type+'::hunter', func_body, 'High', start, length, line)
             self.add_dependency(dep)
 
 
@@ -399,50 +467,53 @@ class CmakeExtractor(Extractor):
 
     @staticmethod
     def var_replace(contents):
+        return CmakeExtractor.var_rewrite(contents).text
+
+    @staticmethod
+    def var_rewrite(contents):
+        # var_replace keeping where the replaced text comes from, see RewrittenText
         vars = CmakeExtractor.collect_var(contents)
         inl_vars = INL_VAR_REGEX.finditer(contents)
-        contents_replacer = contents
+        rewritten = RewrittenText(contents)
         r = next(inl_vars, None)
         while(r):
             least_one = False
             if r.group(2) in vars:
                 if r.group(2) not in vars[r.group(2)]:
-                    contents_replacer = contents_replacer.replace(
-                        r.group(1), vars[r.group(2)])
-                    inl_vars = INL_VAR_REGEX.finditer(contents_replacer)
+                    rewritten.replace(r.group(1), vars[r.group(2)])
+                    inl_vars = INL_VAR_REGEX.finditer(rewritten.text)
                     least_one = True
             r = next(inl_vars, None)
             while(r):
                 if r.group(2) in vars:
                     if r.group(2) not in vars[r.group(2)]:
-                        contents_replacer = contents_replacer.replace(
-                            r.group(1), vars[r.group(2)])
-                        inl_vars = INL_VAR_REGEX.finditer(contents_replacer)
+                        rewritten.replace(r.group(1), vars[r.group(2)])
+                        inl_vars = INL_VAR_REGEX.finditer(rewritten.text)
                         least_one = True
                 r = next(inl_vars, None)
             if not least_one:
                 break
-            inl_vars = INL_VAR_REGEX.finditer(contents_replacer)
+            inl_vars = INL_VAR_REGEX.finditer(rewritten.text)
             r = next(inl_vars, None)
-        contents_replaced = contents_replacer
-        return contents_replaced
+        return rewritten
 
     def analyze_version_command(self, contents):
-        vers = SET_VERSION.finditer(contents)
+        vers = (SET_VERSION if isinstance(contents, str) else SET_VERSION_BYTES).finditer(contents)
 
         count = 0
         product = version = None
         v = next(vers, None)
         while(v):
             count += 1
-            product = v.group(1)
-            version = v.group(2)
+            product = as_text(v.group(1)).lower()
+            version = as_text(v.group(2)).lower()
             if product.startswith('_'):
                 product = product[1:]
             if product.lower().endswith('lib'):
                 product = "lib" + product.lower()[0:-3]
             version = parse_version(version, True)
             dep = Dependency(product, version)
-            dep.add_evidence(self.type, v.group(0), 'Low')
+            dep.add_evidence(self.type, as_text(v.group(0)).lower(), 'Low', v.start(), len(v.group(0)),
+                             self.line_of(contents, v.start()))
             self.add_dependency(dep)
             v = next(vers, None)
\ No newline at end of file
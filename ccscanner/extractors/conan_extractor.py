@@ -9,6 +9,8 @@ logger = logging.getLogger(__name__)
 
     
 class ConanExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.type = 'conan'
@@ -26,10 +28,10 @@ class ConanExtractor(Extractor):
         
 
     def process_conanfiletxt(self):
-        lines = read_lines(self.target)
+        lines = read_lines(self.get_source())
         flag = 0
         key_lines = ['[requires]', '[build_requires]', '[full_requires]']
-        for line in lines:
+        for line_number, line in enumerate(lines, 1):
             line = line.strip()
             if line in key_lines:
                 flag = 1
@@ -40,27 +42,27 @@ class ConanExtractor(Extractor):
                 flag = 0
             dep_name, version = ConanExtractor.parse_conan_package(line)
             dep = Dependency(dep_name, version)
-            dep.add_evidence(self.type, self.target+':'+line, 'High')
+            dep.add_evidence(self.type, self.target+':'+line, 'High', line=line_number)
             self.add_dependency(dep)
 
 
     def process_conanfilepy(self):
-        lines = read_lines(self.target)
-        for line in lines:
+        lines = read_lines(self.get_source())
+        for line_number, line in enumerate(lines, 1):
             line = line.strip().replace(' ', '')
             if line.startswith(('requires=', 'build_requires =')):
                 requires = line.split('=', 1)[-1]
                 for require in requires.split(','):
                     req_name, req_version = ConanExtractor.parse_conan_package(require)
                     dep = Dependency(req_name, req_version)
-                    dep.add_evidence(self.type, self.target+':'+require, 'High')
+                    dep.add_evidence(self.type, self.target+':'+require, 'High', line=line_number)
                     self.add_dependency(dep)
             if line.startswith(('self.requires(', 'self.build_requires(')):
                 package = line.replace('self.requires(', '').strip('()')
                 package = package.replace('self.build_requires(', '').strip('()')
                 req_name, req_version = ConanExtractor.parse_conan_package(package)
                 dep = Dependency(req_name, req_version)
-                dep.add_evidence(self.type, self.target+':'+package, 'High')
+                dep.add_evidence(self.type, self.target+':'+package, 'High', line=line_number)
                 self.add_dependency(dep)
 
     @staticmethod
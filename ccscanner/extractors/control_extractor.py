@@ -47,16 +47,17 @@ class ControlExtractor(Extractor):
     - self.pkg_names      ==> Outputs a list object with only the names of the packages in file
     - self.to_json_file() ==> Dumps dictionary outputs to a JSON file
     """
+    __slots__ = ('file_text', 'packages', 'raw_pkg_info', 'clean_pkg_info', 'pkg_names')
 
     def __init__(self, file):
         super().__init__()
         self.target = file
-        self.file_text = self.__read_input(self.target)
-        self.packages = self.file_text.strip('\n').split("\n\n")
         self.type = 'control'
 
 
     def run_extractor(self):
+        self.file_text = self.__read_input(self.target)
+        self.packages = self.file_text.strip('\n').split("\n\n")
         pattern = r'\([^()]*\)'
         pattern2 = r'\<[^<>]*\>'
         operators = ['>=', '<=', '=', '<', '>']
@@ -133,8 +134,8 @@ class ControlExtractor(Extractor):
         """Ensures valid input type"""
         if type(input_obj) is not str:
             raise TypeError("input must be string or string path to file")
-        elif os.path.exists(os.path.dirname(input_obj)):
-            file_text = read_txt(input_obj)
+        elif self.source is not None or os.path.exists(os.path.dirname(input_obj)):
+            file_text = read_txt(self.get_source())
             if self.__is_signed(file_text):
                 file_text = self.__remove_signature(file_text).strip()
             return file_text
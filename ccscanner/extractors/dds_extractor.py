@@ -12,6 +12,8 @@ logger = logging.getLogger(__name__)
 
 
 class DdsExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.target = target
@@ -22,7 +24,7 @@ class DdsExtractor(Extractor):
 
 
     def parse_dds(self):
-        contents = read_json5(self.target)
+        contents = read_json5(self.get_source())
         if 'depends' not in contents:
             return
         for item in contents['depends']:
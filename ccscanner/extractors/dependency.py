@@ -1,39 +1,61 @@
-import json
-import re
-from ccscanner.utils.utils import remove_lstrip, remove_rstrip
-
-VERSION_SUFFIX_PATTERN = '[._-]?\d+(\.\d+){1,6}([._-]?(snapshot|release|final|alpha|beta|rc$|[a-zA-Z]{1,3}[_-]?\d{1,8}))?$'
+from ccscanner.utils.normalize import normalize
 
 class Dependency(object):
+    __slots__ = ('depname', 'version', 'version_op', 'unified_name', 'extractor_type', 'context', 'confidence',
+                 'offset', 'length', 'line')
+
     def __init__(self, dep_name, version, operator = None) -> None:
         super().__init__()
         self.depname = dep_name
         self.version = version
         self.version_op = operator
+        self.extractor_type = self.context = self.confidence = None
+        self.offset = self.length = self.line = None
         self.add_unified_name()
 
-    def add_evidence(self, extractor_type, context, confidence):
+    def add_evidence(self, extractor_type, context, confidence, offset=None, length=None, line=None):
+        # offset and length locate the evidence in the text the extractor analyzed,
+        # line is its 1-based line number. The extractor turns them into byte
+        # offsets in the file. context is dropped by the extractor unless
+        # snippets are requested.
         self.extractor_type = extractor_type
         self.context = context
         self.confidence = confidence
+        self.offset = offset
+        self.length = length
+        self.line = line
     
     def add_unified_name(self):
-        name = remove_lstrip(self.depname.lower(), 'lib')
-        while(name.endswith(('_find', '_major', '_minor', '_min', '_patchlevel', '_patch', '_debug'))):
-            name = '_'.join(name.split('_')[:-1])
-        for suffix in ['-dev', '_dev']:
-            name = remove_rstrip(name, suffix)
-        version = re.search(VERSION_SUFFIX_PATTERN, name)
-        if version is not None:
-            name = name.replace(version.group(0), '')
-            version = version.group(0).strip('._-')
-            if self.version is None:
-                self.version = version
+        name, version = normalize(self.depname)
+        if version is not None and self.version is None:
+            self.version = version
         self.unified_name = name
 
         
     def get_lib_version(self):
         return self.library, self.version
 
-    def to_dict(self):
-        return json.loads(json.dumps(self, default=lambda o: o.__dict__))
\ No newline at end of file
+    def to_dict(self, file=None):
+        res = {
+            'depname': self.depname,
+            'version': self.version,
+            'version_op': self.version_op,
+            'unified_name': self.unified_name,
+            'extractor_type': self.extractor_type,
+            'confidence': self.confidence,
+            'file': file,
+            'offset': self.offset,
+            'length': self.length,
+            'line': self.line,
+        }
+        if self.context is not None:
+            res['context'] = self.context
+        return res
+
+    @classmethod
+    def from_dict(cls, res):
+        # the inverse of to_dict(), names are not normalized again
+        dep = cls.__new__(cls)
+        for field in cls.__slots__:
+            setattr(dep, field, res.get(field))
+        return dep
@@ -1,21 +1,92 @@
+import time
 import logging
+from ccscanner.utils.reader import FileBuffer
+from ccscanner.extractors.dependency import Dependency
+from ccscanner.utils.utils import LineIndex
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
 class Extractor(object):
+    __slots__ = ('deps', 'type', 'target', 'source', 'keep_context', 'line_index', 'timings')
+
     def __init__(self) -> None:
         super().__init__()
         self.deps = []
         self.type = ''
+        self.source = None
+        self.keep_context = True
+        self.line_index = None
+        # analyzer name -> seconds, only collected under --profile
+        self.timings = None
 
     def add_dependency(self, dep):
-        self.deps.append(dep.to_dict())
+        # dependencies are kept as objects and serialized once in to_dict
+        if not self.keep_context:
+            dep.context = None
+        if dep.offset is not None and self.source is not None:
+            self.locate(dep)
+        self.deps.append(dep)
+
+    def locate(self, dep):
+        # offsets of the analyzed text become byte offsets in the file, which
+        # are the same whatever the encoding, line ends or later decoding
+        start = self.source.byte_offset(dep.offset)
+        if dep.length is not None:
+            dep.length = self.source.byte_offset(dep.offset + dep.length) - start
+        dep.offset = start
+
+    def line_of(self, contents, offset):
+        # the newline index is built once per analyzed text
+        if self.line_index is None or self.line_index.text is not contents:
+            self.line_index = LineIndex(contents)
+        return self.line_index.line_of(offset)
+
+    def run_analyzer(self, analyzer, *args):
+        if self.timings is None:
+            return analyzer(*args)
+        start = time.perf_counter()
+        try:
+            return analyzer(*args)
+        finally:
+            name = analyzer.__name__
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def file_id(self, file_ids):
+        # file paths are interned in the file table of the scanner output
+        if file_ids is None:
+            return self.target
+        return file_ids.setdefault(self.target, len(file_ids))
     
+    def get_source(self):
+        # the scanner hands over the buffer it has already read, otherwise
+        # the target is read once here and shared by every read_* call
+        if self.source is None:
+            self.source = FileBuffer(self.target)
+        return self.source
+
+    def release(self):
+        # drop the file content once the extractor has run
+        self.source = None
+        self.line_index = None
+
+    def rebase(self, target):
+        # results loaded from the subtree cache are moved to where the subtree was found
+        old_target = self.target
+        self.target = target
+        for dep in self.deps:
+            if dep.context is not None and dep.context.startswith(old_target):
+                dep.context = target + dep.context[len(old_target):]
+
     def get_deps(self):
         return self.deps
 
     def run_extractor(self):
         logging.info("start running extractor...")
 
-    def to_dict(self):
-        return {'deps': self.deps, 'type': self.type}
\ No newline at end of file
+    def to_dict(self, file_ids=None):
+        file = self.file_id(file_ids)
+        return {'deps': [dep.to_dict(file) for dep in self.deps], 'type': self.type, 'file': file}
+
+    def load_dict(self, res):
+        # the inverse of to_dict() without a file table
+        self.deps = [Dependency.from_dict(dep) for dep in res['deps']]
\ No newline at end of file
@@ -10,6 +10,8 @@ logging.basicConfig()
 logger = logging.getLogger(__name__)
     
 class MakeExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.type = 'make'
@@ -35,7 +37,10 @@ class MakeExtractor(Extractor):
         makefile_path = str(Path(self.target).resolve().parent)
         makefile_name = Path(self.target).name
         makefile_parser = Parser(makefile_name, makefile_path)
-        targets, variables, comments = makefile_parser.parse_makefile(makefile_name, makefile_path)
+        lines = read_lines(self.get_source())
+        if lines is None:
+            return
+        targets, variables, comments = makefile_parser.ast_parse(lines)
         print("\nVariables : ", variables)
         print("\nTargets : ", targets)
         result = extract_libraries(variables, targets)
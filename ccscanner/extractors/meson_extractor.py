@@ -5,7 +5,7 @@ import logging
 
 from ccscanner.extractors.extractor import Extractor
 from ccscanner.extractors.dependency import Dependency
-from ccscanner.utils.utils import read_txt, get_func_body
+from ccscanner.utils.utils import read_txt, iter_func_bodies
 from ccscanner.utils.version import parse_version_str
 
 logging.basicConfig()
@@ -13,6 +13,8 @@ logger = logging.getLogger(__name__)
 
 
 class MesonExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.target = target
@@ -23,14 +25,15 @@ class MesonExtractor(Extractor):
 
     def parse_meson(self):
         ## TODO: declare_dependency
-        contents = read_txt(self.target)
+        contents = read_txt(self.get_source())
         pattern = 'dependency\s*\('
         args_pattern = 'dependency\((.*)\)'
         version_pattern = 'version:(\'.*?\'|\[.*?\])'
-        funcs = get_func_body(pattern, contents)
-        for func in funcs:
+        funcs = iter_func_bodies(pattern, contents)
+        for start, func in funcs:
             if 'declare_'+func in contents:
                 continue
+            length = len(func)
             func = func.replace('\n', '').replace(' ', '')
             args = re.search(args_pattern, func).group(1)
             dep_name = args.split(',')[0].strip('\'\"')
@@ -44,5 +47,5 @@ class MesonExtractor(Extractor):
                     if not version.startswith('['):
                         _, version, op = parse_version_str(version)
             dep = Dependency(dep_name, version, op)
-            dep.add_evidence(self.type, self.target, 'High')
+            dep.add_evidence(self.type, self.target, 'High', start, length, self.line_of(contents, start))
             self.add_dependency(dep)
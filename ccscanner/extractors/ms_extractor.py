@@ -10,6 +10,8 @@ logger = logging.getLogger(__name__)
 
 
 class MsExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.target = target
@@ -21,7 +23,7 @@ class MsExtractor(Extractor):
 
 
     def parse_ms(self):
-        content = read_xml(self.target)
+        content = read_xml(self.get_source())
         deps = content.find_all('AdditionalDependencies')
         for dep in deps:
             if len(dep.contents) == 0:
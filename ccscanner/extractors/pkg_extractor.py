@@ -8,6 +8,8 @@ logger = logging.getLogger(__name__)
 
     
 class PkgExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.type = 'pkgconfig'
@@ -18,11 +20,13 @@ class PkgExtractor(Extractor):
 
     def process_pkg(self):
         operators = ['>=', '<=', '=', '<', '>']
-        lines = read_lines(self.target)
+        lines = read_lines(self.get_source())
         dep_name = version = None
-        for line in lines:
+        name_line = None
+        for line_number, line in enumerate(lines, 1):
             if line.startswith('Name:'):
                 dep_name = line.split(':', 1)[-1].strip()
+                name_line = line_number
             if line.startswith('Version:'):
                 version = line.split(':', 1)[-1].strip()
             if line.startswith('Requires:'):
@@ -67,9 +71,9 @@ class PkgExtractor(Extractor):
                     if req_name is None:
                         req_name = require
                     dep = Dependency(req_name, req_version, version_operator)
-                    dep.add_evidence(self.type, self.target, 'High')
+                    dep.add_evidence(self.type, self.target, 'High', line=line_number)
                     self.add_dependency(dep)
         if dep_name is not None:
             dep = Dependency(dep_name, version, '=')
-            dep.add_evidence(self.type, self.target, 'High')
+            dep.add_evidence(self.type, self.target, 'High', line=name_line)
             self.add_dependency(dep)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import importlib
+
+## extractor type -> (module, class). Modules are imported on first use, so a
+## scan only pays for the extractors of the files it finds.
+EXTRACTORS = {
+    'control': ('ccscanner.extractors.control_extractor', 'ControlExtractor'),
+    'cmake': ('ccscanner.extractors.cmake_extractor', 'CmakeExtractor'),
+    'autoconf': ('ccscanner.extractors.autoconf_extractor', 'AutoconfExtractor'),
+    'gitsubmod': ('ccscanner.extractors.submodule_extractor', 'SubmodExtractor'),
+    'vcpkg': ('ccscanner.extractors.vcpkg_extractor', 'VcpkgExtractor'),
+    'conan': ('ccscanner.extractors.conan_extractor', 'ConanExtractor'),
+    'pkgconfig': ('ccscanner.extractors.pkg_extractor', 'PkgExtractor'),
+    'meson': ('ccscanner.extractors.meson_extractor', 'MesonExtractor'),
+    'clib': ('ccscanner.extractors.clib_extractor', 'ClibExtractor'),
+    'dds': ('ccscanner.extractors.dds_extractor', 'DdsExtractor'),
+    'bazel': ('ccscanner.extractors.bazel_extractor', 'BazelExtractor'),
+    'ms': ('ccscanner.extractors.ms_extractor', 'MsExtractor'),
+    'xmake': ('ccscanner.extractors.xmake_extractor', 'XmakeExtractor'),
+    'make': ('ccscanner.extractors.make_extractor', 'MakeExtractor'),
+    'build2': ('ccscanner.extractors.build2_extractor', 'Build2Extractor'),
+}
+
+## third-party parsers the extractors import on first use
+PARSER_MODULES = {
+    'ms': ['bs4'],
+    'dds': ['json5'],
+    'gitsubmod': ['git'],
+}
+
+extractor_classes = {}
+
+
+def get_extractor(extractor_type):
+    if extractor_type not in extractor_classes:
+        module_name, class_name = EXTRACTORS[extractor_type]
+        extractor_classes[extractor_type] = getattr(importlib.import_module(module_name), class_name)
+    return extractor_classes[extractor_type]
+
+
+def import_extractor(extractor_type):
+    # imports everything an extractor needs ahead of its first run, e.g. so that
+    # --memprofile does not charge the imports to the files
+    get_extractor(extractor_type)
+    for module_name in PARSER_MODULES.get(extractor_type, []):
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+
+
+def extract(extractor_type, arg, buffer, keep_context=True, profile=False, **kwargs):
+    # run the extractor of extractor_type on the content of buffer
+    extractor = get_extractor(extractor_type)(arg, **kwargs)
+    extractor.source = buffer
+    extractor.keep_context = keep_context
+    if profile:
+        extractor.timings = {}
+    extractor.run_extractor()
+    extractor.release()
+    return extractor
+
+
+def load_extractor(res):
+    # an extractor holding the results of its to_dict(), e.g. read back from a cache
+    extractor = get_extractor(res['type'])(res['file'])
+    extractor.load_dict(res)
+    return extractor
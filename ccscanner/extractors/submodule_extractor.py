@@ -1,9 +1,6 @@
 import logging
 import os
 import re
-from git import Repo, InvalidGitRepositoryError
-import requests
-import random
 from ccscanner.extractors.extractor import Extractor
 from ccscanner.utils.utils import read_js, save_js, read_lines, remove_rstrip
 from ccscanner.extractors.dependency import Dependency
@@ -13,26 +10,46 @@ logging.basicConfig()
 logger = logging.getLogger(__name__)
 
 KEYS = ['name', 'path', 'url', 'hexsha', 'branch_name', 'branch_path']
-existing_submods = read_js(SUBMODS)
+existing_submods = None
+
+
+def get_existing_submods():
+    # read on first use, not when the module is imported
+    global existing_submods
+    if existing_submods is None:
+        existing_submods = read_js(SUBMODS)
+    return existing_submods
+
 
 class SubmodExtractor(Extractor):
-    def __init__(self, repo_path) -> None:
+    __slots__ = ('submods', 'gitlinks')
+
+    def __init__(self, repo_path, gitlinks=None) -> None:
         super().__init__()
         self.type = 'gitsubmod'
         self.target = repo_path
         self.submods = []
+        # submodule path -> commit, set when scanning git objects instead of a checkout
+        self.gitlinks = gitlinks
     
     def run_extractor(self):
         self.submodule_extractor()
 
     def submodule_extractor(self):
         processed = 0
-        try:
-            submodules = Repo(self.target).submodules
-        except InvalidGitRepositoryError:
-            # target is not a valid git repo
+        if self.gitlinks is not None:
+            # scanning git objects, there is no checkout to open
             self.parse_submodule_file()
             processed = 1
+        else:
+            # GitPython is only needed for checkouts
+            from git import Repo, InvalidGitRepositoryError
+            try:
+                submodules = Repo(self.target).submodules
+            except InvalidGitRepositoryError:
+                # target is not a valid git repo
+                self.parse_submodule_file()
+                processed = 1
         if processed == 0:
             for i in submodules:
                 # skip if the submodule does not exist.
@@ -69,7 +86,8 @@ class SubmodExtractor(Extractor):
 
     def parse_submodule_file(self):
         submodule_file = os.path.join(self.target, '.gitmodules')
-        contents = read_lines(submodule_file)
+        # the scanner hands over the .gitmodules buffer, the target is a directory
+        contents = read_lines(self.source if self.source is not None else submodule_file)
         item = {}
         flag = 0
         for line in contents:
@@ -88,12 +106,17 @@ class SubmodExtractor(Extractor):
                 item[key.strip(' \t')] = value.strip(' \t')
         if len(item) > 0:
             self.submods.append(item)
+        if self.gitlinks is not None:
+            for item in self.submods:
+                if item.get('path') in self.gitlinks:
+                    item['hexsha'] = self.gitlinks[item['path']]
                     
 
     def parse_url(self, url):
         if 'github.com' in url:
             url = remove_rstrip(url, '.git')
             owner, dep_name = url.split('github.com')[-1][1:].split('/')[:2]
+            existing_submods = get_existing_submods()
             if owner+'@@'+dep_name in existing_submods:
                 lang = existing_submods[owner+'@@'+dep_name]
                 if lang not in ['C', 'C++']:
@@ -23,3 +23,40 @@ def parse_version(text, first_match_only):
         if next(vers, None):
             return None
     return version
+
+
+class KeywordGate(object):
+    """
+    Trigger keywords of the analyzers of an extractor. One pass of a single
+    alternation over the content finds the keywords it contains, and only
+    the analyzers with at least one of them are run: an analyzer whose
+    keywords are all missing could not match anything.
+    """
+
+    def __init__(self, analyzers, flags=0) -> None:
+        # analyzers: [(analyzer name, keywords)], run in this order
+        self.analyzers = analyzers
+        keywords = sorted(set(keyword for _, names in analyzers for keyword in names), key=len, reverse=True)
+        # a lookahead tries every offset, so overlapping keywords are all found
+        self.pattern = re.compile('(?=(%s))' % '|'.join(re.escape(keyword) for keyword in keywords), flags)
+        # the same alternation for the ascii bytes of read_ascii
+        self.bytes_pattern = re.compile(self.pattern.pattern.encode(), flags)
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        # keywords found inside a longer one at the same offset
+        self.implied = {keyword: [other for other in keywords if other != keyword and other in keyword]
+                        for keyword in keywords}
+
+    def present(self, contents):
+        if isinstance(contents, str):
+            found = set(self.pattern.findall(contents))
+        else:
+            found = set(keyword.decode('ascii') for keyword in self.bytes_pattern.findall(contents))
+        if self.ignore_case:
+            found = set(keyword.lower() for keyword in found)
+        for keyword in list(found):
+            found.update(self.implied.get(keyword, ()))
+        return found
+
+    def select(self, contents):
+        present = self.present(contents)
+        return [name for name, keywords in self.analyzers if any(keyword in present for keyword in keywords)]
@@ -8,6 +8,8 @@ logger = logging.getLogger(__name__)
 
     
 class VcpkgExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.type = 'vcpkg'
@@ -17,7 +19,7 @@ class VcpkgExtractor(Extractor):
         self.process_vcpkg()
 
     def process_vcpkg(self):
-        content = read_js(self.target)
+        content = read_js(self.get_source())
         # TODO add dependencies in feature field
         if 'dependencies' in content:
             for dependency in content['dependencies']:
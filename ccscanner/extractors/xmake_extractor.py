@@ -5,13 +5,15 @@ import logging
 
 from ccscanner.extractors.extractor import Extractor
 from ccscanner.extractors.dependency import Dependency
-from ccscanner.utils.utils import read_txt, get_func_body
+from ccscanner.utils.utils import read_ascii, iter_func_bodies
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
 
 class XmakeExtractor(Extractor):
+    __slots__ = ()
+
     def __init__(self, target) -> None:
         super().__init__()
         self.target = target
@@ -23,13 +25,14 @@ class XmakeExtractor(Extractor):
 
 
     def parse_xmake(self):
-        contents = read_txt(self.target)
+        contents = read_ascii(self.get_source())
         ## TODO: add_deps
         pattern = 'add_requires\s*\('
-        funcs = get_func_body(pattern, contents)
+        funcs = iter_func_bodies(pattern, contents)
         arg_pattern = '\((.*)\)'
         dic_pattern = '\{.*\}'
-        for func in funcs:
+        for start, func in funcs:
+            line = self.line_of(contents, start)
             args = re.sub(dic_pattern, '', func)
             args = re.search(arg_pattern, args).group(1).split(',')
             for arg in args:
@@ -45,5 +48,5 @@ class XmakeExtractor(Extractor):
                 if '::' in dep_name:
                     dep_name = dep_name.split('::')[-1]
                 dep = Dependency(dep_name, version)
-                dep.add_evidence(self.type, arg, 'High')
+                dep.add_evidence(self.type, arg, 'High', start, len(func), line)
                 self.add_dependency(dep)
@@ -0,0 +1,77 @@
+import logging
+from git import Repo
+
+from ccscanner.blobscan import BlobTree, blob_scanner
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+class GitTree(BlobTree):
+    """
+    Files of the tree of a commit grouped by directory, listed by one
+    ls-tree call without checking the commit out. With dirs only the files
+    directly in those directories are listed. Without rev the tree is empty
+    and is filled by add() and remove().
+    """
+
+    def __init__(self, repo, rev=None, dirs=None) -> None:
+        super().__init__()
+        self.commit = None
+        if rev is None:
+            return
+        self.commit = repo.commit(rev)
+        if dirs is None:
+            output = repo.git.ls_tree('-r', '-l', '-z', '--full-tree', self.commit.hexsha)
+        elif dirs:
+            # only the files directly in dirs, '' is the top directory
+            output = repo.git.ls_tree('-l', '-z', self.commit.hexsha, '--',
+                                      *[dirname + '/' if dirname else '.' for dirname in dirs])
+        else:
+            output = ''
+        for entry in output.split('\0'):
+            if not entry:
+                continue
+            info, path = entry.split('\t', 1)
+            mode, obj_type, oid, size = info.split()
+            if obj_type == 'commit':
+                self.gitlinks[path] = oid
+                continue
+            # symlinks are blobs holding the link target
+            if obj_type != 'blob' or mode == '120000':
+                continue
+            self.add(path, oid, int(size))
+
+
+def read_blob(repo, oid):
+    return repo.odb.stream(bytes.fromhex(oid)).read()
+
+
+class git_scanner(blob_scanner):
+    """
+    Scans the tree of a commit straight from the git object database. Paths
+    are classified from the tree entries and only the blobs of manifest files
+    are read. Results are cached by blob OID, so a blob shared by several
+    paths or commits is extracted once.
+    """
+
+    def __init__(self, repo_path, rev, **options) -> None:
+        self.repo = Repo(repo_path, search_parent_directories=True)
+        self.rev = rev
+        target = self.repo.working_tree_dir or self.repo.git_dir
+        super().__init__(target, **options)
+
+    def read_tree(self):
+        return GitTree(self.repo, self.rev)
+
+    def read_blob(self, oid):
+        return read_blob(self.repo, oid)
+
+    def blob_size(self, oid):
+        return self.repo.odb.info(bytes.fromhex(oid)).size
+
+    def to_dict(self):
+        res = super().to_dict()
+        res['rev'] = self.rev
+        res['commit'] = self.tree.commit.hexsha
+        return res
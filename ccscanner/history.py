@@ -0,0 +1,191 @@
+import os
+import json
+import logging
+
+from ccscanner.scanner import classify
+from ccscanner.gitscan import git_scanner, GitTree
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+## only regular files are extracted, symlinks and gitlinks have other modes
+BLOB_MODES = ('100644', '100755')
+GITLINK_MODE = '160000'
+LOG_FORMAT = '--format=%x01%H %ct'
+
+
+def parse_raw_changes(tokens):
+    # raw diff entries ":<old mode> <new mode> <old oid> <new oid> <status>\0<path>\0"
+    changes = []
+    index = 0
+    while index < len(tokens) - 1:
+        meta = tokens[index].strip()
+        if not meta.startswith(':'):
+            index += 1
+            continue
+        old_mode, new_mode, old_oid, new_oid, _ = meta[1:].split()
+        changes.append((old_mode, new_mode, old_oid, new_oid, tokens[index + 1]))
+        index += 2
+    return changes
+
+
+def parse_log_record(record):
+    # "<commit> <time>\0" followed by the raw diff entries of the commit
+    tokens = record.decode('utf-8', 'surrogateescape').split('\0')
+    commit, timestamp = tokens[0].split()
+    return commit, int(timestamp), parse_raw_changes(tokens[1:])
+
+
+def iter_log(repo, rev):
+    """
+    Yield (commit, commit time, changes) for the first-parent history of rev,
+    oldest first, from one streamed git log call. Each change is
+    (old mode, new mode, old OID, new OID, path) against the previous commit.
+    """
+    proc = repo.git.log('--first-parent', '--reverse', '--diff-merges=first-parent', '--raw', '-z',
+                        '--no-renames', '--no-abbrev', LOG_FORMAT, rev, as_process=True)
+    pending = b''
+    for chunk in iter(lambda: proc.stdout.read(1 << 20), b''):
+        records = (pending + chunk).split(b'\x01')
+        pending = records.pop()
+        for record in records:
+            if record:
+                yield parse_log_record(record)
+    if pending:
+        yield parse_log_record(pending)
+    proc.wait()
+
+
+def dep_items(extractors, top):
+    items = {}
+    for extractor in extractors:
+        path = os.path.relpath(extractor.target, top)
+        for dep in extractor.deps:
+            items[(path, extractor.type, dep.depname, dep.version, dep.version_op)] = dep.unified_name
+    return items
+
+
+def make_event(kind, item, unified_name):
+    path, extractor_type, depname, version, version_op = item
+    return {
+        'event': kind,
+        'file': path,
+        'type': extractor_type,
+        'depname': depname,
+        'unified_name': unified_name,
+        'version': version,
+        'version_op': version_op,
+    }
+
+
+def diff_dep_items(old_items, new_items):
+    """
+    Events turning the dependencies old_items into new_items, both as
+    returned by dep_items.
+    """
+    events = []
+    added = [item for item in new_items if item not in old_items]
+    removed = [item for item in old_items if item not in new_items]
+    # a dependency with one version removed and one added in the same file is a version change
+    removed_by_name = {}
+    for item in removed:
+        removed_by_name.setdefault(item[:3], []).append(item)
+    added_by_name = {}
+    for item in added:
+        added_by_name.setdefault(item[:3], []).append(item)
+    for name, items in added_by_name.items():
+        old = removed_by_name.get(name, [])
+        if len(items) == 1 and len(old) == 1:
+            event = make_event('changed', items[0], new_items[items[0]])
+            event['old_version'] = old[0][3]
+            event['old_version_op'] = old[0][4]
+            events.append(event)
+            del removed_by_name[name]
+        else:
+            events.extend(make_event('added', item, new_items[item]) for item in items)
+    for items in removed_by_name.values():
+        events.extend(make_event('removed', item, old_items[item]) for item in items)
+    return events
+
+
+class history_scanner(git_scanner):
+    """
+    Dependency timeline of the first-parent history of a revision. Each
+    commit is diffed against the one before it and only the directories
+    holding changed manifest files are extracted again, unchanged blobs come
+    from the blob cache. Dependency changes are written as one json event
+    per line to output, or kept in events without output.
+    """
+
+    def __init__(self, repo_path, rev='HEAD', output=None, **options) -> None:
+        self.output = output
+        self.events = []
+        self.event_count = 0
+        self.commits = 0
+        # directory -> extractors of its manifest files at the current commit
+        self.results = {}
+        super().__init__(repo_path, rev, **options)
+
+    def read_tree(self):
+        # the tree only holds manifest files and is updated from the diff of every commit
+        return GitTree(self.repo)
+
+    def scan(self):
+        for commit, timestamp, changes in iter_log(self.repo, self.rev):
+            self.commits += 1
+            for dirname in self.apply(changes):
+                self.rescan_dir(commit, timestamp, dirname)
+
+    def apply(self, changes):
+        touched = set()
+        gitlinks_changed = False
+        for old_mode, new_mode, _, oid, path in changes:
+            if GITLINK_MODE in (old_mode, new_mode):
+                gitlinks_changed = True
+                self.tree.gitlinks.pop(path, None)
+                if new_mode == GITLINK_MODE:
+                    self.tree.gitlinks[path] = oid
+            if classify(os.path.basename(path)) is None:
+                continue
+            self.tree.remove(path)
+            if new_mode in BLOB_MODES:
+                self.tree.add(path, oid)
+            touched.add(os.path.dirname(path))
+        if gitlinks_changed:
+            # submodule versions come from the gitlinks
+            touched.update(dirname for dirname, filenames in self.tree.dirs.items() if '.gitmodules' in filenames)
+        return sorted(touched)
+
+    def rescan_dir(self, commit, timestamp, dirname):
+        old = self.results.pop(dirname, [])
+        extractors_start = len(self.extractors)
+        skipped_start = len(self.skipped)
+        if dirname in self.tree.dirs:
+            root = os.path.join(self.target, dirname) if dirname else self.target
+            self.scan_dir(root, list(self.tree.dirs[dirname]))
+        new = self.extractors[extractors_start:]
+        # only the current state of the directory is kept
+        del self.extractors[extractors_start:]
+        del self.skipped[skipped_start:]
+        if new:
+            self.results[dirname] = new
+        self.emit_changes(commit, timestamp, dep_items(old, self.target), dep_items(new, self.target))
+
+    def emit_changes(self, commit, timestamp, old_items, new_items):
+        for event in diff_dep_items(old_items, new_items):
+            self.emit(dict(commit=commit, time=timestamp, **event))
+
+    def emit(self, event):
+        self.event_count += 1
+        if self.output is None:
+            self.events.append(event)
+        else:
+            self.output.write(json.dumps(event) + '\n')
+
+    def to_dict(self):
+        return {
+            'target': self.target,
+            'rev': self.rev,
+            'commits': self.commits,
+            'events': self.events if self.output is None else self.event_count,
+        }
@@ -0,0 +1,98 @@
+"""
+Load scan results into a store and query it, e.g.
+
+    python ccscanner/query.py -s sqlite:results.db --load results
+    python ccscanner/query.py -s sqlite:results.db -n zlib -v '<1.2.12' --repos
+
+--load takes results files of the scanner or directories of them, e.g. the
+-o directory of batch.py. A query prints one tab-separated line per evidence:
+repository, file, unified name, name, version, operator, extractor type and
+line.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+
+file_dir = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(file_dir, '..'))
+
+from ccscanner.utils.store import open_store, parse_constraint
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-s', type=str, required=True,
+        help='the store, sqlite:<path>')
+parser.add_argument('--load', type=str, nargs='+', default=None,
+        help='results files or directories of them to add to the store')
+parser.add_argument('-n', type=str, default=None,
+        help='name of the library')
+parser.add_argument('-v', type=str, default=None,
+        help="version constraint, e.g. '<1.2.12', '>=3.0' or '1.1.1'")
+parser.add_argument('--type', type=str, default=None,
+        help='extractor type of the evidence, e.g. cmake or conan')
+parser.add_argument('--target', type=str, default=None,
+        help='only the repository scanned from this target')
+parser.add_argument('--repos', action='store_true',
+        help='print the matching repositories only')
+parser.add_argument('--top', type=int, default=None,
+        help='print the libraries used by the most repositories')
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+def iter_results(paths):
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for file in sorted(files):
+                if file.endswith('.json'):
+                    yield os.path.join(root, file)
+
+
+def load(store, paths):
+    count = 0
+    for path in iter_results(paths):
+        try:
+            with open(path) as read_f:
+                res = json.load(read_f)
+        except ValueError:
+            logger.error('not a results file: ' + path)
+            continue
+        # e.g. the summary of batch.py
+        if not isinstance(res, dict) or 'extractors' not in res:
+            continue
+        store.add(res, os.path.getmtime(path))
+        count += 1
+    return count
+
+
+def main():
+    args = parser.parse_args()
+    if args.v is not None and parse_constraint(args.v)[1] is None:
+        parser.error('no version in -v %s' % args.v)
+    try:
+        store = open_store(args.s)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        if args.load is not None:
+            print('%d results loaded' % load(store, args.load))
+        if args.top is not None:
+            for name, repos in store.top(args.top):
+                print('%s\t%d' % (name, repos))
+        elif args.repos:
+            for target in store.repos(args.n, args.v, args.type):
+                print(target)
+        elif args.load is None or any(value is not None for value in (args.n, args.v, args.type, args.target)):
+            for row in store.query(args.n, args.v, args.type, args.target):
+                print('\t'.join('' if value is None else str(value) for value in row))
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,135 +2,501 @@ import os
 import logging
 import json
 import sys
+import time
 
 file_dir = os.path.abspath(os.path.dirname(__file__))
 sys.path.append(os.path.join(file_dir, '..'))
 sys.path.insert(0, os.getcwd())
 import argparse
 
-from ccscanner.utils.utils import read_txt, save_js
-from ccscanner.extractors.conan_extractor import ConanExtractor
-from ccscanner.extractors.control_extractor import ControlExtractor
-from ccscanner.extractors.cmake_extractor import CmakeExtractor
-from ccscanner.extractors.autoconf_extractor import AutoconfExtractor
-from ccscanner.extractors.submodule_extractor import SubmodExtractor
-from ccscanner.extractors.vcpkg_extractor import VcpkgExtractor
-from ccscanner.extractors.pkg_extractor import PkgExtractor
-from ccscanner.extractors.meson_extractor import MesonExtractor
-from ccscanner.extractors.clib_extractor import ClibExtractor
-from ccscanner.extractors.bazel_extractor import BazelExtractor
-from ccscanner.extractors.ms_extractor import MsExtractor
-from ccscanner.extractors.xmake_extractor import XmakeExtractor
-from ccscanner.extractors.make_extractor import MakeExtractor
-from ccscanner.extractors.dds_extractor import DdsExtractor
-from ccscanner.extractors.build2_extractor import Build2Extractor
+from ccscanner.utils.utils import save_js
+from ccscanner.utils.reader import FileBuffer, MAX_FILE_SIZE
+from ccscanner.utils.sniff import sniff
+from ccscanner.utils.aggregate import DependencyIndex
+from ccscanner.utils.subtree import SubtreeCache, SubtreeHasher, SubtreeRecorder, relative_entry
+from ccscanner.utils.siblings import find_skipped_siblings, skipped_record, SIBLING_POLICIES
+from ccscanner.utils.guard import ExtractorWorker, LimitExceeded
+from ccscanner.utils.profiling import ScanProfile
+from ccscanner.utils.trace import Tracer
+from ccscanner.utils.metrics import MetricsFile, METRICS_INTERVAL
+from ccscanner.utils.memprofile import MemoryProfile
+from ccscanner.extractors.registry import extract, import_extractor, load_extractor
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-d', type=str, default='',
-        help='set directory to scan')
+        help='set directory, git repository or tar/zip source archive to scan')
 parser.add_argument('-t', type=str, default='results.json',
         help='save results to file')
+parser.add_argument('--sbom', type=str, action='append', default=None,
+        help='also write an SBOM while scanning, cyclonedx:<path> or spdx:<path>, may be given more than once')
+parser.add_argument('--store', type=str, default=None,
+        help='also add the results to this store, sqlite:<path>, to be queried with ccscanner/query.py')
+parser.add_argument('--max-size', type=int, default=MAX_FILE_SIZE,
+        help='skip files larger than this many bytes')
+parser.add_argument('--aggregate', action='store_true',
+        help='merge the dependencies of the whole target into one record per library')
+parser.add_argument('--snippets', action='store_true',
+        help='keep the full text of every evidence in the results')
+parser.add_argument('--subtree-cache', type=str, default=None,
+        help='directory of a cache of scan results shared by identical subtrees (e.g. vendored libraries)')
+parser.add_argument('--file-timeout', type=float, default=None,
+        help='seconds an extractor may spend on one file, longer ones are stopped and listed as skipped (timeout)')
+parser.add_argument('--worker-rss', type=int, default=None,
+        help='MB of memory the extractor process may grow by, files going over are stopped and listed as skipped (oversize)')
+parser.add_argument('--git-rev', type=str, default=None,
+        help='scan this revision of the git repository in -d from the object database, without checking it out')
+parser.add_argument('--history', type=str, default=None,
+        help='write the dependency changes of every commit in the first-parent history of this revision, one json event per line')
+parser.add_argument('--base', type=str, default=None,
+        help='save the dependency changes between this revision and --head, scanning only the changed manifest files')
+parser.add_argument('--head', type=str, default='HEAD',
+        help='head revision of --base')
+parser.add_argument('--blob-cache', type=str, default=None,
+        help='directory of a cache of --git-rev/--history/--base and archive results by blob id, shared by scans')
+parser.add_argument('--profile', type=str, default=None,
+        help='time every classified file and extractor analyzer, print the slowest ones and save the timings to this file')
+parser.add_argument('--profile-top', type=int, default=20,
+        help='number of slowest files printed by --profile, and of top allocators printed by --memprofile')
+parser.add_argument('--trace', type=str, default=None,
+        help='save a timeline of the scan to this file in the Trace Event Format, for Perfetto or chrome://tracing')
+parser.add_argument('--metrics', type=str, default=None,
+        help='write Prometheus metrics of the scan to this .prom file of the node_exporter textfile collector')
+parser.add_argument('--metrics-interval', type=float, default=METRICS_INTERVAL,
+        help='seconds between two writes of --metrics while the scan runs')
+parser.add_argument('--memprofile', type=str, default=None,
+        help='trace the allocations of every extractor run, print the top ones and save them to this file')
+parser.add_argument('--memprofile-every', type=int, default=1,
+        help='attribute allocations to source lines for one in this many extractor runs, 0 never (snapshots are slow on large scans)')
+parser.add_argument('--siblings', type=str, default='source', choices=SIBLING_POLICIES,
+        help='which file of a source/generated pair (configure.ac/configure, Makefile.am/Makefile.in/Makefile) to scan')
 
 CONF_FILES = ['configure', 'configure.in', 'configure.ac']
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
 
+def classify(filename):
+    # extractor type of a file name (see extractors.registry), None if the file is not scanned
+    extractor = None
+    filename_lower = filename.lower()
+    ## TODO: readme module
+    # if filename_lower.startswith('readme'):
+    #     extractor = ReadmeExtractor
+    if filename_lower == 'control' or filename_lower.endswith('.dsc'):
+        extractor = 'control'
+    elif filename == 'CMakeLists.txt' or filename.endswith('.cmake'):
+        extractor = 'cmake'
+    elif filename_lower in CONF_FILES:
+        extractor = 'autoconf'
+    elif filename == '.gitmodules':
+        extractor = 'gitsubmod'
+    elif filename == 'vcpkg.json':
+        extractor = 'vcpkg'
+    elif filename in ['conanfile.txt', 'conaninfo.txt', 'conanfile.py']:
+        extractor = 'conan'
+    elif filename.endswith('.pc'):
+        extractor = 'pkgconfig'
+    elif filename == 'meson.build':
+        extractor = 'meson'
+    elif filename in ['package.json', 'clib.json']:
+        extractor = 'clib'
+    elif filename == 'package.json5':
+        extractor = 'dds'
+    elif filename in ['bazel.build', 'BUILD']:
+        extractor = 'bazel'
+    elif filename.endswith(('.vcxproj', '.vbproj', '.props')):
+        extractor = 'ms'
+    elif filename == 'xmake.lua':
+        extractor = 'xmake'
+    ## elif filename in ['buckaroo.toml', 'buckaroo.lock.toml', '.buckconfig']:
+    # elif filename in 'buckaroo.toml':
+    #     extractor = BuckarooExtractor
+    # elif filename == 'BUCK':
+    #     extractor = BuckExtractor
+    elif filename.lower().startswith('makefile'):
+        extractor = 'make'
+    elif filename.lower() == 'manifest':
+        extractor = 'build2'
+    return extractor
+
+
 class scanner(object):
-    def __init__(self, dir_target) -> None:
+    def __init__(self, dir_target, *, sibling_policy='source', max_size=MAX_FILE_SIZE, aggregate=False,
+                 snippets=False, subtree_cache=None, file_timeout=None, worker_rss=None, profile=False,
+                 tracer=None, metrics=None, memprofile=None, sboms=()) -> None:
+        # every option is passed by keyword, the blob scanners forward the ones they do not use
         self.target = dir_target
+        self.snippets = snippets
         self.extractors = []
-        self.scan()
+        self.index = DependencyIndex() if aggregate else None
+        # --sbom writers, fed with every extractor as the scan goes
+        self.sboms = sboms
+        self.skipped = []
+        self.sniff_rejects = {}
+        self.sibling_policy = sibling_policy
+        self.max_size = max_size
+        # counters of --metrics, cheap enough to be kept by every scan
+        self.files_visited = 0
+        self.classified = {}
+        self.errors = {}
+        self.bytes_read = 0
+        self.deps_emitted = 0
+        self.metrics = metrics
+        # timings of --profile and spans of --trace, files are only timed when one of them is set
+        self.profile = ScanProfile() if profile else None
+        self.tracer = tracer
+        self.timed = self.profile is not None or tracer is not None
+        self.timed_path = None
+        # allocations of the extractor runs under --memprofile
+        self.memprofile = memprofile
+        # extractors run in a worker process when a time or memory limit is set
+        self.guard = None
+        if file_timeout is not None or worker_rss is not None:
+            self.guard = ExtractorWorker(file_timeout, worker_rss)
+        self.cached = []
+        self.subtree_cache = None
+        if subtree_cache is not None:
+            options = '%s|%s|%s|%s|%s' % (sibling_policy, max_size, snippets, file_timeout, worker_rss)
+            self.subtree_cache = SubtreeCache(subtree_cache, options)
+            self.hasher = SubtreeHasher(dir_target, classify)
+            self.recorder = SubtreeRecorder(dir_target)
+            self.walked = {}
+        if metrics is not None:
+            metrics.attach(self)
+        try:
+            if tracer is not None:
+                with tracer.span('scan', 'scan', {'target': dir_target}):
+                    self.scan()
+            else:
+                self.scan()
+        finally:
+            if self.guard is not None:
+                self.guard.close()
+        if self.profile is not None:
+            self.profile.finish()
+
+    def walk(self):
+        if self.tracer is not None:
+            # one span per directory listing
+            return self.tracer.iter_spans('walk', 'walk', os.walk(self.target))
+        return os.walk(self.target)
 
     def scan(self):
-        for root, dirs, filenames in os.walk(self.target):
-            for filename in filenames:
-                extractor = None
-                filename_lower = filename.lower()
-                ## TODO: readme module
-                # if filename_lower.startswith('readme'):
-                #     extractor = ReadmeExtractor
-                #     arg = os.path.join(root, filename)
-                if filename_lower == 'control' or filename_lower.endswith('.dsc'):
-                    extractor = ControlExtractor
-                    arg = os.path.join(root, filename)
-                elif filename == 'CMakeLists.txt' or filename.endswith('.cmake'):
-                    extractor = CmakeExtractor
-                    arg = os.path.join(root, filename)
-                elif filename_lower in CONF_FILES:
-                    extractor = AutoconfExtractor
-                    arg = os.path.join(root, filename)
-                elif filename == '.gitmodules':
-                    extractor = SubmodExtractor
-                    arg = root
-                elif filename == 'vcpkg.json':
-                    extractor = VcpkgExtractor
-                    arg = os.path.join(root, filename)
-                elif filename in ['conanfile.txt', 'conaninfo.txt', 'conanfile.py']:
-                    extractor = ConanExtractor
-                    arg = os.path.join(root, filename)
-                elif filename.endswith('.pc'):
-                    extractor = PkgExtractor
-                    arg = os.path.join(root, filename)
-                elif filename == 'meson.build':
-                    extractor = MesonExtractor
-                    arg = os.path.join(root, filename)
-                elif filename in ['package.json', 'clib.json']:
-                    extractor = ClibExtractor
-                    arg = os.path.join(root, filename)
-                elif filename == 'package.json5':
-                    extractor = DdsExtractor
-                    arg = os.path.join(root, filename)
-                elif filename in ['bazel.build', 'BUILD']:
-                    extractor = BazelExtractor
-                    arg = os.path.join(root, filename)
-                elif filename.endswith(('.vcxproj', '.vbproj', '.props')):
-                    extractor = MsExtractor
-                    arg = os.path.join(root, filename)
-                elif filename == 'xmake.lua':
-                    extractor = XmakeExtractor
-                    arg = os.path.join(root, filename)
-                ## elif filename in ['buckaroo.toml', 'buckaroo.lock.toml', '.buckconfig']:
-                # elif filename in 'buckaroo.toml':
-                #     extractor = BuckarooExtractor
-                #     arg = os.path.join(root, filename)
-                # elif filename == 'BUCK':
-                #     extractor = BuckExtractor
-                #     arg = os.path.join(root, filename)
-                elif filename.lower().startswith('makefile'):
-                    print("\n-------------------------------------")
-                    print("MakeExtractor called:root=" + root + ", filename=" + filename)
-                    extractor = MakeExtractor
-                    arg = os.path.join(root, filename)
-                elif filename.lower() == 'manifest':
-                    file_path = os.path.join(root, filename)
-                    context = read_txt(file_path)
-                    if 'build2' not in context:
-                        continue
-                    extractor = Build2Extractor
-                    arg = file_path
-
-                if extractor is None:
-                    continue
-                try:
-                    extractor = extractor(arg)
-                    extractor.run_extractor()
-                    self.extractors.append(extractor.to_dict())
-                except Exception as e:
-                    logger.error(e)
+        for root, dirs, filenames in self.walk():
+            if self.subtree_cache is not None and self.load_subtree(root):
+                dirs[:] = []
+                continue
+            self.scan_dir(root, filenames)
+        if self.subtree_cache is not None:
+            self.store_subtrees()
+
+    def scan_dir(self, root, filenames):
+        extractors_start = len(self.extractors)
+        skipped_start = len(self.skipped)
+        rejects = {}
+        skipped_siblings = find_skipped_siblings(filenames, self.sibling_policy)
+        timed = self.timed
+        self.files_visited += len(filenames)
+        for filename in filenames:
+            if filename in skipped_siblings:
+                self.skipped.append(skipped_record(root, filename, 'sibling', skipped_siblings[filename]))
+                continue
+            if timed:
+                start = time.perf_counter()
+                extractor = classify(filename)
+                end = time.perf_counter()
+                if self.profile is not None:
+                    self.profile.classified(end - start)
+            else:
+                extractor = classify(filename)
+            if extractor is None:
+                continue
+            self.classified[extractor] = self.classified.get(extractor, 0) + 1
+            if timed:
+                self.start_file(os.path.join(root, filename), extractor, start, end)
+            if extractor == 'make':
+                print("\n-------------------------------------")
+                print("MakeExtractor called:root=" + root + ", filename=" + filename)
+            arg = root if extractor == 'gitsubmod' else os.path.join(root, filename)
+            rejected = self.run_extractor(extractor, arg, os.path.join(root, filename))
+            if rejected is not None:
+                rejects[rejected] = rejects.get(rejected, 0) + 1
+        if self.subtree_cache is not None:
+            self.recorder.record(root, self.extractors[extractors_start:], self.skipped[skipped_start:], rejects)
+        if self.metrics is not None:
+            self.metrics.tick()
+
+    def load_subtree(self, root):
+        key = self.hasher.key(root)
+        if key is None:
+            return False
+        entry = self.subtree_cache.get(key)
+        if entry is not None and entry['content'] != self.hasher.content_key(root):
+            # same names and sizes, other content
+            entry = None
+        walked = self.walked.get(key)
+        if entry is None and walked is not None and self.hasher.content_key(walked) == self.hasher.content_key(root):
+            # a copy of a subtree walked earlier in this scan, e.g. the same library vendored twice
+            entry = relative_entry(walked, None, *self.recorder.subtree(walked))
+        if entry is None:
+            self.walked.setdefault(key, root)
+            return False
+        extractors = []
+        for rel_target, res in entry['extractors']:
+            extractor = load_extractor(res)
+            extractor.rebase(os.path.normpath(os.path.join(root, rel_target)))
+            self.add_extractor(extractor)
+            extractors.append(extractor)
+        skipped = [dict(record, **{field: os.path.normpath(os.path.join(root, record[field]))
+                                   for field in ('path', 'kept') if field in record})
+                   for record in entry['skipped']]
+        self.skipped.extend(skipped)
+        for extractor_type, count in entry['sniff_rejects'].items():
+            self.sniff_rejects[extractor_type] = self.sniff_rejects.get(extractor_type, 0) + count
+        self.recorder.record(root, extractors, skipped, dict(entry['sniff_rejects']))
+        self.cached.append({'path': root, 'key': key})
+        return True
+
+    def store_subtrees(self):
+        # subtrees loaded from the cache are already stored
+        cached_paths = set(cached['path'] for cached in self.cached)
+        for path, key, extractors, skipped, rejects in self.recorder.subtrees(self.hasher.key, cached_paths):
+            try:
+                content_key = self.hasher.content_key(path)
+                if content_key is not None:
+                    self.subtree_cache.put(key, relative_entry(path, content_key, extractors, skipped, rejects))
+            except Exception as e:
+                logger.error(e)
+
+    def start_file(self, path, extractor_type, start, end):
+        # a classified file under --profile or --trace, the next phases refer to it
+        self.timed_path = path
+        if self.profile is not None:
+            self.profile.add(path, extractor_type, end - start)
+        if self.tracer is not None:
+            self.tracer.complete('classify', 'classify', start, end, {'path': path})
+
+    def end_phase(self, phase, start, bytes_read=None):
+        end = time.perf_counter()
+        if self.profile is not None:
+            self.profile.current[phase] = end - start
+            if bytes_read is not None:
+                self.profile.current['bytes'] = bytes_read
+        if self.tracer is not None:
+            self.tracer.complete(phase, phase, start, end, {'path': self.timed_path})
+
+    def end_extract(self, extractor, start):
+        end = time.perf_counter()
+        if self.profile is not None:
+            self.profile.extracted(extractor, end - start)
+        if self.tracer is not None:
+            self.tracer.complete(extractor.type, 'extract', start, end,
+                                 {'path': self.timed_path, 'deps': len(extractor.deps)})
+
+    def file_status(self, status):
+        if self.profile is not None:
+            self.profile.current['status'] = status
+
+    def count_error(self, extractor_type):
+        self.errors[extractor_type] = self.errors.get(extractor_type, 0) + 1
+        self.file_status('error')
+
+    def cache_stats(self):
+        # cache name -> (lookups, hits)
+        if self.subtree_cache is None:
+            return {}
+        lookups = self.subtree_cache.hits + self.subtree_cache.misses
+        # copies of a subtree walked earlier in the scan are hits as well
+        return {'subtree': (lookups, len(self.cached))}
+
+    def run_extractor(self, extractor_type, arg, file_path):
+        # the file is read once and the same buffer is used by the scanner and the extractor
+        timed = self.timed
+        try:
+            buffer = FileBuffer(file_path, max_size=self.max_size)
+        except OSError as e:
+            logger.error(e)
+            self.count_error(extractor_type)
+            return
+        if buffer.oversize:
+            self.skipped.append(skipped_record(os.path.dirname(file_path), os.path.basename(file_path), 'oversize'))
+            self.file_status('oversize')
+            return
+        if timed:
+            start = time.perf_counter()
+        rejected = sniff(buffer, os.path.basename(file_path))
+        if timed:
+            self.end_phase('sniff', start)
+        if rejected is not None:
+            self.sniff_rejects[rejected] = self.sniff_rejects.get(rejected, 0) + 1
+            buffer.close()
+            self.file_status('rejected')
+            return rejected
+        self.bytes_read += buffer.size
+        if timed:
+            # read ahead of the extractor, so that its time is the analysis only
+            start = time.perf_counter()
+            buffer.data
+            self.end_phase('read', start, buffer.size)
+        try:
+            if self.subtree_cache is not None and self.guard is None:
+                # the content key of the directory comes from the content the extractor reads
+                self.hasher.add_digest(file_path, buffer.data)
+            if timed:
+                start = time.perf_counter()
+            extractor = self.extract(extractor_type, arg, buffer)
+            if timed:
+                self.end_extract(extractor, start)
+            self.add_extractor(extractor)
+        except LimitExceeded as e:
+            record = skipped_record(os.path.dirname(file_path), os.path.basename(file_path), e.reason)
+            record['limit'] = e.limit
+            self.skipped.append(record)
+            self.file_status(e.reason)
+        except Exception as e:
+            logger.error(e)
+            self.count_error(extractor_type)
+        finally:
+            buffer.release()
+
+    def extract(self, extractor_type, arg, buffer, **kwargs):
+        if self.memprofile is None:
+            return self.run_extract(extractor_type, arg, buffer, **kwargs)
+        import_extractor(extractor_type)
+        self.memprofile.before()
+        try:
+            return self.run_extract(extractor_type, arg, buffer, **kwargs)
+        finally:
+            # the views of the file are dropped by the caller anyway, they are not retained by the extractor
+            buffer.release()
+            self.memprofile.after(extractor_type)
+
+    def run_extract(self, extractor_type, arg, buffer, **kwargs):
+        profile = self.profile is not None
+        if self.guard is not None:
+            return self.guard.extract(extractor_type, arg, buffer, self.snippets, profile, **kwargs)
+        return extract(extractor_type, arg, buffer, self.snippets, profile, **kwargs)
+
+    def add_extractor(self, extractor):
+        self.extractors.append(extractor)
+        self.deps_emitted += len(extractor.deps)
+        if self.index is not None:
+            self.index.add(extractor)
+        for sbom in self.sboms:
+            sbom.add(extractor)
 
     def to_dict(self):
-        return json.loads(json.dumps(self, default=lambda o: o.__dict__))
+        # evidence refers to files by their index in the files table
+        file_ids = {}
+        res = {
+            'target': self.target,
+            'extractors': [extractor.to_dict(file_ids) for extractor in self.extractors],
+            'skipped': self.skipped,
+            'sniff_rejects': self.sniff_rejects,
+        }
+        if self.subtree_cache is not None:
+            res['cached'] = self.cached
+        if self.index is not None:
+            res['libraries'] = self.index.to_list(file_ids)
+        res['files'] = list(file_ids)
+        return res
 
 
 def main():
     args = parser.parse_args()
     target = args.d
     save_file = args.t
-    scanner_obj = scanner(target)
-    res = scanner_obj.to_dict()
-    save_js(res, save_file)
-
+    # imported here, the git and archive scanners build on this module
+    from ccscanner.archive import archive_scanner, is_archive
+    profile = args.profile is not None
+    tracer = Tracer(target) if args.trace is not None else None
+    memprofile = args.memprofile is not None
+    if (profile or tracer is not None or memprofile) and (args.history is not None or args.base is not None):
+        logger.warning('--profile, --trace and --memprofile are not supported with --history and --base')
+        profile = False
+        tracer = None
+        memprofile = False
+    if memprofile and (args.file_timeout is not None or args.worker_rss is not None):
+        logger.warning('--memprofile only traces the scanner process, not the extractor worker of '
+                       '--file-timeout/--worker-rss')
+    # started before the scan, so that every allocation of it is traced
+    memprofile = MemoryProfile(args.memprofile_every) if memprofile else None
+    if (args.store is not None or args.sbom) and (args.history is not None or args.base is not None):
+        logger.warning('--store and --sbom are not supported with --history and --base')
+        args.store = None
+        args.sbom = None
+    if args.store is not None:
+        from ccscanner.utils.store import open_store
+        # opened before the scan, a wrong spec fails early
+        store = open_store(args.store)
+    else:
+        store = None
+    if args.metrics is not None and args.history is not None:
+        logger.warning('--metrics is not supported with --history')
+        args.metrics = None
+    if args.history is not None:
+        from ccscanner.history import history_scanner
+        with open(save_file, 'w') as save_f:
+            history_scanner(target, args.history, save_f, blob_cache=args.blob_cache, sibling_policy=args.siblings,
+                            max_size=args.max_size, snippets=args.snippets)
+        return
+    metrics = MetricsFile(args.metrics, target, args.metrics_interval) if args.metrics is not None else None
+    sboms = []
+    if args.sbom:
+        from ccscanner.utils.sbom import open_sbom
+        for spec in args.sbom:
+            sboms.append(open_sbom(spec, target))
+    options = {'sibling_policy': args.siblings, 'max_size': args.max_size, 'snippets': args.snippets,
+               'metrics': metrics}
+    hooks = {'aggregate': args.aggregate, 'profile': profile, 'tracer': tracer, 'memprofile': memprofile,
+             'sboms': sboms}
+    start = time.perf_counter()
+    try:
+        if args.base is not None:
+            from ccscanner.delta import delta_scanner
+            scanner_obj = delta_scanner(target, args.base, args.head, blob_cache=args.blob_cache, **options)
+        elif args.git_rev is not None:
+            from ccscanner.gitscan import git_scanner
+            scanner_obj = git_scanner(target, args.git_rev, blob_cache=args.blob_cache, **options, **hooks)
+        elif is_archive(target):
+            scanner_obj = archive_scanner(target, blob_cache=args.blob_cache, **options, **hooks)
+        else:
+            worker_rss = args.worker_rss * 1024 * 1024 if args.worker_rss is not None else None
+            scanner_obj = scanner(target, subtree_cache=args.subtree_cache, file_timeout=args.file_timeout,
+                                  worker_rss=worker_rss, **options, **hooks)
+        scanned = time.perf_counter()
+        if tracer is not None:
+            with tracer.span('to_dict', 'serialize'):
+                res = scanner_obj.to_dict()
+            serialized = time.perf_counter()
+            with tracer.span('save', 'serialize', {'path': save_file}):
+                save_js(res, save_file)
+            tracer.save(args.trace)
+        else:
+            res = scanner_obj.to_dict()
+            serialized = time.perf_counter()
+            save_js(res, save_file)
+        if store is not None:
+            store.add(res)
+            store.close()
+        for sbom in sboms:
+            sbom.finish()
+    except BaseException:
+        if metrics is not None:
+            metrics.finish(False)
+        for sbom in sboms:
+            sbom.abort()
+        raise
+    if metrics is not None:
+        metrics.finish(True, {'scan': scanned - start, 'to_dict': serialized - scanned,
+                              'save': time.perf_counter() - serialized})
+    if scanner_obj.profile is not None:
+        print(scanner_obj.profile.report(args.profile_top))
+        scanner_obj.profile.save(args.profile)
+    if memprofile is not None:
+        memprofile.finish(args.profile_top)
+        print(memprofile.report(args.profile_top))
+        memprofile.save(args.memprofile, args.profile_top)
 
 if __name__ == '__main__':
     main()
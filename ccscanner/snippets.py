@@ -0,0 +1,49 @@
+"""
+Fill the context of the evidence of scan results from the scanned files, e.g.
+
+    python ccscanner/snippets.py -r results.json -o results.snippets.json
+
+Evidence keeps its text in context only when scanned with --snippets, but
+always has the byte offset and length of the text in its file. The text is
+read back from there, as long as the file did not change since the scan.
+Results of --git-rev are read from the scanned commit, archives are skipped.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+
+file_dir = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(file_dir, '..'))
+
+from ccscanner.utils.snippets import fill_snippets
+from ccscanner.utils.utils import save_js_atomic
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-r', type=str, required=True,
+        help='results file of the scanner')
+parser.add_argument('-o', type=str, default=None,
+        help='output file, the results file itself by default')
+parser.add_argument('--overwrite', action='store_true',
+        help='also replace the context kept by --snippets')
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+def main():
+    args = parser.parse_args()
+    try:
+        with open(args.r) as read_f:
+            res = json.load(read_f)
+    except (OSError, ValueError) as e:
+        parser.error('cannot load %s: %s' % (args.r, e))
+    if not isinstance(res, dict) or 'extractors' not in res:
+        parser.error('not a results file: ' + args.r)
+    print('%d snippets filled' % fill_snippets(res, args.overwrite))
+    save_js_atomic(res, args.o or args.r)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+## confidences in increasing order, anything else ranks lowest
+CONFIDENCES = ['', 'Low', 'High']
+
+
+def confidence_rank(confidence):
+    if confidence in CONFIDENCES:
+        return CONFIDENCES.index(confidence)
+    return -1
+
+
+class LibraryRecord(object):
+    """One library of a repository, merged from every dependency found for it."""
+    __slots__ = ('unified_name', 'names', 'versions', 'confidence', 'evidence', 'count')
+
+    def __init__(self, unified_name) -> None:
+        self.unified_name = unified_name
+        self.names = {}
+        self.versions = {}
+        self.confidence = None
+        self.evidence = {}
+        self.count = 0
+
+    def add(self, dep, file, extractor_type):
+        self.count += 1
+        self.names[dep.depname] = None
+        if dep.version is not None:
+            self.versions[(dep.version, dep.version_op)] = None
+        if self.confidence is None or confidence_rank(dep.confidence) > confidence_rank(self.confidence):
+            self.confidence = dep.confidence
+        self.evidence[(file, dep.line, dep.extractor_type or extractor_type)] = None
+
+    def to_dict(self, file_ids=None):
+        if file_ids is not None:
+            files = [file_ids.setdefault(file, len(file_ids)) for file, _, _ in self.evidence]
+        else:
+            files = [file for file, _, _ in self.evidence]
+        return {
+            'unified_name': self.unified_name,
+            'names': list(self.names),
+            'versions': [{'version': version, 'version_op': op} for version, op in self.versions],
+            'confidence': self.confidence,
+            'count': self.count,
+            'evidence': [{'file': file, 'line': line, 'extractor_type': extractor_type}
+                         for file, (_, line, extractor_type) in zip(files, self.evidence)],
+        }
+
+
+class DependencyIndex(object):
+    """
+    Hash index of the dependencies of one repository keyed by unified_name,
+    fed with every extractor as the scan goes.
+    """
+
+    def __init__(self) -> None:
+        self.libraries = {}
+
+    def add(self, extractor):
+        for dep in extractor.deps:
+            record = self.libraries.get(dep.unified_name)
+            if record is None:
+                record = self.libraries[dep.unified_name] = LibraryRecord(dep.unified_name)
+            record.add(dep, extractor.target, extractor.type)
+
+    def to_list(self, file_ids=None):
+        return [record.to_dict(file_ids) for record in self.libraries.values()]
@@ -0,0 +1,47 @@
+import logging
+from ccscanner.utils.subtree import SubtreeCache
+from ccscanner.extractors.registry import load_extractor
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+class BlobCache(object):
+    """
+    Extraction results of git blobs by blob OID and file name (the name
+    decides the extractor and parts of its output). Entries live in memory
+    for the whole scan and optionally in a cache directory shared by scans.
+    An entry is (rejected extractor type, extractor), both may be None, and
+    is kept with the extractor as its to_dict().
+    """
+
+    def __init__(self, path=None, options='') -> None:
+        self.entries = {}
+        self.store = SubtreeCache(path, 'blob|' + options) if path is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, oid, filename):
+        key = '%s:%s' % (oid, filename)
+        entry = self.entries.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+            if entry is not None:
+                self.entries[key] = entry
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # a new extractor every time, it is rebased by the caller
+        return entry['rejected'], load_extractor(entry['extractor']) if entry['extractor'] is not None else None
+
+    def put(self, oid, filename, entry):
+        key = '%s:%s' % (oid, filename)
+        rejected, extractor = entry
+        entry = {'rejected': rejected, 'extractor': extractor.to_dict() if extractor is not None else None}
+        self.entries[key] = entry
+        if self.store is not None:
+            try:
+                self.store.put(key, entry)
+            except Exception as e:
+                logger.error(e)
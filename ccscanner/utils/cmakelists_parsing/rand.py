@@ -1,34 +1,49 @@
 import random
 
-def file(n=100, pcommand=0.9, k=15):
-    '\n'.join(command_or_comment(pcom, k) for _ in range(n))
+def file(n=100, pcommand=0.9, k=15, rng=random):
+    return '\n'.join(command_or_comment(pcommand, k, rng) for _ in range(n))
 
-def command_or_comment(pcommand, k):
-    return command(k) if random.random() < pcommand else comment()
+def command_or_comment(pcommand, k, rng=random):
+    return command(k, rng) if rng.random() < pcommand else comment(k, rng)
 
-def command(k):
-    args_part = ''.join(intersperse(args(), ['\n', ' ']))
-    return ''.join([identifier(k), '(', args_part, ')'])
+def command(k, rng=random):
+    args_part = ''.join(intersperse(args(k, rng), ['\n', ' '], rng))
+    return ''.join([identifier(k, rng), '(', args_part, ')'])
 
-def intersperse(ls, seps):
+def comment(k, rng=random):
+    return '# ' + ' '.join(identifier(k, rng) for _ in range(rng.randint(0, 8)))
+
+def intersperse(ls, seps, rng=random):
     """
     intersperse(ls, seps) puts a separator between each element of
     ls, randomly chosen from seps.
     """
-    return [y for x in ls for y in [x, random.choice(seps)]][:-1]
+    return [y for x in ls for y in [x, rng.choice(seps)]][:-1]
 
-numbers = map(str, range(10))
-low_letters = map(chr, range(ord('a'), ord('z') + 1))
+numbers = list(map(str, range(10)))
+low_letters = list(map(chr, range(ord('a'), ord('z') + 1)))
 high_letters = [c.upper() for c in low_letters]
 identifier_chars = numbers + low_letters + high_letters + ['_']
 
-def identifier(k):
+def identifier(k, rng=random):
     """
     identifier(k) generates an identifier with up to k letters.
     """
-    return ''.join(random.choice(identifier_chars)
-                   for _ in range(random.randint(1, k+1)))
-
-def args():
-    pass
+    return ''.join(rng.choice(identifier_chars)
+                   for _ in range(rng.randint(1, k)))
 
+def args(k=15, rng=random):
+    """
+    args(k) generates up to k arguments, each either an identifier, a
+    quoted string or a variable reference.
+    """
+    result = []
+    for _ in range(rng.randint(0, k)):
+        kind = rng.random()
+        if kind < 0.6:
+            result.append(identifier(k, rng))
+        elif kind < 0.8:
+            result.append('"' + identifier(k, rng) + '"')
+        else:
+            result.append('${' + identifier(k, rng) + '}')
+    return result
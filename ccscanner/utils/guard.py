@@ -0,0 +1,137 @@
+import os
+import time
+import logging
+import multiprocessing
+from ccscanner.utils.reader import FileBuffer
+from ccscanner.extractors.registry import extract
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+## how often a running extractor is checked against the limits, in seconds
+POLL_INTERVAL = 0.05
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+## forked workers start at once with every module of the scanner already imported
+START_METHOD = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+
+
+class LimitExceeded(Exception):
+    def __init__(self, reason, limit) -> None:
+        super().__init__('%s (%s)' % (reason, limit))
+        self.reason = reason
+        self.limit = limit
+
+
+def process_rss(pid):
+    # resident set size in bytes, None where /proc is not available
+    try:
+        with open('/proc/%d/statm' % pid) as read_f:
+            return int(read_f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def worker_main(conn):
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        extractor_type, arg, path, data, keep_context, profile, max_size, kwargs = job
+        if data is None:
+            buffer = FileBuffer(path, max_size=max_size)
+        else:
+            buffer = FileBuffer.from_bytes(path, data, max_size)
+        try:
+            result = (extract(extractor_type, arg, buffer, keep_context, profile, **kwargs), None)
+        except Exception as e:
+            result = (None, str(e))
+        finally:
+            buffer.release()
+        conn.send(result)
+
+
+class ExtractorWorker(object):
+    """
+    Runs extractors in a child process, so that a file exceeding the time
+    budget or growing the process by more than the RSS cap can be stopped.
+    The cap is on the growth over the RSS of the worker when it started: a
+    forked worker starts with the resident pages of the scanner. The
+    process is killed when a limit is hit and recycled after a file leaving
+    it above the cap; a new one is started for the next file.
+    """
+
+    def __init__(self, timeout=None, rss_limit=None) -> None:
+        self.timeout = timeout
+        self.rss_limit = rss_limit
+        self.process = None
+        self.conn = None
+        self.started = 0
+        # rss of the worker when it started
+        self.baseline = 0
+
+    def start(self):
+        context = multiprocessing.get_context(START_METHOD)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.started += 1
+        if self.rss_limit is not None:
+            self.baseline = process_rss(self.process.pid) or 0
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+            self.process.join(1)
+        except OSError:
+            pass
+        self.stop()
+
+    def over_rss(self):
+        if self.rss_limit is None:
+            return False
+        rss = process_rss(self.process.pid)
+        return rss is not None and rss - self.baseline > self.rss_limit
+
+    def extract(self, extractor_type, arg, buffer, keep_context=True, profile=False, **kwargs):
+        if self.process is None:
+            self.start()
+        # files are read again by the worker, only content already in memory is sent
+        data = bytes(buffer.data) if buffer.in_memory else None
+        self.conn.send((extractor_type, arg, buffer.path, data, keep_context, profile, buffer.max_size, kwargs))
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while not self.conn.poll(POLL_INTERVAL):
+            if deadline is not None and time.monotonic() > deadline:
+                self.stop()
+                raise LimitExceeded('timeout', '%gs' % self.timeout)
+            if self.over_rss():
+                self.stop()
+                raise LimitExceeded('oversize', 'rss')
+            if not self.process.is_alive():
+                self.stop()
+                raise RuntimeError('extractor worker died on ' + buffer.path)
+        try:
+            extractor, error = self.conn.recv()
+        except EOFError:
+            self.stop()
+            raise RuntimeError('extractor worker died on ' + buffer.path)
+        if self.over_rss():
+            # the file fitted, the next one starts in a fresh process
+            self.stop()
+        if error is not None:
+            raise RuntimeError(error)
+        return extractor
@@ -0,0 +1,126 @@
+import os
+import json
+import tracemalloc
+
+## frames kept per allocation, the innermost one is the source line reported
+MEMPROFILE_FRAMES = 1
+## allocations of the profiler itself are left out of the snapshots
+## and so are the allocations of the import system, the modules a run imports are not what it retained
+SNAPSHOT_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+                    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'))
+
+
+def frame_key(statistic):
+    frame = statistic.traceback[0]
+    return '%s:%d' % (frame.filename, frame.lineno)
+
+
+class MemoryProfile(object):
+    """
+    Allocations of the extractors under --memprofile, traced by tracemalloc.
+    Every extractor run is measured: the memory it still holds once it has
+    returned and released its file (retained) and the highest it allocated on
+    top of what was there before (peak). Every `every`th run is also wrapped
+    in two snapshots, so that what it retained is attributed to source lines.
+    The snapshot taken at the end lists the top allocators of the whole scan.
+    """
+
+    def __init__(self, every=1, frames=MEMPROFILE_FRAMES) -> None:
+        self.every = every
+        self.runs = 0
+        # extractor type -> totals
+        self.types = {}
+        # extractor type -> {source line: retained bytes}
+        self.lines = {}
+        self.snapshot = None
+        self.baseline = 0
+        self.end = None
+        tracemalloc.start(frames)
+
+    def before(self):
+        self.runs += 1
+        self.snapshot = None
+        if self.every and self.runs % self.every == 0:
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+
+    def after(self, extractor_type):
+        current, peak = tracemalloc.get_traced_memory()
+        total = self.types.setdefault(extractor_type, {'files': 0, 'retained': 0, 'peak_max': 0, 'peak_total': 0})
+        total['files'] += 1
+        total['retained'] += current - self.baseline
+        total['peak_max'] = max(total['peak_max'], peak - self.baseline)
+        total['peak_total'] += peak - self.baseline
+        if self.snapshot is None:
+            return
+        lines = self.lines.setdefault(extractor_type, {})
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        for statistic in snapshot.compare_to(self.snapshot, 'lineno'):
+            if statistic.size_diff > 0:
+                key = frame_key(statistic)
+                lines[key] = lines.get(key, 0) + statistic.size_diff
+        self.snapshot = None
+
+    def finish(self, top=20):
+        # top allocators of the memory still traced when the scan is done
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        tracemalloc.stop()
+        self.end = {
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'top_allocators': [{'line': frame_key(statistic), 'bytes': statistic.size, 'count': statistic.count}
+                               for statistic in snapshot.statistics('lineno')[:top]],
+        }
+
+    def top_lines(self, top=20):
+        lines = [(size, extractor_type, line) for extractor_type, sizes in self.lines.items()
+                 for line, size in sizes.items()]
+        return sorted(lines, reverse=True)[:top]
+
+    def report(self, top=20):
+        lines = []
+        if self.end is not None:
+            lines.append('traced: %d bytes at the end, %d bytes at the peak'
+                         % (self.end['traced_bytes'], self.end['traced_peak_bytes']))
+        lines.extend(['', 'per extractor type:',
+                      '%-9s %6s %12s %12s %12s' % ('type', 'files', 'retained', 'peak max', 'peak mean')])
+        for extractor_type, total in sorted(self.types.items(), key=lambda item: item[1]['retained'], reverse=True):
+            lines.append('%-9s %6d %12d %12d %12d' % (extractor_type, total['files'], total['retained'],
+                                                      total['peak_max'], total['peak_total'] // total['files']))
+        sampled = 'every extractor run' if self.every == 1 else 'one in %d extractor runs' % self.every
+        lines.extend(['', 'retained by source line (%s):' % (sampled if self.every else 'not sampled'),
+                      '%12s  %-9s %s' % ('bytes', 'type', 'line')])
+        for size, extractor_type, line in self.top_lines(top):
+            lines.append('%12d  %-9s %s' % (size, extractor_type, self.short_path(line)))
+        if self.end is not None:
+            lines.extend(['', 'top allocators at the end:', '%12s %8s  %s' % ('bytes', 'count', 'line')])
+            for allocator in self.end['top_allocators']:
+                lines.append('%12d %8d  %s' % (allocator['bytes'], allocator['count'],
+                                                self.short_path(allocator['line'])))
+        return '\n'.join(lines)
+
+    @staticmethod
+    def short_path(line):
+        # source lines of the scanner relative to the package
+        package_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        if line.startswith(package_dir + os.sep):
+            return line[len(package_dir) + 1:]
+        return line
+
+    def to_dict(self, top=20):
+        return {
+            'runs': self.runs,
+            'every': self.every,
+            'types': self.types,
+            'lines': self.lines,
+            'top_lines': [{'bytes': size, 'type': extractor_type, 'line': line}
+                          for size, extractor_type, line in self.top_lines(top)],
+            'end': self.end,
+        }
+
+    def save(self, path, top=20):
+        with open(path, 'w') as write_f:
+            json.dump(self.to_dict(top), write_f, indent=2)
@@ -0,0 +1,134 @@
+import os
+import time
+
+## seconds between two writes of the metrics file while a scan runs
+METRICS_INTERVAL = 30.0
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (name, escape_label(value)) for name, value in sorted(labels.items()))
+
+
+class MetricsText(object):
+    """
+    Text exposition format of Prometheus, one HELP/TYPE header per metric
+    followed by its samples.
+    """
+
+    def __init__(self, labels=None) -> None:
+        self.labels = labels or {}
+        self.lines = []
+
+    def metric(self, name, metric_type, help_text, samples):
+        # samples: [(labels, value)], a metric without samples is left out
+        if not samples:
+            return
+        self.lines.append('# HELP %s %s' % (name, help_text))
+        self.lines.append('# TYPE %s %s' % (name, metric_type))
+        for labels, value in samples:
+            labels = dict(self.labels, **labels)
+            self.lines.append('%s%s %s' % (name, format_labels(labels), repr(float(value))))
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+class MetricsFile(object):
+    """
+    Writes the counters of a running scan to a .prom file of the textfile
+    collector of node_exporter: at the start, every `interval` seconds while
+    the scan runs and once more when it is done. The file is replaced
+    atomically, the collector never reads half of it.
+    """
+
+    def __init__(self, path, target, interval=METRICS_INTERVAL) -> None:
+        self.path = path
+        self.labels = {'target': target}
+        self.interval = interval
+        self.scanner = None
+        self.start_time = time.time()
+        self.start = time.perf_counter()
+        self.next_write = self.start + interval
+        self.phases = {}
+
+    def attach(self, scanner):
+        self.scanner = scanner
+        self.write()
+
+    def tick(self):
+        # called once per directory, writes when the interval has passed
+        if time.perf_counter() >= self.next_write:
+            self.write()
+
+    def finish(self, success, phases=None):
+        self.phases.update(phases or {})
+        self.write(running=False, success=success)
+
+    def write(self, running=True, success=None):
+        now = time.perf_counter()
+        self.next_write = now + self.interval
+        text = self.render(running, success, now)
+        tmp_path = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp_path, 'w') as write_f:
+            write_f.write(text)
+        os.replace(tmp_path, self.path)
+
+    def render(self, running, success, now):
+        metrics = MetricsText(self.labels)
+        metrics.metric('ccscanner_scan_running', 'gauge', 'Whether the scan is still running.', [({}, running)])
+        if success is not None:
+            metrics.metric('ccscanner_scan_success', 'gauge', 'Whether the last scan finished without an error.',
+                           [({}, success)])
+        metrics.metric('ccscanner_scan_start_timestamp_seconds', 'gauge', 'Unix time the scan started at.',
+                       [({}, self.start_time)])
+        metrics.metric('ccscanner_last_update_timestamp_seconds', 'gauge', 'Unix time this file was written at.',
+                       [({}, time.time())])
+        phases = dict(self.phases)
+        if running or 'scan' not in phases:
+            phases['scan'] = now - self.start
+        scanner = self.scanner
+        if scanner is not None:
+            self.render_scanner(metrics, scanner, phases)
+        metrics.metric('ccscanner_phase_duration_seconds', 'gauge', 'Seconds spent in each phase of the scan.',
+                       [({'phase': phase}, seconds) for phase, seconds in sorted(phases.items())])
+        return metrics.text()
+
+    @staticmethod
+    def render_scanner(metrics, scanner, phases):
+        metrics.metric('ccscanner_files_visited_total', 'counter', 'Files listed in the scanned tree.',
+                       [({}, scanner.files_visited)])
+        metrics.metric('ccscanner_files_classified_total', 'counter', 'Files handed to an extractor, by ecosystem.',
+                       [({'ecosystem': name}, count) for name, count in sorted(scanner.classified.items())])
+        metrics.metric('ccscanner_extractor_errors_total', 'counter', 'Files an extractor failed on, by extractor type.',
+                       # every classified ecosystem has a series, so that rates start at zero
+                       [({'type': name}, scanner.errors.get(name, 0))
+                        for name in sorted(set(scanner.classified) | set(scanner.errors))])
+        skipped = {}
+        for record in scanner.skipped:
+            skipped[record['reason']] = skipped.get(record['reason'], 0) + 1
+        metrics.metric('ccscanner_files_skipped_total', 'counter', 'Files not extracted, by reason.',
+                       [({'reason': reason}, count) for reason, count in sorted(skipped.items())])
+        metrics.metric('ccscanner_sniff_rejects_total', 'counter', 'Files rejected by content sniffing, by type.',
+                       [({'type': name}, count) for name, count in sorted(scanner.sniff_rejects.items())])
+        metrics.metric('ccscanner_dependencies_total', 'counter', 'Dependencies emitted by the extractors.',
+                       [({}, scanner.deps_emitted)])
+        metrics.metric('ccscanner_bytes_read_total', 'counter', 'Bytes of the files handed to an extractor.',
+                       [({}, scanner.bytes_read)])
+        caches = scanner.cache_stats()
+        metrics.metric('ccscanner_cache_lookups_total', 'counter', 'Lookups of the result caches.',
+                       [({'cache': name}, lookups) for name, (lookups, _) in sorted(caches.items())])
+        metrics.metric('ccscanner_cache_hits_total', 'counter', 'Results served from the caches.',
+                       [({'cache': name}, hits) for name, (_, hits) in sorted(caches.items())])
+        metrics.metric('ccscanner_cache_hit_ratio', 'gauge', 'Share of the cache lookups served from the cache.',
+                       [({'cache': name}, hits / lookups) for name, (lookups, hits) in sorted(caches.items())
+                        if lookups])
+        if scanner.profile is not None:
+            # the finer phases are only measured under --profile
+            for phase, seconds in scanner.profile.phase_totals().items():
+                phases[phase] = seconds
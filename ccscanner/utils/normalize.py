@@ -0,0 +1,41 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+VERSION_SUFFIX_PATTERN = re.compile(r'[._-]?\d+(\.\d+){1,6}([._-]?(snapshot|release|final|alpha|beta|rc$|[a-zA-Z]{1,3}[_-]?\d{1,8}))?$')
+COMPONENT_SUFFIXES = ('_find', '_major', '_minor', '_min', '_patchlevel', '_patch', '_debug')
+PACKAGE_SUFFIXES = ['-dev', '_dev', '-src', '_src']
+CACHE_SIZE = 65536
+
+
+class NormalizedName(NamedTuple):
+    name: str
+    version: Optional[str]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize(name):
+    """
+    Unified name of a library and the version found in its suffix,
+    e.g. libboost_1.82.0-dev -> (boost, 1.82.0). Results are memoized, the
+    same few thousand names come up again and again.
+    """
+    name = name.lower()
+    if name.startswith('lib'):
+        name = name[3:]
+    while(name.endswith(COMPONENT_SUFFIXES)):
+        name = '_'.join(name.split('_')[:-1])
+    for suffix in PACKAGE_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    version = VERSION_SUFFIX_PATTERN.search(name)
+    if version is not None:
+        name = name[:version.start()].strip('._-')
+        version = version.group(0).strip('._-')
+    return NormalizedName(name, version)
+
+
+def normalize_many(names):
+    # every distinct name is normalized once
+    normalized = {name: normalize(name) for name in set(names)}
+    return [normalized[name] for name in names]
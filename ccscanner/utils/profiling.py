@@ -0,0 +1,107 @@
+import json
+import time
+
+## fields of a file record holding seconds
+PHASES = ['classify', 'sniff', 'read', 'extract']
+
+
+class ScanProfile(object):
+    """
+    Timings of a scan under --profile: one record per classified file with
+    the time spent classifying, sniffing, reading and extracting it, the time
+    of each analyzer of its extractor, its size and its dependency count.
+    Files which are not classified only add to the visited count and to the
+    total classification time.
+    """
+
+    def __init__(self) -> None:
+        self.records = []
+        self.current = None
+        self.visited = 0
+        self.classify_seconds = 0.0
+        self.start = time.perf_counter()
+        self.seconds = None
+
+    def classified(self, seconds):
+        self.visited += 1
+        self.classify_seconds += seconds
+
+    def add(self, path, extractor_type, classify_seconds):
+        # the record the scanner fills while it handles the file
+        self.current = {'path': path, 'type': extractor_type, 'status': 'ok', 'classify': classify_seconds,
+                        'sniff': 0.0, 'read': 0.0, 'extract': 0.0, 'bytes': 0, 'deps': 0, 'analyzers': {}}
+        self.records.append(self.current)
+        return self.current
+
+    def extracted(self, extractor, seconds):
+        self.current['extract'] = seconds
+        self.current['deps'] = len(extractor.deps)
+        # extractors without sub-analyzers are one analyzer
+        self.current['analyzers'] = extractor.timings or {extractor.type: seconds}
+        # timings are not kept with the results, e.g. in the subtree cache
+        extractor.timings = None
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.start
+
+    def phase_totals(self):
+        # seconds per phase over the whole scan, classification counts every visited file
+        totals = {phase: 0.0 for phase in PHASES}
+        for record in self.records:
+            for phase in PHASES[1:]:
+                totals[phase] += record[phase]
+        totals['classify'] = self.classify_seconds
+        return totals
+
+    @staticmethod
+    def file_seconds(record):
+        return sum(record[phase] for phase in PHASES)
+
+    def slowest(self, top):
+        return sorted(self.records, key=self.file_seconds, reverse=True)[:top]
+
+    def ecosystems(self):
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['type'], {'files': 0, 'bytes': 0, 'deps': 0, 'seconds': 0.0,
+                                                       'statuses': {}, 'analyzers': {}})
+            total['files'] += 1
+            total['bytes'] += record['bytes']
+            total['deps'] += record['deps']
+            total['seconds'] += self.file_seconds(record)
+            total['statuses'][record['status']] = total['statuses'].get(record['status'], 0) + 1
+            for name, seconds in record['analyzers'].items():
+                total['analyzers'][name] = total['analyzers'].get(name, 0.0) + seconds
+        return totals
+
+    def report(self, top=20):
+        lines = ['scan: %.3fs, %d files visited, %d classified, classification %.3fs'
+                 % (self.seconds or 0.0, self.visited, len(self.records), self.classify_seconds),
+                 '', 'slowest files:',
+                 '%10s %10s %10s %6s  %-9s %s' % ('seconds', 'read', 'bytes', 'deps', 'type', 'path')]
+        for record in self.slowest(top):
+            lines.append('%10.4f %10.4f %10d %6d  %-9s %s' % (self.file_seconds(record), record['read'],
+                                                              record['bytes'], record['deps'], record['type'],
+                                                              record['path']))
+        lines.extend(['', 'per ecosystem:',
+                      '%-9s %6s %10s %12s %7s  %s' % ('type', 'files', 'seconds', 'bytes', 'deps', 'slowest analyzer')])
+        ecosystems = self.ecosystems()
+        for extractor_type in sorted(ecosystems, key=lambda name: ecosystems[name]['seconds'], reverse=True):
+            total = ecosystems[extractor_type]
+            analyzer = max(total['analyzers'].items(), key=lambda item: item[1], default=('', 0.0))
+            lines.append('%-9s %6d %10.4f %12d %7d  %s %.4fs' % (extractor_type, total['files'], total['seconds'],
+                                                                 total['bytes'], total['deps'], *analyzer))
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        return {
+            'seconds': self.seconds,
+            'visited': self.visited,
+            'classify_seconds': self.classify_seconds,
+            'ecosystems': self.ecosystems(),
+            'files': self.records,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as write_f:
+            json.dump(self.to_dict(), write_f, indent=2)
@@ -0,0 +1,229 @@
+import bisect
+import codecs
+import mmap
+import os
+import re
+
+## files larger than MAX_FILE_SIZE are not read at all
+MAX_FILE_SIZE = 64 * 1024 * 1024
+## files of at least MMAP_THRESHOLD bytes are memory-mapped instead of read
+MMAP_THRESHOLD = 1024 * 1024
+
+## utf-32 boms start with the utf-16 ones, so they have to be tested first.
+## (bom, encoding of the file, codec of the bytes after the bom)
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32', 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32', 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig', 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16', 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16', 'utf-16-be'),
+]
+## bytes which make the decoded text differ from the bytes: non-ascii ones and
+## carriage returns, which are turned into newlines. \x1c-\x1f are whitespace
+## to str patterns only, so that \s would match differently
+NON_TEXT_BYTE = re.compile(b'[\x1c-\x1f\x80-\xff\r]')
+## invalid utf-8 bytes decoded with surrogateescape, they are dropped from the text
+DROPPED_BYTE = re.compile('[\udc80-\udcff]')
+## line ends before universal newlines, a \r and a \n become one once the bytes between them are dropped
+RAW_NEWLINE = re.compile('\r[\udc80-\udcff]*\n|\r|\n')
+NEWLINE = re.compile('\n')
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+def sniff_bom(head):
+    # (bom, encoding, codec) of the bom head starts with, None without one
+    for bom in BOMS:
+        if head.startswith(bom[0]):
+            return bom
+    return None
+
+
+class OffsetMap(object):
+    """
+    Byte offsets in a file of offsets in its decoded text. The file is decoded
+    again keeping invalid bytes and line ends as they are, its lines are the
+    lines of the text: the byte offset of every line start is found once and
+    the characters of the line before an offset are encoded again.
+    """
+
+    def __init__(self, data, text, bom=b'', codec='utf-8') -> None:
+        self.text = text
+        self.codec = codec
+        # invalid utf-8 bytes decode to lone surrogates, which encode to the same bytes
+        self.errors = 'surrogateescape' if codec == 'utf-8' else 'ignore'
+        self.raw = str(memoryview(data)[len(bom):], codec, self.errors)
+        self.text_starts = [0]
+        self.text_starts.extend(match.end() for match in NEWLINE.finditer(text))
+        self.raw_starts = [0]
+        self.byte_starts = [len(bom)]
+        for match in RAW_NEWLINE.finditer(self.raw):
+            line = self.raw[self.raw_starts[-1]:match.end()]
+            self.byte_starts.append(self.byte_starts[-1] + len(line.encode(codec, self.errors)))
+            self.raw_starts.append(match.end())
+
+    def byte_offset(self, offset):
+        line = bisect.bisect_right(self.text_starts, offset) - 1
+        start = self.raw_starts[line]
+        end = start + offset - self.text_starts[line]
+        if DROPPED_BYTE.search(self.raw, start, end) is not None:
+            # the dropped bytes are not in the text, they are skipped up to the character at offset
+            remaining = offset - self.text_starts[line]
+            end = start
+            while remaining:
+                if DROPPED_BYTE.match(self.raw, end) is None:
+                    remaining -= 1
+                end += 1
+        return self.byte_starts[line] + len(self.raw[start:end].encode(self.codec, self.errors))
+
+
+class FileBuffer(object):
+    """
+    A file opened once and shared by the scanner and the extractors.
+    Exposes the same content as bytes (data), text and lines. The file is read
+    lazily: prefix() only reads the first bytes, a later full read continues
+    from the same handle. Large files are memory-mapped.
+    """
+
+    def __init__(self, path, data=None, max_size=MAX_FILE_SIZE, mmap_threshold=MMAP_THRESHOLD) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.mmap_threshold = mmap_threshold
+        self.encoding = None
+        self.bom = None
+        self._handle = None
+        self._head = b''
+        self._data = data
+        self._from_disk = data is None
+        self._text = None
+        self._lines = None
+        self._ascii = None
+        self._offsets = None
+        if data is not None:
+            self.size = len(data)
+        else:
+            self.size = os.stat(path).st_size
+
+    @classmethod
+    def from_bytes(cls, path, data, max_size=MAX_FILE_SIZE):
+        return cls(path, data=data, max_size=max_size)
+
+    @property
+    def in_memory(self):
+        # built from bytes, there is no file to read again
+        return not self._from_disk
+
+    @property
+    def oversize(self):
+        return self.max_size is not None and self.size > self.max_size
+
+    def _open(self):
+        if self._handle is None:
+            self._handle = open(self.path, 'rb')
+        return self._handle
+
+    def prefix(self, size):
+        if self._data is not None:
+            return bytes(self._data[:size])
+        if len(self._head) < size:
+            handle = self._open()
+            self._head += handle.read(size - len(self._head))
+        return self._head[:size]
+
+    @property
+    def data(self):
+        if self._data is None:
+            if self.oversize:
+                raise FileTooLarge(self.path)
+            handle = self._open()
+            try:
+                if self.size >= self.mmap_threshold:
+                    self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    self._data = self._head + handle.read()
+            finally:
+                self.close()
+        return self._data
+
+    @property
+    def text(self):
+        if self._text is None:
+            data = self.data
+            ## without a bom the file is utf-8, invalid bytes are dropped as open(errors='ignore') does
+            self.bom = sniff_bom(data[:4]) or (b'', 'utf-8', 'utf-8')
+            self.encoding = self.bom[1]
+            text = str(memoryview(data), self.encoding, 'ignore')
+            ## universal newlines, as open() in text mode does
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            self._text = text
+        return self._text
+
+    @property
+    def ascii_data(self):
+        # the content of a large file as bytes, without decoding it, when the bytes
+        # are the text: every offset in data is the same offset in text. None when
+        # the file is small, already decoded or not plain ascii
+        if self._ascii is None:
+            self._ascii = False
+            if self._text is None and self.size >= self.mmap_threshold:
+                data = self.data
+                if NON_TEXT_BYTE.search(data) is None:
+                    self._ascii = True
+        return self._data if self._ascii else None
+
+    def byte_offset(self, offset):
+        # byte offset in the file of an offset in text, offsets in ascii_data already are
+        if self._ascii or self._text is None:
+            return offset
+        if len(self._text) == self.size:
+            # every byte was decoded to one character
+            return offset
+        if self._offsets is None:
+            self._offsets = OffsetMap(self.data, self._text, self.bom[0], self.bom[2])
+        return self._offsets.byte_offset(offset)
+
+    def snippet(self, offset, length):
+        # text of length bytes at a byte offset, lines end with \n as in text
+        if self.bom is None:
+            self.bom = sniff_bom(self.prefix(4)) or (b'', 'utf-8', 'utf-8')
+            self.encoding = self.bom[1]
+        text = str(self.data[offset:offset + length], self.bom[2], 'ignore')
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            text = self.text
+            lines = text.split('\n') if text else []
+            if text.endswith('\n'):
+                lines.pop()
+            self._lines = [line.rstrip() for line in lines]
+        return self._lines
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._head = b''
+
+    def release(self):
+        ## drop every view of the content, the buffer can be read again afterwards
+        self.close()
+        self._text = None
+        self._lines = None
+        self._ascii = None
+        self._offsets = None
+        if not self._from_disk:
+            return
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = None
+
+
+def open_buffer(target, max_size=MAX_FILE_SIZE):
+    if isinstance(target, FileBuffer):
+        return target
+    return FileBuffer(target, max_size=max_size)
@@ -0,0 +1,199 @@
+import os
+import abc
+import json
+import uuid
+import time
+
+## formats of --sbom
+SBOM_FORMATS = ['cyclonedx', 'spdx']
+## package url types of the extractors with a registry of their own, the others are generic
+PURL_TYPES = {'conan': 'conan', 'control': 'deb'}
+
+
+def purl_quote(value):
+    # percent-encodes the characters which would split a package url, the
+    # separators of the version (@), qualifiers (?) and subpath (#) included
+    for char in '% @/?#':
+        value = value.replace(char, '%%%02X' % ord(char))
+    return value
+
+
+def purl(name, version, extractor_type):
+    # pkg:<type>/<name>@<version>
+    url = 'pkg:%s/%s' % (PURL_TYPES.get(extractor_type, 'generic'), purl_quote(name))
+    if version is not None:
+        url += '@' + purl_quote(version)
+    return url
+
+
+def utc_timestamp():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+def open_sbom(spec, target):
+    # spec: <format>:<path>
+    sbom_format, sep, path = spec.partition(':')
+    if not sep or sbom_format not in SBOM_FORMATS or not path:
+        raise ValueError('unknown sbom %s, expected one of %s followed by :<path>'
+                         % (spec, ', '.join(SBOM_FORMATS)))
+    if sbom_format == 'cyclonedx':
+        return CycloneDXWriter(path, target)
+    return SPDXWriter(path, target)
+
+
+class SbomWriter(abc.ABC):
+    """
+    Writes the components of an SBOM as the extractors of a scan come in,
+    one per unified name and version. Only the hash index of the components
+    written so far is kept, never the document: the head is written first,
+    then every new component, and the tail once the scan is done. The file
+    is written next to path and moved there by finish(), a failed scan
+    leaves no partial SBOM behind.
+    """
+
+    # key of the component list in the document
+    components_key = None
+
+    def __init__(self, path, target) -> None:
+        self.path = path
+        self.target = target
+        # (unified name, version) -> reference of the component
+        self.components = {}
+        self.tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        self.file = open(self.tmp_path, 'w')
+        head = json.dumps(self.head(), indent=2)
+        # the component list is the last member of the document
+        self.file.write('%s,\n  "%s": [' % (head[:head.rindex('}')].rstrip(), self.components_key))
+
+    @abc.abstractmethod
+    def head(self):
+        # the members of the document written before the component list
+        pass
+
+    @abc.abstractmethod
+    def component(self, ref, name, version, dep, extractor):
+        # the component of a dependency, ref is the reference handed out by reference()
+        pass
+
+    def tail(self):
+        # (key, items) of the lists written after the component list, items may be a generator
+        return []
+
+    def add(self, extractor):
+        for dep in extractor.deps:
+            name = dep.unified_name or dep.depname
+            # a component without a name is invalid in both formats
+            if not name:
+                continue
+            key = (name, dep.version)
+            if key in self.components:
+                continue
+            ref = self.components[key] = self.reference(len(self.components))
+            self.file.write((',\n    ' if len(self.components) > 1 else '\n    ')
+                            + json.dumps(self.component(ref, name, dep.version, dep, extractor)))
+
+    @staticmethod
+    @abc.abstractmethod
+    def reference(index):
+        # reference of the index-th component
+        pass
+
+    def finish(self):
+        self.file.write('\n  ]' if self.components else ']')
+        for key, items in self.tail():
+            self.file.write(',\n  %s: [' % json.dumps(key))
+            empty = True
+            for item in items:
+                self.file.write(('\n    ' if empty else ',\n    ') + json.dumps(item))
+                empty = False
+            self.file.write(']' if empty else '\n  ]')
+        self.file.write('\n}\n')
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class CycloneDXWriter(SbomWriter):
+    """CycloneDX 1.5 JSON, the scanned target is the component the SBOM describes."""
+
+    components_key = 'components'
+
+    def head(self):
+        return {
+            'bomFormat': 'CycloneDX',
+            'specVersion': '1.5',
+            'serialNumber': 'urn:uuid:%s' % uuid.uuid4(),
+            'version': 1,
+            'metadata': {
+                'timestamp': utc_timestamp(),
+                'tools': {'components': [{'type': 'application', 'name': 'ccscanner'}]},
+                'component': {'type': 'application', 'bom-ref': 'target', 'name': self.target},
+            },
+        }
+
+    @staticmethod
+    def reference(index):
+        return 'component-%d' % index
+
+    def component(self, ref, name, version, dep, extractor):
+        extractor_type = dep.extractor_type or extractor.type
+        component = {'type': 'library', 'bom-ref': ref, 'name': name}
+        if version is not None:
+            component['version'] = version
+        component['purl'] = purl(name, version, extractor_type)
+        component['properties'] = [{'name': 'ccscanner:extractor_type', 'value': extractor_type},
+                                   {'name': 'ccscanner:file', 'value': extractor.target}]
+        return component
+
+    def tail(self):
+        return [('dependencies', [{'ref': 'target', 'dependsOn': list(self.components.values())}])]
+
+
+class SPDXWriter(SbomWriter):
+    """SPDX 2.3 JSON, the scanned target is the package the document describes."""
+
+    components_key = 'packages'
+
+    def __init__(self, path, target) -> None:
+        super().__init__(path, target)
+        # the described package comes first in the package list
+        self.components[None] = 'SPDXRef-Target'
+        self.file.write('\n    ' + json.dumps({'name': target, 'SPDXID': 'SPDXRef-Target',
+                                               'downloadLocation': 'NOASSERTION', 'filesAnalyzed': False}))
+
+    def head(self):
+        return {
+            'spdxVersion': 'SPDX-2.3',
+            'dataLicense': 'CC0-1.0',
+            'SPDXID': 'SPDXRef-DOCUMENT',
+            'name': self.target,
+            'documentNamespace': 'https://spdx.org/spdxdocs/ccscanner-%s' % uuid.uuid4(),
+            'creationInfo': {'created': utc_timestamp(), 'creators': ['Tool: ccscanner']},
+            'documentDescribes': ['SPDXRef-Target'],
+        }
+
+    @staticmethod
+    def reference(index):
+        return 'SPDXRef-Package-%d' % index
+
+    def component(self, ref, name, version, dep, extractor):
+        package = {'name': name, 'SPDXID': ref}
+        if version is not None:
+            package['versionInfo'] = version
+        package.update({
+            'downloadLocation': 'NOASSERTION',
+            'filesAnalyzed': False,
+            'externalRefs': [{'referenceCategory': 'PACKAGE-MANAGER', 'referenceType': 'purl',
+                              'referenceLocator': purl(name, version, dep.extractor_type or extractor.type)}],
+            'comment': 'found by the %s extractor in %s' % (dep.extractor_type or extractor.type, extractor.target),
+        })
+        return package
+
+    def tail(self):
+        return [('relationships', ({'spdxElementId': 'SPDXRef-Target', 'relationshipType': 'DEPENDS_ON',
+                                    'relatedSpdxElement': ref}
+                                   for key, ref in self.components.items() if key is not None))]
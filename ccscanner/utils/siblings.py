@@ -0,0 +1,47 @@
+import os
+
+## source -> generated chains of build files living in the same directory.
+## each level is generated from the level before it, files on one level are
+## alternatives of each other (configure.in is the old name of configure.ac).
+GENERATED_CHAINS = [
+    [('configure.ac', 'configure.in'), ('configure',)],
+    [('makefile.am',), ('makefile.in',), ('makefile',)],
+]
+
+## source: scan the hand-written files and skip what is generated from them
+## generated: scan only the most generated file of a chain
+## all: no deduplication
+SIBLING_POLICIES = ['source', 'generated', 'all']
+
+
+def find_skipped_siblings(filenames, policy='source'):
+    """
+    Return {skipped_filename: kept_filename} for the source/generated pairs
+    and the alternatives of one level (configure.ac, configure.in) found in
+    one directory listing.
+    """
+    skipped = {}
+    if policy == 'all':
+        return skipped
+    lower2name = {filename.lower(): filename for filename in filenames}
+    for chain in GENERATED_CHAINS:
+        levels = [[lower2name[name] for name in level if name in lower2name] for level in chain]
+        levels = [level for level in levels if level]
+        if not levels:
+            continue
+        if policy == 'generated':
+            levels = levels[::-1]
+        # alternatives on the kept level are skipped as well, the first name of a level wins
+        kept = levels[0][0]
+        for level in levels:
+            for filename in level:
+                if filename != kept:
+                    skipped[filename] = kept
+    return skipped
+
+
+def skipped_record(root, filename, reason, kept=None):
+    record = {'path': os.path.join(root, filename), 'reason': reason}
+    if kept is not None:
+        record['kept'] = os.path.join(root, kept)
+    return record
@@ -0,0 +1,86 @@
+import re
+from ccscanner.extractors.clib_keys import KEYS as CLIB_KEYS
+
+## only this many bytes are read to decide whether an ambiguous file is worth extracting
+SNIFF_SIZE = 4096
+
+JSON_TOKEN = re.compile(r'("(?:[^"\\]|\\.)*")(\s*:)?|[{}\[\]]')
+CONTROL_FIELD = re.compile(r'^[A-Za-z][A-Za-z0-9-]*:(\s|$)')
+STARLARK_CALL = re.compile(r'^\s*\w+\s*\(', re.MULTILINE)
+
+
+def first_line(text):
+    # first line which is neither empty nor a comment
+    for line in text.split('\n'):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            return line
+    return ''
+
+
+def top_level_keys(text):
+    keys = []
+    depth = 0
+    for token in JSON_TOKEN.finditer(text):
+        if token.group(1) is None:
+            depth += 1 if token.group(0) in '{[' else -1
+        elif depth == 1 and token.group(2) is not None:
+            keys.append(token.group(1)[1:-1])
+    return keys
+
+
+def sniff_clib(text, complete):
+    # npm package.json files share the name with clib ones, they always carry
+    # keys clib does not know (scripts, main, devDependencies...)
+    if not text.lstrip().startswith('{'):
+        return False
+    keys = top_level_keys(text)
+    if any(key not in CLIB_KEYS for key in keys):
+        return False
+    return not complete or 'name' in keys
+
+
+def sniff_build2(text, complete):
+    # a build2 manifest starts with the format version, an empty name `: 1`
+    return first_line(text).replace(' ', '') == ':1'
+
+
+def sniff_control(text, complete):
+    line = first_line(text)
+    return line.startswith('-----BEGIN PGP SIGNED MESSAGE-----') or CONTROL_FIELD.match(line) is not None
+
+
+def sniff_bazel(text, complete):
+    if complete:
+        return 'cc_library' in text or 'cc_binary' in text
+    return STARLARK_CALL.search(text) is not None
+
+
+## filename -> (extractor type, sniffer), only for names shared with other formats
+SNIFFERS = {
+    'package.json': ('clib', sniff_clib),
+    'manifest': ('build2', sniff_build2),
+    'control': ('control', sniff_control),
+    'BUILD': ('bazel', sniff_bazel),
+}
+
+
+def get_sniffer(filename):
+    if filename in SNIFFERS:
+        return SNIFFERS[filename]
+    return SNIFFERS.get(filename.lower())
+
+
+def sniff(buffer, filename, size=SNIFF_SIZE):
+    """
+    Return the extractor type when the prefix of buffer rejects the file,
+    None when the file has to be extracted.
+    """
+    sniffer = get_sniffer(filename)
+    if sniffer is None:
+        return None
+    extractor_type, sniff_func = sniffer
+    text = buffer.prefix(size).decode('utf-8-sig', 'ignore')
+    if sniff_func(text, buffer.size <= size):
+        return None
+    return extractor_type
@@ -0,0 +1,69 @@
+import os
+import logging
+
+from ccscanner.utils.reader import FileBuffer
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+def iter_evidence(res):
+    # (path, dep) of every evidence of a result with an offset into its file
+    file_table = res.get('files', [])
+    for extractor in res['extractors']:
+        for dep in extractor['deps']:
+            if dep.get('offset') is None or dep.get('length') is None:
+                continue
+            path = dep['file'] if dep['file'] is not None else extractor['file']
+            if isinstance(path, int):
+                path = file_table[path]
+            yield path, dep
+
+
+def blob_reader(res):
+    # reads the scanned files of a --git-rev result from its commit
+    import git
+    tree = git.Repo(res['target']).commit(res['commit']).tree
+
+    def read(path):
+        blob = tree / os.path.relpath(path, res['target']).replace(os.sep, '/')
+        return FileBuffer.from_bytes(path, blob.data_stream.read(), max_size=None)
+    return read
+
+
+def file_reader(path):
+    return FileBuffer(path, max_size=None)
+
+
+def fill_snippets(res, overwrite=False):
+    """
+    Fills the context of every evidence of a scan result from the bytes at
+    its offset and length in the file it was found in. Results of --git-rev
+    are read from the scanned commit, results of archives are left as they
+    are. Returns the number of evidence filled.
+    """
+    if 'members' in res:
+        return 0
+    read = blob_reader(res) if 'commit' in res else file_reader
+    filled = 0
+    # evidence of a file comes in a row, one buffer is kept at a time
+    path = buffer = None
+    for dep_path, dep in iter_evidence(res):
+        if dep.get('context') is not None and not overwrite:
+            continue
+        if dep_path != path:
+            if buffer is not None:
+                buffer.release()
+            path = dep_path
+            try:
+                buffer = read(path)
+            except (OSError, KeyError) as e:
+                logger.error('cannot read %s: %s' % (path, e))
+                buffer = None
+        if buffer is None:
+            continue
+        dep['context'] = buffer.snippet(dep['offset'], dep['length'])
+        filled += 1
+    if buffer is not None:
+        buffer.release()
+    return filled
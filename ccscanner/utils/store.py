@@ -0,0 +1,208 @@
+import re
+import time
+import sqlite3
+
+from ccscanner.utils.normalize import normalize
+
+## schemes of --store
+STORE_SCHEMES = ['sqlite']
+## bumped whenever the tables change, older stores are not migrated
+STORE_VERSION = 1
+## version constraints of queries, two-character operators first
+QUERY_OPERATORS = ['>=', '<=', '!=', '=', '<', '>']
+## the numeric part of a version, the rest is ignored when versions are compared
+VERSION_NUMBERS = re.compile('\\d+(\\.\\d+)*')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL UNIQUE,
+    scanned REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    repo_id INTEGER NOT NULL REFERENCES repos(id),
+    path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dependencies (
+    id INTEGER PRIMARY KEY,
+    repo_id INTEGER NOT NULL REFERENCES repos(id),
+    depname TEXT,
+    unified_name TEXT,
+    version TEXT,
+    version_op TEXT,
+    version_key TEXT
+);
+CREATE TABLE IF NOT EXISTS evidence (
+    dependency_id INTEGER NOT NULL REFERENCES dependencies(id),
+    file_id INTEGER REFERENCES files(id),
+    extractor_type TEXT,
+    confidence TEXT,
+    offset INTEGER,
+    length INTEGER,
+    line INTEGER,
+    context TEXT
+);
+CREATE INDEX IF NOT EXISTS files_repo ON files(repo_id);
+CREATE INDEX IF NOT EXISTS dependencies_repo ON dependencies(repo_id);
+CREATE INDEX IF NOT EXISTS dependencies_name ON dependencies(unified_name, version_key);
+CREATE INDEX IF NOT EXISTS dependencies_version ON dependencies(version);
+CREATE INDEX IF NOT EXISTS evidence_dependency ON evidence(dependency_id);
+CREATE INDEX IF NOT EXISTS evidence_type ON evidence(extractor_type);
+"""
+
+
+def version_key(version):
+    # zero-padded numbers compare as text in the order of the versions, 1.2.9 < 1.2.12
+    if version is None:
+        return None
+    numbers = VERSION_NUMBERS.search(version)
+    if numbers is None:
+        return None
+    return '.'.join('%010d' % int(number) for number in numbers.group(0).split('.'))
+
+
+def parse_constraint(constraint):
+    # '<1.2.12' -> ('<', key of 1.2.12), a bare version is an equality
+    constraint = constraint.replace(' ', '')
+    for operator in QUERY_OPERATORS:
+        if constraint.startswith(operator):
+            return operator, version_key(constraint[len(operator):])
+    return '=', version_key(constraint)
+
+
+def open_store(spec):
+    # spec: sqlite:<path>
+    scheme, sep, path = spec.partition(':')
+    if not sep or scheme not in STORE_SCHEMES or not path:
+        raise ValueError('unknown store %s, expected sqlite:<path>' % spec)
+    return ResultStore(path)
+
+
+class ResultStore(object):
+    """
+    Scan results in SQLite: repositories, their files, their dependencies
+    (one row per distinct name and version of a repository) and the evidence
+    of every dependency. A repository is written in one transaction and
+    replaces what was stored for it before.
+    """
+
+    def __init__(self, path) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, STORE_VERSION):
+            raise ValueError('%s is a store of version %d, expected %d' % (path, version, STORE_VERSION))
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute('PRAGMA user_version = %d' % STORE_VERSION)
+
+    def next_id(self, table):
+        return self.connection.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM %s' % table).fetchone()[0]
+
+    def add(self, res, scanned=None):
+        # res: the output of scanner.to_dict()
+        target = res['target']
+        file_table = res.get('files', [])
+        connection = self.connection
+        with connection:
+            self.remove(target)
+            repo_id = connection.execute('INSERT INTO repos (target, scanned) VALUES (?, ?)',
+                                         (target, scanned if scanned is not None else time.time())).lastrowid
+            # ids are handed out here, so that every table is one executemany
+            file_ids = {}
+            next_file = self.next_id('files')
+            dependency_ids = {}
+            next_dependency = self.next_id('dependencies')
+            evidence = []
+            for extractor in res['extractors']:
+                for dep in extractor['deps']:
+                    # files are indexes into the files table, or paths in older results
+                    path = dep['file'] if dep['file'] is not None else extractor['file']
+                    if isinstance(path, int):
+                        path = file_table[path]
+                    file_id = file_ids.get(path)
+                    if file_id is None:
+                        file_id = file_ids[path] = next_file + len(file_ids)
+                    key = (dep['depname'], dep['unified_name'], dep['version'], dep['version_op'])
+                    dependency_id = dependency_ids.get(key)
+                    if dependency_id is None:
+                        dependency_id = dependency_ids[key] = next_dependency + len(dependency_ids)
+                    evidence.append((dependency_id, file_id, dep['extractor_type'] or extractor['type'],
+                                     dep['confidence'], dep['offset'], dep['length'], dep['line'],
+                                     dep.get('context')))
+            connection.executemany('INSERT INTO files (id, repo_id, path) VALUES (?, ?, ?)',
+                                   [(file_id, repo_id, path) for path, file_id in file_ids.items()])
+            connection.executemany('INSERT INTO dependencies (id, repo_id, depname, unified_name, version, '
+                                   'version_op, version_key) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                   [(dependency_id, repo_id, depname, unified_name, version, op,
+                                     version_key(version))
+                                    for (depname, unified_name, version, op), dependency_id
+                                    in dependency_ids.items()])
+            connection.executemany('INSERT INTO evidence (dependency_id, file_id, extractor_type, confidence, '
+                                   'offset, length, line, context) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', evidence)
+        return repo_id
+
+    def remove(self, target):
+        row = self.connection.execute('SELECT id FROM repos WHERE target = ?', (target,)).fetchone()
+        if row is None:
+            return
+        repo_id = row[0]
+        self.connection.execute('DELETE FROM evidence WHERE dependency_id IN '
+                                '(SELECT id FROM dependencies WHERE repo_id = ?)', (repo_id,))
+        self.connection.execute('DELETE FROM dependencies WHERE repo_id = ?', (repo_id,))
+        self.connection.execute('DELETE FROM files WHERE repo_id = ?', (repo_id,))
+        self.connection.execute('DELETE FROM repos WHERE id = ?', (repo_id,))
+
+    @staticmethod
+    def conditions(name=None, version=None, extractor_type=None, target=None):
+        where = []
+        params = []
+        if name is not None:
+            where.append('d.unified_name = ?')
+            params.append(normalize(name).name or name.lower())
+        if version is not None:
+            operator, key = parse_constraint(version)
+            if key is None:
+                raise ValueError('no version in %s' % version)
+            # a dependency without a version never satisfies a constraint
+            where.append('d.version_key %s ?' % operator)
+            params.append(key)
+        if extractor_type is not None:
+            where.append('e.extractor_type = ?')
+            params.append(extractor_type)
+        if target is not None:
+            where.append('r.target = ?')
+            params.append(target)
+        return ' AND '.join(where) or '1', params
+
+    def query(self, name=None, version=None, extractor_type=None, target=None):
+        # one row per evidence: target, path, unified_name, depname, version, version_op, extractor_type, line
+        where, params = self.conditions(name, version, extractor_type, target)
+        return self.connection.execute(
+            'SELECT r.target, f.path, d.unified_name, d.depname, d.version, d.version_op, e.extractor_type, e.line '
+            'FROM dependencies d JOIN evidence e ON e.dependency_id = d.id JOIN repos r ON r.id = d.repo_id '
+            'LEFT JOIN files f ON f.id = e.file_id WHERE %s ORDER BY r.target, f.path, e.line' % where,
+            params).fetchall()
+
+    def repos(self, name=None, version=None, extractor_type=None):
+        where, params = self.conditions(name, version, extractor_type)
+        return [row[0] for row in self.connection.execute(
+            'SELECT DISTINCT r.target FROM dependencies d JOIN evidence e ON e.dependency_id = d.id '
+            'JOIN repos r ON r.id = d.repo_id WHERE %s ORDER BY r.target' % where, params)]
+
+    def targets(self):
+        # every stored repository, with or without dependencies
+        return {row[0] for row in self.connection.execute('SELECT target FROM repos')}
+
+    def top(self, limit=20):
+        # libraries used by the most repositories
+        return self.connection.execute(
+            'SELECT unified_name, COUNT(DISTINCT repo_id) AS repos FROM dependencies '
+            'WHERE unified_name IS NOT NULL GROUP BY unified_name ORDER BY repos DESC, unified_name LIMIT ?',
+            (limit,)).fetchall()
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,314 @@
+import os
+import json
+import hashlib
+import logging
+import subprocess
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+## bump when extractors change their output, older cache entries are ignored then
+CACHE_VERSION = 5
+## only subtrees yielding at least this many extractors are stored
+MIN_SUBTREE_EXTRACTORS = 10
+
+
+def blob_digest(path, size):
+    # same value as the git blob OID of the file
+    digest = hashlib.sha1(b'blob %d\0' % size)
+    with open(path, 'rb') as read_f:
+        for chunk in iter(lambda: read_f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_digest(data):
+    # blob_digest of content already in memory
+    digest = hashlib.sha1(b'blob %d\0' % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def git(worktree, *args):
+    return subprocess.run(['git', '-C', worktree] + list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=True).stdout.decode('utf-8', 'surrogateescape')
+
+
+class GitTrees(object):
+    """
+    Tree OIDs of HEAD for the directories whose content matches HEAD, and
+    blob OIDs of the tracked files which are not modified.
+    """
+
+    def __init__(self, path) -> None:
+        self.worktree = git(path, 'rev-parse', '--show-toplevel').strip()
+        self.trees = {'.': git(self.worktree, 'rev-parse', 'HEAD^{tree}').strip()}
+        for entry in git(self.worktree, 'ls-tree', '-r', '-d', '-z', '--full-tree', 'HEAD').split('\0'):
+            if not entry:
+                continue
+            info, path = entry.split('\t', 1)
+            self.trees[path] = info.split()[2]
+        # modified, untracked and ignored files make every directory above them dirty
+        self.dirty = set()
+        status = git(self.worktree, 'status', '--porcelain', '-z', '--untracked-files=all', '--ignored')
+        entries = status.split('\0')
+        index = 0
+        while index < len(entries):
+            entry = entries[index]
+            index += 1
+            if len(entry) < 4:
+                continue
+            if entry[0] in 'RC':
+                # renames and copies are followed by the original path
+                self.mark_dirty(entries[index])
+                index += 1
+            self.mark_dirty(entry[3:])
+        self.blobs = {}
+        for line in git(self.worktree, 'ls-files', '-s', '-z').split('\0'):
+            if not line:
+                continue
+            info, path = line.split('\t', 1)
+            self.blobs[path] = info.split()[1]
+
+    def mark_dirty(self, path):
+        path = path.rstrip('/')
+        while path:
+            self.dirty.add(path)
+            path = os.path.dirname(path)
+        self.dirty.add('.')
+
+    def relpath(self, path):
+        return os.path.relpath(os.path.abspath(path), self.worktree)
+
+    def tree_oid(self, path):
+        rel = self.relpath(path)
+        if rel in self.dirty or rel.startswith('..'):
+            return None
+        return self.trees.get(rel)
+
+    def blob_oid(self, path):
+        rel = self.relpath(path)
+        if rel in self.dirty:
+            return None
+        return self.blobs.get(rel)
+
+
+class SubtreeHasher(object):
+    """
+    Keys of directories for the subtree cache.
+    A directory whose content matches HEAD of its git repository is keyed by
+    its tree OID without walking it. Any other directory is looked up by the
+    names and sizes of the files the scanner extracts and the keys of its
+    subdirectories, which reads no file. An entry found that way is used only
+    if its content key matches as well, the same hash over the blob OIDs of
+    the files: they are read for it on a hit only, otherwise the digests come
+    from the buffers the scanner reads anyway. Directories without any file
+    to extract have no key. Each directory is hashed once.
+    """
+
+    def __init__(self, target, classify) -> None:
+        self.classify = classify
+        # (path, content) -> key
+        self.keys = {}
+        # directories without any file to extract
+        self.empty = set()
+        # path -> blob digest of the files read by the scanner
+        self.digests = {}
+        try:
+            self.git = GitTrees(target)
+        except (OSError, subprocess.CalledProcessError):
+            self.git = None
+        # directories of the git index with a file to extract below them
+        self.classified_dirs = set()
+        if self.git is not None:
+            for path in self.git.blobs:
+                if self.classify(os.path.basename(path)) is None:
+                    continue
+                path = os.path.dirname(path)
+                while path and path not in self.classified_dirs:
+                    self.classified_dirs.add(path)
+                    path = os.path.dirname(path)
+                self.classified_dirs.add('.')
+
+    def key(self, path, content=False):
+        if (path, content) not in self.keys:
+            self.keys[(path, content)] = self.hash_dir(path, content)
+        return self.keys[(path, content)]
+
+    def content_key(self, path):
+        return self.key(path, True)
+
+    def add_digest(self, path, data):
+        # digest of a file from the content the scanner has read
+        self.digests[path] = data_digest(data)
+
+    def file_digest(self, path):
+        if path in self.digests:
+            return self.digests[path]
+        if self.git is not None:
+            oid = self.git.blob_oid(path)
+            if oid is not None:
+                return oid
+        digest = self.digests[path] = blob_digest(path, os.stat(path).st_size)
+        return digest
+
+    def hash_dir(self, path, content):
+        if self.git is not None:
+            oid = self.git.tree_oid(path)
+            if oid is not None:
+                if self.git.relpath(path) not in self.classified_dirs:
+                    self.empty.add(path)
+                    return None
+                return 'git:' + oid
+        try:
+            entries = sorted(os.scandir(path), key=lambda entry: entry.name)
+        except OSError:
+            return None
+        names = [entry.name for entry in entries]
+        # results of .gitmodules in a checkout depend on the git index, which is not hashed
+        if '.gitmodules' in names and '.git' in names:
+            return None
+        digest = hashlib.sha1()
+        empty = True
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    # the scanner does not follow symlinks either
+                    sub_key = self.key(entry.path, content)
+                    if sub_key is None:
+                        if entry.path in self.empty:
+                            continue
+                        return None
+                    line = 'd %s %s\n' % (entry.name, sub_key)
+                elif self.classify(entry.name) is not None:
+                    if content:
+                        line = 'f %s %s\n' % (entry.name, self.file_digest(entry.path))
+                    else:
+                        line = 's %s %d\n' % (entry.name, os.stat(entry.path).st_size)
+                else:
+                    continue
+            except OSError:
+                return None
+            empty = False
+            digest.update(line.encode('utf-8', 'surrogateescape'))
+        if empty:
+            self.empty.add(path)
+            return None
+        return 'fs:' + digest.hexdigest()
+
+
+class SubtreeCache(object):
+    """
+    Scan results of directories stored by content key, shared by every scan
+    pointing at the same cache directory. Entries are JSON, extractors are
+    kept as their to_dict().
+    """
+
+    def __init__(self, path, options='') -> None:
+        self.path = path
+        self.options = options
+        self.hits = 0
+        self.misses = 0
+
+    def entry_path(self, key):
+        digest = hashlib.sha1(('%d|%s|%s' % (CACHE_VERSION, self.options, key)).encode('utf-8')).hexdigest()
+        return os.path.join(self.path, digest[:2], digest + '.json')
+
+    def get(self, key):
+        path = self.entry_path(key)
+        try:
+            with open(path) as read_f:
+                entry = json.load(read_f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.error('broken subtree cache entry: ' + path)
+            logger.error(e)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        path = self.entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp_path, 'w') as save_f:
+            json.dump(entry, save_f)
+        os.replace(tmp_path, path)
+
+
+class SubtreeRecorder(object):
+    """
+    What the scan found directly in each directory, merged into whole
+    subtrees once the walk is over.
+    """
+
+    def __init__(self, top) -> None:
+        self.top = top
+        self.dirs = {}
+
+    def record(self, root, extractors, skipped, rejects):
+        if extractors or skipped or rejects:
+            self.dirs[root] = (extractors, skipped, rejects)
+
+    def subtree(self, path):
+        # merged results of a subtree whose walk is over
+        extractors, skipped, rejects = [], [], {}
+        prefix = os.path.join(path, '')
+        for root, (dir_extractors, dir_skipped, dir_rejects) in self.dirs.items():
+            if root == path or root.startswith(prefix):
+                extractors.extend(dir_extractors)
+                skipped.extend(dir_skipped)
+                for extractor_type, count in dir_rejects.items():
+                    rejects[extractor_type] = rejects.get(extractor_type, 0) + count
+        return extractors, skipped, rejects
+
+    def parent(self, path):
+        # the directory above path within the scan, None at the top
+        if path == self.top or os.path.dirname(path) == path:
+            return None
+        return os.path.dirname(path)
+
+    def subtrees(self, key, cached=(), min_extractors=MIN_SUBTREE_EXTRACTORS):
+        # (path, key, extractors, skipped, rejects) of every subtree with a key and
+        # enough extractors, so that a library vendored by another repository is
+        # found as well as the whole tree. Subtrees in cached are stored already
+        counts = {}
+        for root, (extractors, _, _) in self.dirs.items():
+            path = root
+            while path is not None:
+                counts[path] = counts.get(path, 0) + len(extractors)
+                path = self.parent(path)
+        selected = {}
+        for path, count in counts.items():
+            if count < min_extractors or path in cached:
+                continue
+            path_key = key(path)
+            if path_key is not None:
+                selected[path] = path_key
+        merged = {path: ([], [], {}) for path in selected}
+        for root, (extractors, skipped, rejects) in self.dirs.items():
+            path = root
+            while path is not None:
+                entry = merged.get(path)
+                if entry is not None:
+                    entry[0].extend(extractors)
+                    entry[1].extend(skipped)
+                    for extractor_type, count in rejects.items():
+                        entry[2][extractor_type] = entry[2].get(extractor_type, 0) + count
+                path = self.parent(path)
+        for path, (extractors, skipped, rejects) in merged.items():
+            yield path, selected[path], extractors, skipped, rejects
+
+
+def relative_entry(path, content_key, extractors, skipped, rejects):
+    # paths of a cache entry are relative to the subtree, they are rebased when loaded
+    return {
+        'content': content_key,
+        'extractors': [(os.path.relpath(extractor.target, path), extractor.to_dict()) for extractor in extractors],
+        'skipped': [dict(record, **{key: os.path.relpath(record[key], path) for key in ('path', 'kept') if key in record})
+                    for record in skipped],
+        'sniff_rejects': rejects,
+    }
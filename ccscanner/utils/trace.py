@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import threading
+
+## categories of the spans, to filter them in the trace viewer
+CATEGORIES = ['scan', 'walk', 'classify', 'sniff', 'read', 'extract', 'serialize']
+
+
+def now_us():
+    # the monotonic clock of perf_counter is shared by the processes of a machine,
+    # so that the events of batch workers line up
+    return time.perf_counter() * 1e6
+
+
+class Tracer(object):
+    """
+    Records complete ("X") events of the Trace Event Format, tagged with the
+    process and thread ids, to be loaded in Perfetto or chrome://tracing.
+    Events are kept in memory and written by save(), or moved to a file of
+    parts with flush() when several processes trace one run.
+    """
+
+    def __init__(self, process_name=None) -> None:
+        self.pid = os.getpid()
+        self.events = []
+        if process_name is not None:
+            self.events.append({'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+                                'args': {'name': process_name}})
+
+    def complete(self, name, category, start, end, args=None):
+        # start and end in perf_counter seconds
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': round(start * 1e6, 3),
+                 'dur': round((end - start) * 1e6, 3), 'pid': self.pid, 'tid': threading.get_native_id()}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def span(self, name, category, args=None):
+        return Span(self, name, category, args)
+
+    def iter_spans(self, name, category, iterable):
+        # times every step of iterable, e.g. the directory listings of os.walk
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.complete(name, category, start, time.perf_counter())
+            yield item
+
+    def flush(self, write_f):
+        # events as json lines, the parts of merge_parts
+        for event in self.events:
+            write_f.write(json.dumps(event) + '\n')
+        write_f.flush()
+        self.events = []
+
+    def save(self, path):
+        with open(path, 'w') as write_f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, write_f)
+
+
+class Span(object):
+    def __init__(self, tracer, name, category, args=None) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.category, self.start, time.perf_counter(), self.args)
+        return False
+
+
+def merge_parts(paths, output, events=()):
+    # streams the json lines of paths and events into one trace file
+    with open(output, 'w') as write_f:
+        write_f.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+        first = True
+        for event in events:
+            write_f.write(('' if first else ',\n') + json.dumps(event))
+            first = False
+        for path in paths:
+            with open(path) as read_f:
+                for line in read_f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    write_f.write(('' if first else ',\n') + line)
+                    first = False
+        write_f.write('\n]}\n')
@@ -1,20 +1,33 @@
 import json
-import json5
 import re
 import csv
 import sys
 import logging
 import os
-from bs4 import BeautifulSoup
+import bisect
+from ccscanner.utils.reader import open_buffer
+from ccscanner.utils.normalize import normalize
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
+NEWLINE = re.compile('\n')
+NEWLINE_BYTES = re.compile(b'\n')
+
 
 def save_js(content, path):
     with open(path, 'w') as save_f:
         json.dump(content, save_f)
 
+def save_js_atomic(content, path):
+    # readers never see a partly written file, a crash leaves the old one or none
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp_path, 'w') as save_f:
+        json.dump(content, save_f)
+        save_f.flush()
+        os.fsync(save_f.fileno())
+    os.replace(tmp_path, path)
+
 def add_line(line, path):
     with open(path, 'a') as save_f:
         save_f.write(line)
@@ -22,19 +35,15 @@ def add_line(line, path):
 
 def read_js(path):
     try:
-        with open(path, 'r', errors='ignore') as read_f:
-            content = json.load(read_f)
+        content = json.loads(open_buffer(path).text)
     except:
-        try:
-            with open(path, 'r', encoding='latin-1') as read_f:
-                content = json.load(read_f)
-        except:
-            return None
+        return None
     return content
 
 def read_json5(path):
-    with open(path) as data_file:    
-        content = json5.load(data_file)
+    # third-party parsers are imported on first use, most scans never need them
+    import json5
+    content = json5.loads(open_buffer(path).text)
     return content
 
     # try:
@@ -48,32 +57,41 @@ def read_json5(path):
 
 def read_xml(path):
     try:
-        with open(path, 'r', errors='ignore') as f:
-            data = f.read()
+        data = open_buffer(path).text
     except:
-        try:
-            with open(path, 'r', encoding='latin-1') as f:
-                data = f.read()
-        except:
-            return None
+        return None
 
+    from bs4 import BeautifulSoup
     xml_data = BeautifulSoup(data, "xml")
     return xml_data
 
 
 def read_txt(txt):
     try:
-        with open(txt, 'r', errors='ignore') as load_f:
-            content = load_f.read()
+        content = open_buffer(txt).text
+    except:
+        return None
+    return content
+
+
+def read_ascii(txt):
+    # the ascii bytes of a large file, see FileBuffer.ascii_data, or its text
+    try:
+        content = open_buffer(txt).ascii_data
     except:
-        try:
-            with open(txt, 'r', encoding='latin-1') as load_f:
-                content = load_f.read()
-        except:
-            return None
+        return None
+    if content is None:
+        return read_txt(txt)
     return content
 
 
+def as_text(value):
+    # matched spans of ascii bytes are decoded, text is returned as is
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('ascii')
+    return value
+
+
 def read_csv(csv_file):
     csv.field_size_limit(sys.maxsize)
     csvfile = open(csv_file)
@@ -83,14 +101,9 @@ def read_csv(csv_file):
 
 def read_lines(text):
     try:
-        with open(text, 'r', errors='ignore') as load_f:
-            lines = [line.rstrip() for line in load_f.readlines()]
+        lines = open_buffer(text).lines
     except:
-        try:
-            with open(text, 'r', encoding='latin-1') as load_f:
-                lines = [line.rstrip() for line in load_f.readlines()]
-        except:
-            return None
+        return None
     return lines
 
 
@@ -126,20 +139,25 @@ def count_empty_dir(root, print_emtpy_dir = False):
     return count
     
 
-def get_func_body(pattern, contents):
+def iter_func_bodies(pattern, contents):
+        # yields (start offset, body) of every call matching pattern, contents may
+        # also be the ascii bytes of read_ascii, the bodies are text either way
+        if isinstance(contents, str):
+            left, right = '(', ')'
+        else:
+            left, right = ord('('), ord(')')
+            pattern = pattern.encode()
         index_iter = re.finditer(pattern, contents)
-        funcs = []
         for index in index_iter:
             cursor = index.start()
-            func_body = ''
             left_count = 0
             flag = True
             cursor_over = 0
             while(flag):
-                func_body += contents[cursor]
-                if contents[cursor] == '(':
+                char = contents[cursor]
+                if char == left:
                     left_count += 1
-                if contents[cursor] == ')':
+                if char == right:
                     left_count -= 1
                     if left_count == 0:
                         flag = False
@@ -148,26 +166,109 @@ def get_func_body(pattern, contents):
                     cursor_over = 1
                     break
             if cursor_over == 0:
-                funcs.append(func_body)
-        return funcs
+                yield index.start(), as_text(contents[index.start():cursor])
+
+def get_func_body(pattern, contents):
+        return [func_body for _, func_body in iter_func_bodies(pattern, contents)]
+
+
+class LineIndex(object):
+    """Offsets of the line starts of a text, line numbers are found by bisection."""
+
+    def __init__(self, text) -> None:
+        self.text = text
+        self.starts = [0]
+        newline = NEWLINE if isinstance(text, str) else NEWLINE_BYTES
+        self.starts.extend(match.end() for match in newline.finditer(text))
+
+    def line_of(self, offset):
+        # 1-based line number of offset
+        return bisect.bisect_right(self.starts, offset)
+
+
+class RewrittenText(object):
+    """
+    A text changed by str.replace() calls, which keeps where every part of the
+    new text comes from in the original one: copied parts map character by
+    character, a replacement maps to the whole span it replaced.
+    """
+
+    def __init__(self, text) -> None:
+        self.original = text
+        self.text = text
+        # (start in text, start in the original, end in the original, copied) in text order
+        self.pieces = [(0, 0, len(text), True)]
+        self.starts = [0]
+        self.line_index = None
+
+    def replace(self, old, new):
+        text = self.text
+        position = text.find(old) if old else -1
+        if position < 0:
+            return
+        pieces = []
+        size = 0
+        last = 0
+        while position >= 0:
+            size = self.copy(pieces, size, last, position)
+            if new:
+                pieces.append((size, self.origin(position)[0], self.origin(position + len(old) - 1)[1], False))
+                size += len(new)
+            last = position + len(old)
+            position = text.find(old, last)
+        self.copy(pieces, size, last, len(text))
+        self.text = text.replace(old, new)
+        self.pieces = pieces
+        self.starts = [piece[0] for piece in pieces]
+
+    def copy(self, pieces, size, start, end):
+        # appends the pieces of text[start:end] at size in the new text, returns the new size
+        index = bisect.bisect_right(self.starts, start) - 1
+        while index < len(self.pieces) and self.pieces[index][0] < end:
+            piece_start, origin_start, origin_end, copied = self.pieces[index]
+            index += 1
+            piece_end = self.pieces[index][0] if index < len(self.pieces) else len(self.text)
+            low, high = max(start, piece_start), min(end, piece_end)
+            if low >= high:
+                continue
+            if copied:
+                pieces.append((size, origin_start + low - piece_start, origin_start + high - piece_start, True))
+            else:
+                pieces.append((size, origin_start, origin_end, False))
+            size += high - low
+        return size
+
+    def origin(self, offset):
+        # (start, end) in the original of the character at offset
+        piece_start, origin_start, origin_end, copied = self.pieces[bisect.bisect_right(self.starts, offset) - 1]
+        if copied:
+            return origin_start + offset - piece_start, origin_start + offset - piece_start + 1
+        return origin_start, origin_end
+
+    def original_span(self, start, end):
+        # the span of the original text [start, end) of text comes from
+        if start >= len(self.text):
+            return len(self.original), len(self.original)
+        origin_start = self.origin(start)[0]
+        if end <= start:
+            return origin_start, origin_start
+        return origin_start, self.origin(end - 1)[1]
+
+    def original_line(self, offset):
+        # 1-based line number of an offset of the original text
+        if self.line_index is None:
+            self.line_index = LineIndex(self.original)
+        return self.line_index.line_of(offset)
+
 
 def get_unified_name(name):
-    VERSION_SUFFIX_PATTERN = '[._-]?\d+(\.\d+){1,6}([._-]?(snapshot|release|final|alpha|beta|rc$|[a-zA-Z]{1,3}[_-]?\d{1,8}))?$'
     if ' ' in name:
         name = name.split(' ')[0]
     if any(i in name for i in [':', '"', '[', ']', '$', '(', ')', '{', '}']):
         return None
     if '@@' in name:
         name = name.split('@@')[-1]
-    name = remove_lstrip(name.lower(), 'lib')
-    while(name.endswith(('_find', '_major', '_minor', '_min', '_patchlevel', '_patch'))):
-        name = '_'.join(name.split('_')[:-1])
-    for suffix in ['-dev', '_dev', '-src', '_src']:
-        name = remove_rstrip(name, suffix)
-    version = re.search(VERSION_SUFFIX_PATTERN, name)
-    if version is not None:
-        name = name.replace(version.group(0), '').strip('-_.')
-    return name
+    return normalize(name).name
 
 if __name__ == '__main__':
     read_js('test/test_data/error.json')
\ No newline at end of file
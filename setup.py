@@ -22,10 +22,13 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     packages = setuptools.find_packages(),
-    python_requires=">=3.6",
+    python_requires=">=3.9",
     entry_points = {
         'console_scripts': [
             'ccscanner_print = ccscanner.scanner:main',
+            'ccscanner_batch = ccscanner.batch:main',
+            'ccscanner_query = ccscanner.query:main',
+            'ccscanner_snippets = ccscanner.snippets:main',
         ]
     },
     install_requires=requires_list
@@ -0,0 +1,40 @@
+import sys
+import os
+import tarfile
+sys.path.append(os.getcwd())
+from ccscanner.archive import archive_scanner
+from ccscanner.extractors import registry
+from ccscanner.extractors.extractor import Extractor
+
+
+class BrokenExtractor(Extractor):
+    __slots__ = ()
+
+    def __init__(self, target) -> None:
+        super().__init__()
+        self.type = 'vcpkg'
+        self.target = target
+
+    def run_extractor(self):
+        raise RuntimeError('transient failure')
+
+
+def test_failed_extraction_not_cached(tmp_path):
+    manifest = tmp_path / 'vcpkg.json'
+    manifest.write_text('{"dependencies": ["zlib"]}')
+    archive = str(tmp_path / 'src.tar.gz')
+    with tarfile.open(archive, 'w:gz') as tar:
+        tar.add(str(manifest), 'src/vcpkg.json')
+    cache = str(tmp_path / 'cache')
+    registry.get_extractor('vcpkg')
+    working = registry.extractor_classes['vcpkg']
+    registry.extractor_classes['vcpkg'] = BrokenExtractor
+    try:
+        failed = archive_scanner(archive, blob_cache=cache)
+    finally:
+        registry.extractor_classes['vcpkg'] = working
+    assert failed.errors == {'vcpkg': 1} and failed.extractors == []
+    # the next scan extracts the blob again instead of finding no dependencies in the cache
+    scan = archive_scanner(archive, blob_cache=cache)
+    assert [dep.depname for extractor in scan.extractors for dep in extractor.deps] == ['zlib']
+    assert scan.cache_stats()['blob'] == (1, 0)
@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+import pytest
+sys.path.append(os.getcwd())
+from ccscanner.extractors import registry
+from ccscanner.extractors.extractor import Extractor
+from ccscanner.utils.guard import ExtractorWorker, LimitExceeded, process_rss
+from ccscanner.utils.reader import FileBuffer
+
+
+class SlowExtractor(Extractor):
+    __slots__ = ()
+
+    def __init__(self, target) -> None:
+        super().__init__()
+        self.type = 'slow'
+        self.target = target
+
+    def run_extractor(self):
+        time.sleep(30)
+
+
+class HogExtractor(SlowExtractor):
+    __slots__ = ()
+
+    def run_extractor(self):
+        hog = [bytearray(1024 * 1024) for _ in range(128)]
+        time.sleep(30)
+
+
+def check_limit(extractor_type, reason, **limits):
+    # registered directly, the forked worker inherits it
+    registry.extractor_classes[extractor_type] = HogExtractor if extractor_type == 'hog' else SlowExtractor
+    worker = ExtractorWorker(**limits)
+    buffer = FileBuffer.from_bytes('vcpkg.json', b'{"dependencies": ["zlib"]}')
+    try:
+        assert worker.extract('vcpkg', 'vcpkg.json', buffer).deps[0].depname == 'zlib'
+        try:
+            worker.extract(extractor_type, 'vcpkg.json', buffer)
+            assert False
+        except LimitExceeded as e:
+            assert e.reason == reason
+        # a new process takes over after a limit was hit
+        assert worker.extract('vcpkg', 'vcpkg.json', buffer).deps[0].depname == 'zlib'
+        assert worker.started == 2
+    finally:
+        worker.close()
+        del registry.extractor_classes[extractor_type]
+
+
+def test_timeout():
+    check_limit('slow', 'timeout', timeout=0.5)
+
+
+def test_oversize():
+    rss = process_rss(os.getpid())
+    if rss is None:
+        pytest.skip('no /proc to measure the worker rss')
+    check_limit('hog', 'oversize', timeout=5, rss_limit=64 * 1024 * 1024)
+
+
+def test_oversize_large_parent():
+    if process_rss(os.getpid()) is None:
+        pytest.skip('no /proc to measure the worker rss')
+    # the forked worker starts with the pages of this process, they do not count
+    ballast = bytearray(256 * 1024 * 1024)
+    for offset in range(0, len(ballast), 4096):
+        ballast[offset] = 1
+    check_limit('hog', 'oversize', timeout=5, rss_limit=64 * 1024 * 1024)
+    del ballast
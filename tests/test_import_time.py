@@ -0,0 +1,41 @@
+import sys
+import os
+import subprocess
+sys.path.append(os.getcwd())
+
+## third-party modules which are only imported by the extractors needing them
+HEAVY_MODULES = ['bs4', 'lxml', 'git', 'requests', 'json5']
+## stdlib modules the scanner imports itself, their import time is the yardstick of the machine
+REFERENCE_MODULES = ['logging', 'json', 'argparse', 'multiprocessing']
+## cumulative import time of the scanner relative to the reference, about 3x when it was set
+IMPORT_BUDGET_RATIO = 8
+
+
+def import_times(module):
+    # {module: cumulative microseconds} from a cold interpreter
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module], cwd=os.getcwd(),
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    times = {}
+    for line in proc.stderr.decode('utf-8', 'replace').splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_no_heavy_imports():
+    times = import_times('ccscanner.scanner')
+    assert 'ccscanner.scanner' in times
+    assert [module for module in HEAVY_MODULES if module in times] == []
+    # extractors are imported by the registry when a file needs them
+    assert [module for module in times if module.startswith('ccscanner.extractors.')
+            and module.endswith('_extractor')] == []
+
+
+def test_import_budget():
+    # best of three, the first run may pay for a cold disk cache
+    best = min(import_times('ccscanner.scanner')['ccscanner.scanner'] for _ in range(3))
+    reference = min(sum(times.get(module, 0) for module in REFERENCE_MODULES)
+                    for times in (import_times(', '.join(REFERENCE_MODULES)) for _ in range(3)))
+    assert best < IMPORT_BUDGET_RATIO * reference
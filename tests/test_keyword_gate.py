@@ -0,0 +1,18 @@
+import sys
+import os
+import re
+sys.path.append(os.getcwd())
+from ccscanner.extractors.utils import KeywordGate
+from ccscanner.extractors.cmake_extractor import CMAKE_ANALYZERS
+
+
+def test_keyword_gate():
+    gate = KeywordGate([('a', ['find_package']), ('b', ['package']), ('c', ['hunter_add_package'])], re.IGNORECASE)
+    # keywords inside a longer keyword are found as well
+    assert gate.select('FIND_PACKAGE(zlib)') == ['a', 'b']
+    assert gate.select('nothing here') == []
+
+
+def test_cmake_analyzers():
+    contents = 'project(foo)\ncpmaddpackage("gh:fmtlib/fmt#7.1.3")\n'
+    assert CMAKE_ANALYZERS.select(contents) == ['get_deps_regex', 'cpm_analyzer']
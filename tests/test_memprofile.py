@@ -0,0 +1,49 @@
+import sys
+import os
+import json
+import subprocess
+sys.path.append(os.getcwd())
+from ccscanner.scanner import scanner
+from ccscanner.utils.memprofile import MemoryProfile
+
+
+def test_memprofile(tmp_path):
+    target = tmp_path / 'src'
+    (target / 'vendor').mkdir(parents=True)
+    (target / 'conanfile.txt').write_text('[requires]\nzlib/1.2.11\n')
+    (target / 'vendor' / 'conanfile.txt').write_text('[requires]\nfmt/8.1.1\n')
+    (target / 'vcpkg.json').write_text('{"dependencies": ["zlib"]}')
+    memprofile = MemoryProfile(every=2)
+    scanner(str(target), memprofile=memprofile)
+    memprofile.finish(top=5)
+    # every extractor run is counted under its type
+    assert memprofile.runs == 3
+    assert {extractor_type: total['files'] for extractor_type, total in memprofile.types.items()} == {
+        'conan': 2, 'vcpkg': 1}
+    for total in memprofile.types.values():
+        assert total['peak_max'] > 0 and total['peak_total'] >= total['peak_max']
+    # one run in two is attributed to source lines
+    assert len(memprofile.lines) == 1
+    assert memprofile.end['traced_peak_bytes'] >= memprofile.end['traced_bytes'] > 0
+    assert 0 < len(memprofile.end['top_allocators']) <= 5
+    assert 'per extractor type:' in memprofile.report(5)
+    memprofile.save(str(tmp_path / 'memprofile.json'), top=5)
+    assert json.loads((tmp_path / 'memprofile.json').read_text())['runs'] == 3
+
+
+def test_memprofile_imports(tmp_path):
+    # in a fresh process, the first ms run would import bs4 and lxml
+    (tmp_path / 'demo.vcxproj').write_text(
+        '<Project><ItemDefinitionGroup><Link><AdditionalDependencies>zlib.lib</AdditionalDependencies>'
+        '</Link></ItemDefinitionGroup></Project>')
+    script = ('import sys, json\n'
+              'from ccscanner.scanner import scanner\n'
+              'from ccscanner.utils.memprofile import MemoryProfile\n'
+              'memprofile = MemoryProfile()\n'
+              'scanner(sys.argv[1], memprofile=memprofile)\n'
+              'print(json.dumps(memprofile.to_dict()))\n')
+    output = subprocess.run([sys.executable, '-c', script, str(tmp_path)], cwd=os.getcwd(), check=True,
+                            stdout=subprocess.PIPE).stdout.decode()
+    res = json.loads(output.splitlines()[-1])
+    assert res['types']['ms']['retained'] < 2 * 1024 * 1024
+    assert not any('importlib' in line['line'] for line in res['top_lines'])
@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+from ccscanner.scanner import scanner
+from ccscanner.utils.metrics import MetricsFile
+
+
+def test_metrics_file(tmp_path):
+    target = tmp_path / 'src'
+    target.mkdir()
+    (target / 'vcpkg.json').write_text('{"dependencies": ["fmt", "zlib"]}')
+    (target / 'meson.build').write_text("dep = dependency('glib-2.0'")
+    (target / 'main.c').write_text('int main(void) { return 0; }\n')
+    path = str(tmp_path / 'scan.prom')
+    metrics = MetricsFile(path, str(target))
+    scanner(str(target), metrics=metrics)
+    metrics.finish(True)
+    samples = {}
+    for line in open(path).read().splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name.replace('target="%s"' % target, 'target')] = float(value)
+    assert samples['ccscanner_files_visited_total{target}'] == 3
+    assert samples['ccscanner_files_classified_total{ecosystem="vcpkg",target}'] == 1
+    assert samples['ccscanner_dependencies_total{target}'] == 2
+    assert samples['ccscanner_scan_success{target}'] == 1
+    assert samples['ccscanner_extractor_errors_total{target,type="meson"}'] == 1
+    assert samples['ccscanner_extractor_errors_total{target,type="vcpkg"}'] == 0
@@ -0,0 +1,26 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+from ccscanner.utils.normalize import normalize, normalize_many
+from ccscanner.utils.utils import get_unified_name
+from ccscanner.extractors.dependency import Dependency
+
+
+def test_normalize():
+    assert normalize('libboost_1.82.0-dev') == ('boost', '1.82.0')
+    assert normalize('ZLIB') == ('zlib', None)
+    assert normalize('openssl_find_major') == ('openssl', None)
+    assert normalize('libpng_debug') == ('png', None)
+
+
+def test_normalize_many():
+    names = ['zlib', 'libzlib', 'zlib', 'openssl-1.1.1']
+    assert [n.name for n in normalize_many(names)] == ['zlib', 'zlib', 'zlib', 'openssl']
+
+
+def test_call_sites_agree():
+    dep = Dependency('libcurl-7.88.1', None)
+    assert dep.unified_name == get_unified_name('libcurl-7.88.1') == 'curl'
+    assert dep.version == '7.88.1'
+    assert Dependency('libcurl-7.88.1', '8.0').version == '8.0'
+    assert get_unified_name('$(LIBS)') is None
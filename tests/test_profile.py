@@ -0,0 +1,20 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+from ccscanner.scanner import scanner
+
+
+def test_profile_records_analyzers(tmp_path):
+    (tmp_path / 'CMakeLists.txt').write_text('find_package(ZLIB 1.2 REQUIRED)\n')
+    (tmp_path / 'vcpkg.json').write_text('{"dependencies": ["fmt"]}')
+    (tmp_path / 'main.c').write_text('int main(void) { return 0; }\n')
+    scanner_obj = scanner(str(tmp_path), profile=True)
+    profile = scanner_obj.profile
+    assert profile.visited == 3
+    records = {record['type']: record for record in profile.records}
+    assert sorted(records) == ['cmake', 'vcpkg']
+    assert 'find_package_analyzer' in records['cmake']['analyzers']
+    assert records['vcpkg']['deps'] == 1 and records['cmake']['bytes'] > 0
+    # timings are not kept with the results
+    assert all(extractor.timings is None for extractor in scanner_obj.extractors)
+    assert scanner(str(tmp_path)).profile is None
@@ -0,0 +1,93 @@
+import sys
+import os
+import codecs
+import mmap
+sys.path.append(os.getcwd())
+from ccscanner.utils.reader import FileBuffer, FileTooLarge
+from ccscanner.utils.utils import read_js, read_lines, read_txt, read_ascii, iter_func_bodies
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_encoding_sniffing(tmp_path):
+    utf8 = write(tmp_path, 'utf8', codecs.BOM_UTF8 + 'zlib\n'.encode('utf-8'))
+    utf16 = write(tmp_path, 'utf16', 'zlib\n'.encode('utf-16'))
+    invalid = write(tmp_path, 'invalid', 'caf\xe9 zlib\n'.encode('latin-1'))
+    assert read_txt(utf8) == 'zlib\n'
+    assert read_txt(utf16) == 'zlib\n'
+    # a stray invalid byte does not turn the whole file into latin-1
+    assert read_txt(invalid) == 'caf zlib\n'
+    assert read_txt(str(tmp_path / 'missing')) is None
+
+
+def test_views_share_one_read(tmp_path):
+    path = write(tmp_path, 'vcpkg.json', b'{"dependencies": ["zlib"]}\r\n\r\n')
+    buffer = FileBuffer(path)
+    assert buffer.prefix(1) == b'{'
+    assert buffer.data == b'{"dependencies": ["zlib"]}\r\n\r\n'
+    assert buffer.lines == ['{"dependencies": ["zlib"]}', '']
+    assert read_js(buffer) == {'dependencies': ['zlib']}
+    assert read_lines(buffer) is buffer.lines
+
+
+def test_mmap_and_size_cap(tmp_path):
+    path = write(tmp_path, 'CMakeLists.txt', b'find_package(ZLIB)\n' * 100)
+    buffer = FileBuffer(path, mmap_threshold=1)
+    assert buffer.lines[0] == 'find_package(ZLIB)'
+    buffer.release()
+    capped = FileBuffer(path, max_size=10)
+    assert capped.oversize
+    try:
+        capped.data
+        assert False
+    except FileTooLarge:
+        pass
+
+
+def test_ascii_data(tmp_path):
+    path = write(tmp_path, 'configure', b"PACKAGE_NAME='zlib'\nAC_CHECK_LIB(m, cos)\n" * 10)
+    buffer = FileBuffer(path, mmap_threshold=1)
+    contents = read_ascii(buffer)
+    assert isinstance(contents, mmap.mmap)
+    assert [body for _, body in iter_func_bodies('AC_CHECK_LIB\\(', contents)][0] == 'AC_CHECK_LIB(m, cos)'
+    buffer.release()
+    # carriage returns are turned into newlines, the bytes are not the text
+    path = write(tmp_path, 'configure.ac', b"AC_INIT([zlib], [1.3])\r\n" * 10)
+    assert read_ascii(FileBuffer(path, mmap_threshold=1)).startswith('AC_INIT')
+
+
+def test_cmake_ascii_data(tmp_path):
+    from ccscanner.extractors.cmake_extractor import CmakeExtractor
+    path = write(tmp_path, 'CMakeLists.txt', b'PROJECT(Demo VERSION 1.0)\nFIND_PACKAGE(ZLIB 1.2)\n')
+    buffer = FileBuffer(path, mmap_threshold=1)
+    extractor = CmakeExtractor(path)
+    extractor.source = buffer
+    extractor.run_extractor()
+    # matched as bytes, the names are lowered as before
+    assert buffer.ascii_data is not None
+    assert [(dep.depname, dep.version) for dep in extractor.deps] == [('zlib', '1.2'), ('demo', '1.0')]
+    buffer.release()
+
+
+def test_cmake_offsets(tmp_path):
+    from ccscanner.extractors.cmake_extractor import CmakeExtractor
+    from ccscanner.utils.snippets import fill_snippets
+    data = '# café\r\nset(V 1.2)\r\nfind_package(ZLIB ${V})\r\nproject(Démo VERSION 1.0)\r\n'.encode('utf-8')
+    path = write(tmp_path, 'CMakeLists.txt', data)
+    extractor = CmakeExtractor(path)
+    extractor.run_extractor()
+    # spans are bytes of the file as it is, not of the decoded and rewritten text
+    spans = {dep.depname: data[dep.offset:dep.offset + dep.length] for dep in extractor.deps}
+    assert spans == {'zlib': b'find_package(ZLIB ${V})', 'démo': 'project(Démo VERSION 1.0)'.encode('utf-8')}
+    assert sorted(dep.line for dep in extractor.deps) == [3, 4]
+    file_ids = {}
+    res = {'target': str(tmp_path), 'extractors': [extractor.to_dict(file_ids)], 'files': list(file_ids)}
+    # the kept context is the rewritten text, the snippet the text of the file
+    assert fill_snippets(res) == 0
+    assert fill_snippets(res, overwrite=True) == 2
+    assert sorted(dep['context'] for dep in res['extractors'][0]['deps']) == [
+        'find_package(ZLIB ${V})', 'project(Démo VERSION 1.0)']
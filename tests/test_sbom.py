@@ -0,0 +1,55 @@
+import sys
+import os
+import json
+sys.path.append(os.getcwd())
+from ccscanner.scanner import scanner
+from ccscanner.utils.sbom import open_sbom, purl
+from ccscanner.extractors.extractor import Extractor
+from ccscanner.extractors.dependency import Dependency
+
+
+def test_sbom(tmp_path):
+    target = tmp_path / 'src'
+    (target / 'vendor').mkdir(parents=True)
+    (target / 'conanfile.txt').write_text('[requires]\nzlib/1.2.11\nfmt/8.1.1\n')
+    (target / 'vendor' / 'conanfile.txt').write_text('[requires]\nzlib/1.2.11\nzlib/1.3\n')
+    cyclonedx = open_sbom('cyclonedx:%s' % (tmp_path / 'bom.cdx.json'), str(target))
+    spdx = open_sbom('spdx:%s' % (tmp_path / 'bom.spdx.json'), str(target))
+    scanner(str(target), sboms=[cyclonedx, spdx])
+    cyclonedx.finish()
+    spdx.finish()
+    bom = json.loads((tmp_path / 'bom.cdx.json').read_text())
+    # one component per name and version
+    assert sorted((c['name'], c['version']) for c in bom['components']) == [
+        ('fmt', '8.1.1'), ('zlib', '1.2.11'), ('zlib', '1.3')]
+    assert bom['components'][0]['purl'].startswith('pkg:conan/')
+    assert len(bom['dependencies'][0]['dependsOn']) == 3
+    document = json.loads((tmp_path / 'bom.spdx.json').read_text())
+    assert len(document['packages']) == 4
+    assert len(document['relationships']) == 3
+
+
+def test_empty_sbom(tmp_path):
+    sbom = open_sbom('spdx:%s' % (tmp_path / 'bom.spdx.json'), 'empty')
+    sbom.finish()
+    assert len(json.loads((tmp_path / 'bom.spdx.json').read_text())['packages']) == 1
+    sbom = open_sbom('cyclonedx:%s' % (tmp_path / 'bom.cdx.json'), 'empty')
+    sbom.finish()
+    assert json.loads((tmp_path / 'bom.cdx.json').read_text())['components'] == []
+    # nothing is left of the files written while scanning
+    assert sorted(os.listdir(tmp_path)) == ['bom.cdx.json', 'bom.spdx.json']
+
+
+def test_sbom_names(tmp_path):
+    assert purl('a b', '1.0#2?x', 'conan') == 'pkg:conan/a%20b@1.0%232%3Fx'
+    extractor = Extractor()
+    extractor.type = 'cmake'
+    extractor.target = 'CMakeLists.txt'
+    nameless = Dependency('', '1.0')
+    nameless.unified_name = None
+    extractor.deps = [nameless, Dependency('zlib', None)]
+    sbom = open_sbom('cyclonedx:%s' % (tmp_path / 'bom.cdx.json'), 'target')
+    sbom.add(extractor)
+    sbom.finish()
+    # the dependency without a name is left out
+    assert [c['name'] for c in json.loads((tmp_path / 'bom.cdx.json').read_text())['components']] == ['zlib']
@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+from ccscanner.scanner import scanner
+from ccscanner.utils.siblings import find_skipped_siblings
+
+AUTOTOOLS = ['configure.ac', 'configure', 'Makefile.am', 'Makefile.in', 'Makefile', 'README']
+
+
+def test_policy_source():
+    assert find_skipped_siblings(AUTOTOOLS, 'source') == {
+        'configure': 'configure.ac', 'Makefile.in': 'Makefile.am', 'Makefile': 'Makefile.am'}
+
+
+def test_policy_generated():
+    assert find_skipped_siblings(AUTOTOOLS, 'generated') == {
+        'configure.ac': 'configure', 'Makefile.am': 'Makefile', 'Makefile.in': 'Makefile'}
+
+
+def test_policy_all():
+    assert find_skipped_siblings(AUTOTOOLS + ['configure.in'], 'all') == {}
+
+
+def test_alternatives():
+    # configure.in is the old name of configure.ac, only one of them is scanned
+    assert find_skipped_siblings(['configure.in', 'configure.ac']) == {'configure.in': 'configure.ac'}
+    assert find_skipped_siblings(['configure.in', 'configure.ac', 'configure'], 'generated') == {
+        'configure.ac': 'configure', 'configure.in': 'configure'}
+    assert find_skipped_siblings(['configure.in', 'Makefile']) == {}
+
+
+def test_skipped_records(tmp_path):
+    (tmp_path / 'configure.ac').write_text('AC_INIT([demo], [1.0])\nAC_CHECK_LIB(z, inflate)\n')
+    (tmp_path / 'configure.in').write_text('AC_INIT([demo], [0.9])\n')
+    (tmp_path / 'Makefile.am').write_text('bin_PROGRAMS = demo\n')
+    (tmp_path / 'Makefile').write_text('all:\n\tcc -lz -o demo demo.c\n')
+    scan = scanner(str(tmp_path))
+    assert sorted(scan.skipped, key=lambda record: record['path']) == [
+        {'path': str(tmp_path / 'Makefile'), 'reason': 'sibling', 'kept': str(tmp_path / 'Makefile.am')},
+        {'path': str(tmp_path / 'configure.in'), 'reason': 'sibling', 'kept': str(tmp_path / 'configure.ac')},
+    ]
+    assert sorted(os.path.basename(extractor.target) for extractor in scan.extractors) == ['Makefile.am', 'configure.ac']
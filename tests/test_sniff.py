@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+from ccscanner.utils.reader import FileBuffer
+from ccscanner.utils.sniff import sniff
+
+
+def sniffed(filename, text):
+    return sniff(FileBuffer.from_bytes(filename, text.encode('utf-8')), filename)
+
+
+def test_sniff_clib():
+    npm = '{\n  "name": "demo",\n  "main": "index.js",\n  "scripts": {"test": "jest"},\n  "devDependencies": {}\n}\n'
+    assert sniffed('package.json', npm) == 'clib'
+    clib = '{\n  "name": "buffer",\n  "version": "0.4.0",\n  "src": ["buffer.c"],\n  "dependencies": {"clibs/strdup": "*"}\n}\n'
+    assert sniffed('package.json', clib) is None
+    # keys of nested objects are not top-level keys
+    assert sniffed('package.json', '{"name": "x", "repo": "a/x", "dependencies": {"main": "*"}}') is None
+
+
+def test_sniff_build2():
+    assert sniffed('manifest', '# comment\n: 1\nname: libhello\nversion: 1.0.0\ndepends: libz\n') is None
+    assert sniffed('manifest', '{"manifest_version": 2, "name": "extension"}\n') == 'build2'
+    assert sniffed('MANIFEST', 'include README.md\n') == 'build2'
+
+
+def test_sniff_control():
+    control = 'Source: zlib\nSection: libs\nBuild-Depends: debhelper (>= 9)\n\nPackage: zlib1g\n'
+    assert sniffed('control', control) is None
+    assert sniffed('control', '-----BEGIN PGP SIGNED MESSAGE-----\nHash: SHA256\n\nSource: zlib\n') is None
+    assert sniffed('control', '#!/bin/sh\nexec "$@"\n') == 'control'
+
+
+def test_sniff_bazel():
+    assert sniffed('BUILD', 'cc_library(\n    name = "zlib",\n    srcs = glob(["*.c"]),\n)\n') is None
+    # a complete BUILD file without C/C++ rules has nothing to extract
+    assert sniffed('BUILD', 'py_library(\n    name = "tool",\n)\n') == 'bazel'
+    assert sniffed('BUILD', 'Build instructions\n==================\n') == 'bazel'
+    # only the prefix of a large file is read, any rule keeps it
+    large = 'load("//tools:defs.bzl", "rule")\n' + '# padding\n' * 1000
+    assert sniffed('BUILD', large) is None
+    # other names are never sniffed
+    assert sniffed('CMakeLists.txt', 'anything') is None
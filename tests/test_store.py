@@ -0,0 +1,44 @@
+import sys
+import os
+import subprocess
+sys.path.append(os.getcwd())
+from ccscanner.scanner import scanner
+from ccscanner.utils.store import open_store, version_key
+
+
+def test_version_key():
+    assert version_key('1.2.9') < version_key('1.2.12') < version_key('1.10')
+    assert version_key('${VERSION}') is None
+
+
+def test_store(tmp_path):
+    target = tmp_path / 'src'
+    target.mkdir()
+    (target / 'conanfile.txt').write_text('[requires]\nzlib/1.2.11\nfmt/8.1.1\n')
+    store = open_store('sqlite:%s' % (tmp_path / 'results.db'))
+    res = scanner(str(target)).to_dict()
+    store.add(res)
+    # a repository stored again replaces its rows
+    store.add(res)
+    assert store.repos('zlib', '<1.2.12') == [str(target)]
+    assert store.repos('zlib', '>=1.3') == []
+    assert [row[2] for row in store.query(extractor_type='conan')] == ['zlib', 'fmt']
+    assert store.top() == [('fmt', 1), ('zlib', 1)]
+    store.close()
+
+
+def test_store_resumed_batch(tmp_path):
+    target = tmp_path / 'src'
+    target.mkdir()
+    (target / 'conanfile.txt').write_text('[requires]\nzlib/1.2.11\n')
+    (tmp_path / 'repos.txt').write_text('%s\n' % target)
+    batch = [sys.executable, 'ccscanner/batch.py', '-m', str(tmp_path / 'repos.txt'), '-o', str(tmp_path / 'out'),
+             '-j', '1']
+    subprocess.run(batch, cwd=os.getcwd(), stdout=subprocess.DEVNULL, check=True)
+    # the rerun scans nothing, the result of the first run is stored all the same
+    subprocess.run(batch + ['--store', 'sqlite:%s' % (tmp_path / 'results.db')], cwd=os.getcwd(),
+                   stdout=subprocess.DEVNULL, check=True)
+    store = open_store('sqlite:%s' % (tmp_path / 'results.db'))
+    assert store.targets() == {str(target)}
+    assert store.repos('zlib') == [str(target)]
+    store.close()
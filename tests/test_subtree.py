@@ -0,0 +1,63 @@
+import sys
+import os
+import json
+import shutil
+sys.path.append(os.getcwd())
+from ccscanner.scanner import scanner
+
+TEST_DATA = os.path.join(os.getcwd(), 'tests', 'test_data')
+
+
+def deps(scan):
+    res = scan.to_dict()
+    return sorted((res['files'][dep['file']], dep['depname'], dep['offset'])
+                  for extractor in res['extractors'] for dep in extractor['deps'])
+
+
+def test_subtree_cache(tmp_path):
+    target = tmp_path / 'repo'
+    shutil.copytree(TEST_DATA, str(target / 'vendor' / 'a'))
+    shutil.copytree(TEST_DATA, str(target / 'vendor' / 'b'))
+    for empty in ('empty1', 'empty2', 'docs'):
+        os.makedirs(str(target / empty / 'sub'))
+    (target / 'docs' / 'readme.txt').write_text('no manifest here\n')
+    cache = str(tmp_path / 'cache')
+    plain = scanner(str(target))
+    cold = scanner(str(target), subtree_cache=cache)
+    # directories without manifests are neither looked up nor hits, the second copy is
+    assert [os.path.basename(cached['path']) in ('a', 'b') for cached in cold.cached] == [True]
+    assert cold.cache_stats()['subtree'][0] == 4
+    # JSON entries for the whole tree, vendor and the copy walked first, the cached copy is stored already
+    entries = [os.path.join(root, name) for root, _, names in os.walk(cache) for name in names]
+    assert len(entries) == 3
+    sizes = []
+    for entry in entries:
+        with open(entry) as read_f:
+            sizes.append(len(json.load(read_f)['extractors']))
+    assert sorted(sizes) == [len(cold.extractors) // 2, len(cold.extractors), len(cold.extractors)]
+    warm = scanner(str(target), subtree_cache=cache)
+    assert [cached['path'] for cached in warm.cached] == [str(target)]
+    assert deps(plain) == deps(cold) == deps(warm)
+    # same names and sizes, other content
+    path = target / 'vendor' / 'a' / 'CMakeLists.txt'
+    data = path.read_bytes()
+    path.write_bytes(data.replace(b'find_package(PowerShell', b'find_package(PowerShelk', 1))
+    stale = scanner(str(target), subtree_cache=cache)
+    assert [cached['path'] for cached in stale.cached] == [str(target / 'vendor' / 'b')]
+    assert deps(stale) == deps(scanner(str(target)))
+
+
+def test_subtree_cache_across_repos(tmp_path):
+    # a library vendored by two repositories is extracted once
+    cache = str(tmp_path / 'cache')
+    first = tmp_path / 'first'
+    shutil.copytree(TEST_DATA, str(first / 'third_party' / 'zlib'))
+    (first / 'CMakeLists.txt').write_text('find_package(PNG)\n')
+    scanner(str(first), subtree_cache=cache)
+    second = tmp_path / 'second'
+    shutil.copytree(TEST_DATA, str(second / 'deps' / 'zlib'))
+    (second / 'deps' / 'png').mkdir()
+    (second / 'deps' / 'png' / 'meson.build').write_text("dependency('zlib')\n")
+    scan = scanner(str(second), subtree_cache=cache)
+    assert [cached['path'] for cached in scan.cached] == [str(second / 'deps' / 'zlib')]
+    assert deps(scan) == deps(scanner(str(second)))
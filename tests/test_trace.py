@@ -0,0 +1,39 @@
+import sys
+import os
+import json
+sys.path.append(os.getcwd())
+from ccscanner.scanner import scanner
+from ccscanner.utils.trace import Tracer, merge_parts
+
+
+def test_trace(tmp_path):
+    target = tmp_path / 'src'
+    target.mkdir()
+    (target / 'conanfile.txt').write_text('[requires]\nzlib/1.2.11\n')
+    tracer = Tracer('scan')
+    scanner_obj = scanner(str(target), tracer=tracer)
+    with tracer.span('to_dict', 'serialize'):
+        scanner_obj.to_dict()
+    tracer.save(str(tmp_path / 'trace.json'))
+    events = json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
+    spans = [event for event in events if event['ph'] == 'X']
+    assert {'scan', 'walk', 'classify', 'sniff', 'read', 'extract', 'serialize'} <= {event['cat'] for event in spans}
+    for event in spans:
+        assert event['pid'] == os.getpid() and isinstance(event['tid'], int) and event['dur'] >= 0
+    assert [event['name'] for event in spans if event['cat'] == 'extract'] == ['conan']
+
+
+def test_merge_parts(tmp_path):
+    parts = []
+    for index in range(2):
+        tracer = Tracer('worker %d' % index)
+        with tracer.span('repository', 'scan'):
+            pass
+        parts.append(str(tmp_path / ('%d.jsonl' % index)))
+        with open(parts[-1], 'w') as write_f:
+            tracer.flush(write_f)
+    batch = Tracer('batch')
+    batch.complete('batch', 'scan', 0, 1)
+    merge_parts(parts, str(tmp_path / 'trace.json'), batch.events)
+    events = json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
+    assert [event['name'] for event in events] == ['process_name', 'batch'] + ['process_name', 'repository'] * 2